@@ -0,0 +1,111 @@
+# benchmarks/generate_data.py
+
+import argparse
+import random
+from datetime import date, timedelta
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+# (ProductID, name, variant, price range) - the variant produces the
+# "Name,Variant" comma case seen in the real exports
+PRODUCTS = [
+    ("P101", "Laptop", "Premium", (35000, 90000)),
+    ("P102", "Mouse", "Wireless", (300, 1200)),
+    ("P103", "Keyboard", "Mechanical", (800, 4000)),
+    ("P104", "Monitor", "LED", (8000, 30000)),
+    ("P105", "Webcam", "HD", (1500, 5000)),
+    ("P106", "Headphones", None, (1000, 6000)),
+    ("P107", "USB Cable", None, (100, 600)),
+    ("P108", "External Hard Drive", "1TB", (3000, 9000)),
+    ("P109", "Wireless Mouse", "Gaming", (400, 2000)),
+    ("P110", "Laptop Charger", "65W", (1200, 3500)),
+]
+REGIONS = ["North", "South", "East", "West"]
+
+
+def generate_lines(rows, seed=42, customers=None, days=365, start=date(2024, 1, 1), dirty_rate=0.12):
+    """
+    Yields synthetic sales lines in the pipe format (without header)
+    About dirty_rate of the rows exercise the cases the parser and
+    validator handle: comma-formatted numbers, commas in product names,
+    invalid IDs, zero quantities, empty customer/region and malformed
+    lines.
+    """
+    rng = random.Random(seed)
+    customers = customers or max(rows // 20, 50)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+    for i in range(1, rows + 1):
+        pid, name, variant, (low, high) = PRODUCTS[rng.randrange(len(PRODUCTS))]
+        qty = rng.randint(1, 10)
+        price = rng.randint(low, high)
+        tid = f"T{i:06d}"
+        cid = f"C{rng.randrange(customers):05d}"
+        region = REGIONS[rng.randrange(len(REGIONS))]
+        day = dates[rng.randrange(days)]
+        price_text = str(price)
+
+        if rng.random() < dirty_rate:
+            case = rng.randrange(8)
+            if case == 0 and variant:
+                name = f"{name},{variant}"
+            elif case == 1:
+                price_text = f"{price:,}"
+            elif case == 2:
+                tid = f"X{i}"
+            elif case == 3:
+                qty = 0
+            elif case == 4:
+                cid = ""
+            elif case == 5:
+                region = ""
+            elif case == 6:
+                yield f"{tid}|{day}|{pid}|{name}|{qty}"  # malformed, too few fields
+                continue
+            else:
+                pid = f"Q{pid[1:]}"
+
+        yield f"{tid}|{day}|{pid}|{name}|{qty}|{price_text}|{cid}|{region}"
+
+
+def write_sales_file(filename, rows, seed=42, customers=None, days=365, batch_size=50000):
+    """
+    Writes a synthetic sales file of the given number of rows
+    Lines are generated lazily and written in batches, so 100M rows need
+    no more memory than 10k
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        batch = []
+        for line in generate_lines(rows, seed, customers, days):
+            batch.append(line)
+            if len(batch) >= batch_size:
+                f.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            f.write("\n".join(batch) + "\n")
+
+
+def parse_size(text):
+    """
+    Parses row counts such as 10000, 10k, 1m or 100M
+    """
+    text = text.strip().lower()
+    for suffix, factor in (("k", 1000), ("m", 1000000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic sales_data.txt")
+    parser.add_argument("--rows", default="10k", help="number of rows, e.g. 10k, 1m, 100m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--customers", type=int, help="distinct customers (default rows / 20)")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--out", default="data/synthetic_sales_data.txt")
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    write_sales_file(args.out, rows, args.seed, args.customers, args.days)
+    print(f"✓ Wrote {rows} rows to {args.out}")
@@ -0,0 +1,217 @@
+# benchmarks/run_benchmarks.py
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_data import write_sales_file, parse_size, PRODUCTS
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.data_processor import (
+    aggregate_sales,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils.api_handler import EnrichedTransactions, save_enriched_data
+from main import generate_sales_report
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _product_mapping():
+    # Offline stand-in for the API catalog: every product except one resolves
+    return {
+        int(pid[1:]): {"title": name, "category": "electronics", "brand": "Generic", "rating": 4.2}
+        for pid, name, _, _ in PRODUCTS[:-1]
+    }
+
+
+def build_stages(data_file, workdir):
+    """
+    Returns: list of (stage name, function) - each function receives the
+    results of earlier stages through the shared state dictionary
+    """
+    mapping = _product_mapping()
+
+    def validate(s):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return validate_and_filter(s["parse_transactions"])
+
+    def valid(s):
+        return s["validate_and_filter"][0]
+
+    def enrich(s):
+        # Resolve every product and build every view; enrich_sales_data
+        # would also write the file, which save_enriched_data times below
+        return list(EnrichedTransactions(valid(s), mapping))
+
+    return [
+        ("read_sales_data", lambda s: read_sales_data(data_file)),
+        ("parse_transactions", lambda s: parse_transactions(s["read_sales_data"])),
+        ("validate_and_filter", validate),
+        ("aggregate_sales", lambda s: aggregate_sales(valid(s))),
+        ("calculate_total_revenue", lambda s: calculate_total_revenue(valid(s))),
+        ("region_wise_sales", lambda s: region_wise_sales(valid(s))),
+        ("top_selling_products", lambda s: top_selling_products(valid(s))),
+        ("customer_analysis", lambda s: customer_analysis(valid(s))),
+        ("daily_sales_trend", lambda s: daily_sales_trend(valid(s))),
+        ("find_peak_sales_day", lambda s: find_peak_sales_day(valid(s))),
+        ("low_performing_products", lambda s: low_performing_products(valid(s))),
+        ("enrich_transactions", enrich),
+        ("save_enriched_data", lambda s: save_enriched_data(
+            s["enrich_transactions"], os.path.join(workdir, "enriched.txt"))),
+        ("generate_sales_report", lambda s: generate_sales_report(
+            valid(s), s["enrich_transactions"], os.path.join(workdir, "report.txt"),
+            aggregates=s["aggregate_sales"])),
+    ]
+
+
+def run_stages(stages, measure_memory):
+    """
+    Runs the stages in order, timing each one; with measure_memory the
+    peak traced allocation of each stage is recorded as well
+    Returns: dictionary stage -> {"seconds", "peak_bytes"}
+    """
+    state = {}
+    results = {}
+
+    if measure_memory:
+        tracemalloc.start()
+
+    try:
+        for name, func in stages:
+            if measure_memory:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+
+            start = time.perf_counter()
+            state[name] = func(state)
+            elapsed = time.perf_counter() - start
+
+            results[name] = {"seconds": round(elapsed, 6)}
+            if measure_memory:
+                results[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(rows, seed=42, repeat=1, measure_memory=True):
+    """
+    Generates a synthetic file of `rows` rows and benchmarks every stage
+    Timings are the best of `repeat` runs; memory comes from one extra
+    run under tracemalloc (which slows code down, so it is kept separate)
+    Returns: result dictionary
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "sales_data.txt")
+        write_sales_file(data_file, rows, seed)
+
+        stages = build_stages(data_file, workdir)
+
+        timings = None
+        for _ in range(repeat):
+            run = run_stages(stages, measure_memory=False)
+            if timings is None:
+                timings = run
+            else:
+                for name, stats in run.items():
+                    timings[name]["seconds"] = min(timings[name]["seconds"], stats["seconds"])
+
+        if measure_memory:
+            for name, stats in run_stages(stages, measure_memory=True).items():
+                timings[name]["peak_bytes"] = stats["peak_bytes"]
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "rows": rows,
+        "seed": seed,
+        "stages": timings
+    }
+
+
+def save_result(result, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = result["timestamp"].replace(":", "").replace("-", "")
+    path = os.path.join(results_dir, f"bench_{result['rows']}_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def latest_result(rows, results_dir=RESULTS_DIR, exclude=None):
+    paths = sorted(p for p in glob.glob(os.path.join(results_dir, f"bench_{rows}_*.json")) if p != exclude)
+    if not paths:
+        return None
+    with open(paths[-1], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_result(result, baseline=None):
+    print(f"\nRows: {result['rows']:,} | commit {result['git_commit']} | Python {result['python']}")
+    if baseline:
+        print(f"Compared with {baseline['timestamp']} (commit {baseline['git_commit']})")
+    print(f"{'Stage':26} {'Seconds':>10} {'Peak MB':>10} {'vs base':>9}")
+    print("-" * 58)
+
+    for name, stats in result["stages"].items():
+        peak = stats.get("peak_bytes")
+        peak_text = f"{peak / 1e6:10.2f}" if peak is not None else f"{'-':>10}"
+        change = ""
+        if baseline and name in baseline["stages"] and baseline["stages"][name]["seconds"]:
+            ratio = stats["seconds"] / baseline["stages"][name]["seconds"]
+            change = f"{ratio:8.2f}x"
+        print(f"{name:26} {stats['seconds']:10.4f} {peak_text} {change:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data")
+    parser.add_argument("--rows", default="10k,100k", help="comma separated sizes, e.g. 10k,1m,10m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="timing runs per size (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--compare", help="result JSON to compare with (default: latest for the same size)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    for size in args.rows.split(","):
+        rows = parse_size(size)
+        result = run_benchmark(rows, args.seed, args.repeat, measure_memory=not args.no_memory)
+
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        else:
+            baseline = latest_result(rows)
+
+        print_result(result, baseline)
+        if not args.no_save:
+            print(f"Saved: {save_result(result)}")
@@ -1,171 +1,722 @@
 # main.py
 
-from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.file_handler import (
+    read_sales_data,
+    parse_transactions,
+    validate_and_filter,
+    iter_sales_records,
+    iter_valid_transactions
+)
 from utils.data_processor import (
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    daily_sales_trend,
-    find_peak_sales_day,
-    low_performing_products
+    aggregate_sales,
+    empty_aggregates,
+    update_aggregates
+)
+from utils.parallel import parallel_process
+try:
+    from utils.columnar import TransactionTable
+except ImportError:  # numpy is only needed for --columnar
+    TransactionTable = None
+from utils.cache import file_fingerprint, load_cached_transactions, save_cached_transactions, load_transactions
+from utils.query import TransactionQuery
+from utils.cube import build_cube, save_cube
+from utils.partitions import load_partitions
+from utils.instrumentation import PipelineMetrics
+from utils.scheduler import StageGraph
+from utils.sketches import HyperLogLog
+from utils.sqlstore import DB_PATH as SQLITE_PATH, open_store, load_store
+from utils.report import (
+    REPORT_FORMATS,
+    build_snapshot,
+    with_enrichment,
+    render_report,
+    input_fingerprints,
+    snapshot_key,
+    load_snapshot,
+    save_snapshot
+)
+from utils.incremental import process_incremental, save_state
+from utils.service import run_service
+from utils.api_handler import (
+    get_product_catalog,
+    create_product_mapping,
+    EnrichedTransactions,
+    iter_enriched_data,
+    track_enrichment,
+    save_enriched_data,
+    API_URL,
+    ENRICHED_FILES
 )
-from utils.api_handler import fetch_all_products, create_product_mapping, enrich_sales_data
+from utils.writers import FORMATS
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
+import argparse
+import json
+import os
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt',
+                          aggregates=None, enrichment=None, snapshot=None, formats=("text",)):
+    """
+    Writes the sales report in every requested format (text, json, csv, html)
+    snapshot: precomputed analytics snapshot; built from the transactions
+    (or aggregates) when not given
+    Returns: dictionary format -> path written
+    """
+    if snapshot is None:
+        snapshot = build_snapshot(transactions, aggregates=aggregates)
+
+    if enrichment is None:
+        enrichment = {}
+        for _ in track_enrichment(enriched_transactions, enrichment):
+            pass
+
+    return render_report(with_enrichment(snapshot, enrichment), output_file, formats)
+
+
+def ask_filters():
+    """
+    Prompts for optional region and amount filters
+    Returns: tuple (region, min_amount, max_amount)
+    """
+    want_filter = input("Do you want to filter data? (y/n): ").strip().lower()
+
+    region = None
+    min_amount = None
+    max_amount = None
+
+    if want_filter == "y":
+        region = input("Enter region (or leave blank): ").strip()
+        region = region if region else None
+
+        min_amt = input("Enter minimum amount (or leave blank): ").strip()
+        min_amount = float(min_amt) if min_amt else None
+
+        max_amt = input("Enter maximum amount (or leave blank): ").strip()
+        max_amount = float(max_amt) if max_amt else None
+
+    return region, min_amount, max_amount
+
+
+def _aggregate_through(transactions, aggregates):
+    for t in transactions:
+        update_aggregates(aggregates, (t,))
+        yield t
+
+
+def run_streaming(filename="data/sales_data.txt", catalog_options=None, enriched_format="pipe", unique_error=None,
+                  filters=None, customer_capacity=None):
+    """
+    Runs the whole pipeline as one lazy pass over the input file
+    Reading and parsing (from bytes), validation, aggregation, enrichment
+    and saving the enriched file are chained generators, so only the
+    aggregates are kept. Those still hold one entry per customer (and,
+    unless unique_error is set, every customer of every day);
+    customer_capacity bounds the customers with a Space-Saving summary.
+    filters: (region, min_amount, max_amount); asked interactively if None
+    """
+    region, min_amount, max_amount = filters or ask_filters()
+
+    print("\n[1/5] Fetching product data from API...")
+    products = get_product_catalog(**(catalog_options or {}))
+    print(f"✓ Fetched {len(products)} products\n")
+
+    product_mapping = create_product_mapping(products)
+
+    print("[2/5] Streaming, validating, analyzing and enriching sales data...")
+    validation = {}
+    enrichment = {}
+    aggregates = empty_aggregates(unique_error, customer_products=False, customer_capacity=customer_capacity)
+
+    rows = iter_sales_records(filename)
+    rows = iter_valid_transactions(rows, validation, region=region, min_amount=min_amount, max_amount=max_amount)
+    rows = _aggregate_through(rows, aggregates)
+    rows = track_enrichment(iter_enriched_data(rows, product_mapping), enrichment)
+    save_enriched_data(rows, fmt=enriched_format)
+
+    print("Available Regions:", sorted(validation["regions"]))
+    if validation["min_seen"] is not None:
+        print("Transaction Amount Range:", validation["min_seen"], "to", validation["max_seen"])
+    print(f"✓ Parsed {validation['total_input']} records")
+    print(f"✓ Valid: {validation['final_count']} | Invalid: {validation['invalid']}")
+    print(f"✓ Enriched {enrichment['enriched']}/{enrichment['total']} transactions")
+    sketch = aggregates["customer_sketch"]
+    if sketch is not None and len(sketch.counters) >= sketch.capacity:
+        overcount = max((error for _, _, error, _ in sketch.top(5)), default=0)
+        print(f"✓ More customers than --heavy-hitters {sketch.capacity}: top customer totals are estimates "
+              f"(overcount up to ₹{overcount:,.2f})")
+    print()
+
+    print("[3/5] Saving enriched data...")
+    print(f"✓ Saved to: {ENRICHED_FILES[enriched_format]}\n")
+
+    Path("output").mkdir(exist_ok=True)
+    print("[4/5] Generating report...")
+    generate_sales_report([], [], aggregates=aggregates, enrichment=enrichment)
+    print("✓ Report saved to: output/sales_report.txt\n")
+
+    print("[5/5] Process Complete!")
+    print("=====================================")
+
+
+def run_incremental(filename="data/sales_data.txt", catalog_options=None, enriched_format="pipe",
+                    unique_error=None, filters=None):
+    """
+    Processes only the lines appended to the input file since the last
+    incremental run and updates the saved aggregates, enrichment counts
+    and enriched file. The saved state is reset automatically when the
+    filters change or the file was rewritten.
+    filters: (region, min_amount, max_amount); asked interactively if None
+    """
+    region, min_amount, max_amount = filters or ask_filters()
+
+    print("\n[1/5] Reading new sales data since the last run...")
+    state, new_rows, resumed = process_incremental(
+        filename, region=region, min_amount=min_amount, max_amount=max_amount, unique_error=unique_error
+    )
+    validation = state["validation"]
+    print(f"✓ {'Resumed from saved state' if resumed else 'No usable saved state, processed whole file'}")
+    print(f"✓ New valid transactions: {len(new_rows)}")
+    print(f"✓ Valid: {validation['final_count']} | Invalid: {validation['invalid']} (all runs)\n")
+
+    print("[2/5] Enriching new sales data...")
+    product_mapping = {}
+    if new_rows:
+        products = get_product_catalog(**(catalog_options or {}))
+        print(f"✓ Fetched {len(products)} products")
+        product_mapping = create_product_mapping(products)
 
-
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    total_revenue = calculate_total_revenue(transactions)
-    total_transactions = len(transactions)
-    avg_order = total_revenue / total_transactions if total_transactions else 0
-
-    dates = sorted([t["Date"] for t in transactions])
-    date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
-
-    region_stats = region_wise_sales(transactions)
-    top_products = top_selling_products(transactions, n=5)
-
-    customers = customer_analysis(transactions)
-    top_customers_list = list(customers.items())[:5]
-
-    daily_trend = daily_sales_trend(transactions)
-    peak_day, peak_rev, peak_count = find_peak_sales_day(transactions)
-
-    enriched_success = sum(1 for t in enriched_transactions if t.get("enriched") is True)
-    total_enriched = len(enriched_transactions)
-    success_rate = (enriched_success / total_enriched) * 100 if total_enriched else 0
-
-    not_enriched_products = sorted(set([t.get("productName") for t in enriched_transactions if not t.get("enriched")]))
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("========================================\n")
-        f.write("        SALES ANALYTICS REPORT\n")
-        f.write(f"Generated: {now}\n")
-        f.write(f"Records Processed: {total_transactions}\n")
-        f.write("========================================\n\n")
-
-        f.write("OVERALL SUMMARY\n")
-        f.write("----------------------------------------\n")
-        f.write(f"Total Revenue: ₹{total_revenue:,.2f}\n")
-        f.write(f"Total Transactions: {total_transactions}\n")
-        f.write(f"Average Order Value: ₹{avg_order:,.2f}\n")
-        f.write(f"Date Range: {date_range}\n\n")
-
-        f.write("REGION-WISE PERFORMANCE\n")
-        f.write("----------------------------------------\n")
-        f.write(f"{'Region':10} {'Sales':12} {'% of Total':10} {'Transactions'}\n")
-        for r, stats in region_stats.items():
-            f.write(f"{r:10} ₹{stats['total_sales']:,.0f}   {stats['percentage']:.2f}%      {stats['transaction_count']}\n")
-        f.write("\n")
-
-        f.write("TOP 5 PRODUCTS\n")
-        f.write("----------------------------------------\n")
-        f.write(f"{'Rank':5} {'Product Name':20} {'Qty Sold':10} {'Revenue'}\n")
-        for i, (name, qty, rev) in enumerate(top_products, start=1):
-            f.write(f"{i:<5} {name:20} {qty:<10} ₹{rev:,.2f}\n")
-        f.write("\n")
-
-        f.write("TOP 5 CUSTOMERS\n")
-        f.write("----------------------------------------\n")
-        f.write(f"{'Rank':5} {'Customer ID':12} {'Total Spent':15} {'Order Count'}\n")
-        for i, (cid, stats) in enumerate(top_customers_list, start=1):
-            f.write(f"{i:<5} {cid:12} ₹{stats['total_spent']:,.2f}     {stats['purchase_count']}\n")
-        f.write("\n")
-
-        f.write("DAILY SALES TREND\n")
-        f.write("----------------------------------------\n")
-        f.write(f"{'Date':12} {'Transactions':12} {'Unique Customers'}\n")
-        for d, stats in daily_trend.items():
-            f.write(f"{d:12} {stats['transaction_count']:<12} {stats['unique_customers']}\n")
-        f.write("\n")
-
-        f.write("PRODUCT PERFORMANCE ANALYSIS\n")
-        f.write("----------------------------------------\n")
-        f.write(f"Best selling day: {peak_day} | Revenue: ₹{peak_rev:,.2f} | Transactions: {peak_count}\n\n")
-
-        f.write("ENRICHMENT SUMMARY\n")
-        f.write("----------------------------------------\n")
-        f.write(f"Total products enriched: {enriched_success}/{total_enriched}\n")
-        f.write(f"Success rate: {success_rate:.2f}%\n")
-        f.write("Products that couldn't be enriched:\n")
-        for p in not_enriched_products:
-            f.write(f"- {p}\n")
-
-
-def main():
+    rows = track_enrichment(iter_enriched_data(new_rows, product_mapping), state["enrichment"])
+    save_enriched_data(rows, append=resumed, fmt=enriched_format)
+    enrichment = state["enrichment"]
+    print(f"✓ Enriched {enrichment['enriched']}/{enrichment['total']} transactions (all runs)\n")
+
+    print("[3/5] Saving incremental state...")
+    save_state(filename, state)
+    print("✓ State saved\n")
+
+    Path("output").mkdir(exist_ok=True)
+    print("[4/5] Generating report...")
+    generate_sales_report([], [], aggregates=state["aggregates"], enrichment=enrichment)
+    print("✓ Report saved to: output/sales_report.txt\n")
+
+    print("[5/5] Process Complete!")
+    print("=====================================")
+
+
+def load_scenarios(path):
+    """
+    Reads a batch scenario file (JSON list), for example:
+    [{"name": "north", "region": "North", "min_amount": 1000,
+      "max_amount": null, "report": "output/reports/north.txt",
+      "enriched": "output/reports/north_enriched.txt"}]
+    Only "report" is required; "enriched" is optional.
+    Returns: list of scenario dictionaries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        scenarios = json.load(f)
+
+    if not isinstance(scenarios, list):
+        raise ValueError("Scenario file must contain a JSON list")
+
+    for i, s in enumerate(scenarios, start=1):
+        if not s.get("report"):
+            raise ValueError(f"Scenario {i} has no 'report' path")
+        s.setdefault("name", f"scenario_{i}")
+
+    return scenarios
+
+
+_batch_query = None
+_batch_mapping = None
+
+
+def _init_batch_worker(query, product_mapping):
+    global _batch_query, _batch_mapping
+    _batch_query = query
+    _batch_mapping = product_mapping
+
+
+def run_scenario(scenario, enriched_format="pipe", formats=("text",), unique_error=None):
+    """
+    Filters the shared indexed transactions for one scenario and writes
+    its report in the requested formats (and optional enriched file)
+    Returns: tuple (name, final transaction count, dictionary format ->
+    report path, or None when no transactions matched and the report
+    was skipped)
+    """
+    valid_transactions, _, summary = _batch_query.filter(
+        region=scenario.get("region"),
+        min_amount=scenario.get("min_amount"),
+        max_amount=scenario.get("max_amount")
+    )
+
+    enriched_transactions = EnrichedTransactions(valid_transactions, _batch_mapping)
+    if scenario.get("enriched"):
+        Path(scenario["enriched"]).parent.mkdir(parents=True, exist_ok=True)
+        save_enriched_data(enriched_transactions, scenario["enriched"], fmt=enriched_format)
+
+    if not valid_transactions:
+        return scenario["name"], 0, None
+
+    Path(scenario["report"]).parent.mkdir(parents=True, exist_ok=True)
+    aggregates = aggregate_sales(valid_transactions, unique_error=unique_error, customer_products=False)
+    reports = generate_sales_report(valid_transactions, enriched_transactions, scenario["report"],
+                                    aggregates=aggregates, formats=formats)
+    return scenario["name"], summary["final_count"], reports
+
+
+def run_batch(scenario_file, filename="data/sales_data.txt", jobs=1, catalog_options=None,
+              enriched_format="pipe", use_cache=True, formats=("text",), unique_error=None):
+    """
+    Runs many filter scenarios without prompts: the data is loaded,
+    validated, indexed and enriched against the catalog once and shared
+    by every scenario. jobs > 1 renders scenarios in parallel processes.
+    """
+    scenarios = load_scenarios(scenario_file)
+    print(f"[1/4] Loaded {len(scenarios)} scenarios from {scenario_file}\n")
+
+    print("[2/4] Loading and indexing sales data...")
+    line_count, transactions, from_cache = load_transactions(filename, use_cache=use_cache)
+    query = TransactionQuery(transactions)
+    print(f"✓ {len(transactions)} records{' (from cache)' if from_cache else ''}")
+    print(f"✓ Valid: {len(query.transactions)} | Invalid: {query.invalid_count}\n")
+
+    print("[3/4] Fetching product data...")
+    product_mapping = create_product_mapping(get_product_catalog(**(catalog_options or {})))
+    print(f"✓ {len(product_mapping)} products\n")
+
+    print("[4/4] Generating scenario reports...")
+    _init_batch_worker(query, product_mapping)
+    if jobs > 1 and len(scenarios) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                                 initargs=(query, product_mapping)) as pool:
+            count = len(scenarios)
+            results = list(pool.map(run_scenario, scenarios, [enriched_format] * count, [formats] * count,
+                                    [unique_error] * count))
+    else:
+        results = [run_scenario(s, enriched_format, formats, unique_error) for s in scenarios]
+
+    for name, count, reports in results:
+        if reports:
+            print(f"✓ {name}: {count} transactions -> {', '.join(reports.values())}")
+        else:
+            print(f"✗ {name}: no transactions match, report skipped")
+
+    print("\nBatch Complete!")
+    print("=====================================")
+
+
+# Stage names recorded by PipelineMetrics (and accepted by --profile)
+STAGES = [
+    "read_sales_data", "parse_transactions", "load_cache", "load_partitions", "load_columnar", "validate_and_filter",
+    "analyze", "parallel_load", "save_cube", "fetch_products", "enrich", "save_enriched", "save_sqlite", "generate_report",
+    "streaming_pipeline", "incremental_pipeline", "batch"
+]
+
+
+def _iso_date(value):
     try:
-        print("=====================================")
-        print("SALES ANALYTICS SYSTEM")
-        print("=====================================\n")
-
-        print("[1/10] Reading sales data...")
-        raw_lines = read_sales_data("data/sales_data.txt")
-        print(f"✓ Successfully read {len(raw_lines)} transactions\n")
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date as YYYY-MM-DD, got '{value}'")
 
-        print("[2/10] Parsing and cleaning data...")
-        transactions = parse_transactions(raw_lines)
-        print(f"✓ Parsed {len(transactions)} records\n")
 
-        want_filter = input("Do you want to filter data? (y/n): ").strip().lower()
-
-        region = None
-        min_amount = None
-        max_amount = None
-
-        if want_filter == "y":
-            region = input("Enter region (or leave blank): ").strip()
-            region = region if region else None
-
-            min_amt = input("Enter minimum amount (or leave blank): ").strip()
-            min_amount = float(min_amt) if min_amt else None
-
-            max_amt = input("Enter maximum amount (or leave blank): ").strip()
-            max_amount = float(max_amt) if max_amt else None
+def _unique_error(value):
+    try:
+        error = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a relative error such as 0.01, got '{value}'")
+    try:
+        HyperLogLog(error)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return error
 
-        print("\n[4/10] Validating transactions...")
-        valid_transactions, invalid_count, summary = validate_and_filter(
-            transactions, region=region, min_amount=min_amount, max_amount=max_amount
-        )
-        print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}\n")
-
-        print("[5/10] Analyzing sales data...")
-        calculate_total_revenue(valid_transactions)
-        region_wise_sales(valid_transactions)
-        top_selling_products(valid_transactions)
-        customer_analysis(valid_transactions)
-        daily_sales_trend(valid_transactions)
-        find_peak_sales_day(valid_transactions)
-        low_performing_products(valid_transactions)
-        print("✓ Analysis complete\n")
 
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive whole number, got '{value}'")
+    return number
+
+
+def _report_formats(value):
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"expected a comma-separated list of {', '.join(REPORT_FORMATS)}")
+    return formats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument("--stream", action="store_true",
+                        help="process the input file in one lazy pass with bounded memory")
+    parser.add_argument("--heavy-hitters", type=_positive_int, metavar="CAPACITY",
+                        help="with --stream: track customers in a Space-Saving summary of this many counters "
+                             "(bounded memory, approximate top customers)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="parse, validate and aggregate the input file with this many processes")
+    parser.add_argument("--columnar", action="store_true",
+                        help="load the validated rows into a NumPy column table and run the analysis on it")
+    parser.add_argument("--batch", metavar="SCENARIO_FILE",
+                        help="run every filter scenario in a JSON file without prompts")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="number of processes used to render --batch scenarios")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process lines appended since the previous --incremental run")
+    parser.add_argument("--enriched-format", choices=FORMATS, default="pipe",
+                        help="format of the enriched output file")
+    parser.add_argument("--approx-unique", type=_unique_error, metavar="ERROR",
+                        help="count daily unique customers with HyperLogLog at this relative error (e.g. 0.01)")
+    parser.add_argument("--save-cube", nargs="?", const="output/sales_cube.txt", metavar="PATH",
+                        help="also save the date x region x product rollup cube (default output/sales_cube.txt)")
+    parser.add_argument("--api-url", default=API_URL,
+                        help="products endpoint (e.g. a local python -m utils.mock_api server)")
+    parser.add_argument("--catalog-ttl", type=int, default=3600,
+                        help="seconds a cached product catalog is used before revalidating it")
+    parser.add_argument("--offline", action="store_true",
+                        help="never call the products API, use the last cached catalog")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep the data in memory and answer analytics queries over HTTP (JSON)")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve")
+    parser.add_argument("--port", type=int, default=8080, help="port for --serve")
+    parser.add_argument("--reload-interval", type=float, default=2.0, metavar="SECONDS",
+                        help="with --serve: how often to check data/sales_data.txt for changes")
+    parser.add_argument("--partitions", metavar="SOURCE",
+                        help="read a directory or glob of partitioned sales files instead of data/sales_data.txt")
+    parser.add_argument("--from-date", type=_iso_date, metavar="YYYY-MM-DD",
+                        help="with --partitions: first date to include")
+    parser.add_argument("--to-date", type=_iso_date, metavar="YYYY-MM-DD",
+                        help="with --partitions: last date to include")
+    parser.add_argument("--sqlite", nargs="?", const=SQLITE_PATH, metavar="PATH",
+                        help=f"also load the validated, enriched transactions into a SQLite store "
+                             f"(default {SQLITE_PATH}) for ad-hoc queries")
+    parser.add_argument("--report-formats", type=_report_formats, default=["text"], metavar="FORMATS",
+                        help="comma-separated report formats: " + ", ".join(REPORT_FORMATS))
+    parser.add_argument("--metrics", default="output/pipeline_metrics.json", metavar="PATH",
+                        help="where to write per-stage timing/memory metrics (empty to disable)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record the tracemalloc peak of every stage (slower)")
+    parser.add_argument("--profile", choices=STAGES, metavar="STAGE",
+                        help="run cProfile on one stage: " + ", ".join(STAGES))
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always re-read and re-parse the input file instead of using data/.cache")
+    args = parser.parse_args(argv)
+
+    if args.heavy_hitters and not args.stream:
+        parser.error("--heavy-hitters only applies to --stream")
+    if (args.from_date or args.to_date) and not args.partitions:
+        parser.error("--from-date/--to-date only apply to --partitions")
+    if args.columnar:
+        if TransactionTable is None:
+            parser.error("--columnar needs numpy (pip install numpy)")
+        conflicts = [name for name, value in (("--workers", args.workers), ("--partitions", args.partitions),
+                                              ("--approx-unique", args.approx_unique), ("--stream", args.stream),
+                                              ("--incremental", args.incremental), ("--batch", args.batch),
+                                              ("--serve", args.serve)) if value]
+        if conflicts:
+            parser.error(f"--columnar cannot be combined with {', '.join(conflicts)}")
+    return args
+
+
+def build_pipeline(args, catalog_options, metrics, filters):
+    """
+    Expresses the default run as a graph of stages
+    The catalog download has no dependencies, so it runs while the sales
+    data is read, validated and analyzed; saving the enriched file and
+    writing the report both only need the enriched view and run side by
+    side. With --workers the workers need the catalog, so it is fetched
+    first (see _parallel_stages).
+    Returns: StageGraph (call run() to execute it)
+    """
+    region, min_amount, max_amount = filters
+    graph = StageGraph()
+
+    def fetch_products():
         print("[6/10] Fetching product data from API...")
-        products = fetch_all_products()
+        with metrics.stage("fetch_products") as record:
+            products = get_product_catalog(**catalog_options)
+            record["rows"] = len(products)
         print(f"✓ Fetched {len(products)} products\n")
+        return create_product_mapping(products)
+
+    def load():
+        if args.columnar:
+            print("[1-4/10] Reading, parsing and validating into a columnar table...")
+            with metrics.stage("load_columnar") as record:
+                summary = {}
+                fingerprints = input_fingerprints("data/sales_data.txt")
+                rows = iter_valid_transactions(iter_sales_records("data/sales_data.txt"), summary,
+                                               region=region, min_amount=min_amount, max_amount=max_amount)
+                table = TransactionTable.from_records(rows)
+                record["rows"] = summary["total_input"]
+            print(f"Available Regions: {sorted(summary['regions'])}\n"
+                  f"✓ Parsed {summary['total_input']} records\n"
+                  f"✓ Valid: {summary['final_count']} | Invalid: {summary['invalid']}\n")
+            return {"valid": table, "fingerprints": fingerprints}
+
+        if args.partitions:
+            print(f"[1-2/10] Reading partitions from {args.partitions}...")
+            with metrics.stage("load_partitions") as record:
+                transactions, input_files, skipped, fingerprints = load_partitions(
+                    args.partitions, region=region, start_date=args.from_date, end_date=args.to_date,
+                    workers=args.workers
+                )
+                record["rows"] = len(transactions)
+            print(f"✓ Read {len(transactions)} records from {len(input_files)} partitions "
+                  f"({len(skipped)} skipped)\n")
+            return {"transactions": transactions, "fingerprints": fingerprints}
+
+        # Fingerprint first, so rows appended during the load make the snapshot stale
+        fingerprints = input_fingerprints("data/sales_data.txt")
+        if not args.no_cache:
+            print("[1-2/10] Loading parsed sales data from cache...")
+        with metrics.stage("load_cache") as record:
+            cached = None if args.no_cache else load_cached_transactions("data/sales_data.txt")
+            record["rows"] = len(cached[1]) if cached is not None else 0
+
+        if cached is not None:
+            line_count, transactions = cached
+            print(f"✓ Loaded {len(transactions)} records ({line_count} lines) from cache\n")
+        else:
+            if not args.no_cache:
+                print("✓ No fresh cache, reading the file\n")
+            print("[1/10] Reading sales data...")
+            with metrics.stage("read_sales_data") as record:
+                # Fingerprint first, so rows appended during the read make the cache stale
+                fingerprint = None
+                if not args.no_cache and os.path.exists("data/sales_data.txt"):
+                    fingerprint = file_fingerprint("data/sales_data.txt")
+                raw_lines = read_sales_data("data/sales_data.txt")
+                record["rows"] = len(raw_lines)
+            print(f"✓ Successfully read {len(raw_lines)} transactions\n")
+
+            print("[2/10] Parsing and cleaning data...")
+            with metrics.stage("parse_transactions") as record:
+                transactions = parse_transactions(raw_lines)
+                record["rows"] = len(transactions)
+                if fingerprint is not None and raw_lines:
+                    save_cached_transactions("data/sales_data.txt", fingerprint, len(raw_lines), transactions)
+            print(f"✓ Parsed {len(transactions)} records\n")
+
+        return {"transactions": transactions, "fingerprints": fingerprints}
+
+    def validate(load):
+        if "valid" in load:
+            return load["valid"]
+
+        print("[4/10] Validating transactions...")
+        with metrics.stage("validate_and_filter", rows=len(load["transactions"])):
+            valid_transactions, invalid_count, summary = validate_and_filter(
+                load["transactions"], region=region, min_amount=min_amount, max_amount=max_amount
+            )
+        print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}\n")
+        return valid_transactions
 
-        product_mapping = create_product_mapping(products)
-
+    def analyze(load, validate):
+        print("[5/10] Analyzing sales data...")
+        with metrics.stage("analyze", rows=len(validate)) as record:
+            key = snapshot_key(load["fingerprints"], filters=[region, min_amount, max_amount],
+                               dates=[args.from_date, args.to_date], unique_error=args.approx_unique)
+            snapshot = None if args.no_cache else load_snapshot(key)
+            record["snapshot_cached"] = snapshot is not None
+            if snapshot is None and args.columnar:
+                snapshot = build_snapshot(validate)
+            elif snapshot is None:
+                aggregates = aggregate_sales(validate, unique_error=args.approx_unique, customer_products=False)
+                snapshot = build_snapshot(validate, aggregates=aggregates)
+                if not args.no_cache:
+                    save_snapshot(snapshot, key)
+        done = "✓ Analysis loaded from snapshot cache" if record["snapshot_cached"] else "✓ Analysis complete"
+        print(f"{done}\n")
+        return snapshot
+
+    def save_cube_file(validate):
+        with metrics.stage("save_cube", rows=len(validate)):
+            Path(args.save_cube).parent.mkdir(parents=True, exist_ok=True)
+            save_cube(build_cube(validate), args.save_cube)
+        print(f"✓ Date x region x product cube saved to: {args.save_cube}\n")
+
+    def enrich(fetch_products, validate):
         print("[7/10] Enriching sales data...")
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
-        enriched_success = sum(1 for t in enriched_transactions if t.get("enriched"))
-        print(f"✓ Enriched {enriched_success}/{len(valid_transactions)} transactions\n")
-
+        with metrics.stage("enrich", rows=len(validate)):
+            enriched_transactions = EnrichedTransactions(validate, fetch_products)
+            enrichment = {}
+            for _ in track_enrichment(enriched_transactions, enrichment):
+                pass
+        print(f"✓ Enriched {enrichment['enriched']}/{len(validate)} transactions\n")
+        return enriched_transactions, enrichment
+
+    def save_enriched(enrich):
         print("[8/10] Saving enriched data...")
-        print("✓ Saved to: data/enriched_sales_data.txt\n")
-
+        with metrics.stage("save_enriched", rows=len(enrich[0])):
+            save_enriched_data(enrich[0], fmt=args.enriched_format)
+        print(f"✓ Saved to: {ENRICHED_FILES[args.enriched_format]}\n")
+
+    def save_sqlite(enrich):
+        with metrics.stage("save_sqlite", rows=len(enrich[0])):
+            conn = open_store(args.sqlite)
+            try:
+                count = load_store(conn, enrich[0])
+            finally:
+                conn.close()
+        print(f"✓ Loaded {count} transactions into SQLite store: {args.sqlite}\n")
+
+    def generate_report(validate, analyze, enrich):
+        print("[9/10] Generating report...")
         Path("output").mkdir(exist_ok=True)
+        with metrics.stage("generate_report", rows=len(validate)):
+            reports = generate_sales_report(validate, enrich[0], enrichment=enrich[1],
+                                            snapshot=analyze, formats=args.report_formats)
+        return reports
+
+    graph.add("fetch_products", fetch_products)
+    if args.workers and not args.partitions:
+        return _parallel_stages(graph, args, metrics, filters)
+
+    graph.add("load", load)
+    graph.add("validate", validate, deps=["load"])
+    graph.add("analyze", analyze, deps=["load", "validate"])
+    if args.save_cube:
+        graph.add("save_cube", save_cube_file, deps=["validate"])
+    graph.add("enrich", enrich, deps=["fetch_products", "validate"])
+    graph.add("save_enriched", save_enriched, deps=["enrich"])
+    graph.add("generate_report", generate_report, deps=["validate", "analyze", "enrich"])
+    if args.sqlite:
+        graph.add("save_sqlite", save_sqlite, deps=["enrich"])
+    return graph
+
+
+def _parallel_stages(graph, args, metrics, filters):
+    """
+    Adds the --workers stages: the worker processes parse, validate,
+    aggregate, enrich and write their own byte ranges of the input file,
+    so only the merged aggregates and counters come back to this process
+    (the rows themselves only with --sqlite)
+    """
+    region, min_amount, max_amount = filters
+
+    def parallel_load(fetch_products):
+        print(f"[1-8/10] Reading, validating, analyzing, enriching and saving with {args.workers} workers...")
+        with metrics.stage("parallel_load") as record:
+            result = parallel_process(
+                "data/sales_data.txt", args.workers,
+                region=region, min_amount=min_amount, max_amount=max_amount, keep_rows=bool(args.sqlite),
+                unique_error=args.approx_unique, product_mapping=fetch_products,
+                enriched_file=ENRICHED_FILES[args.enriched_format], enriched_format=args.enriched_format,
+                cube=bool(args.save_cube)
+            )
+            summary = result["validation"]
+            record["rows"] = summary["total_input"]
+        print(f"✓ Parsed {summary['total_input']} records\n"
+              f"✓ Valid: {summary['final_count']} | Invalid: {summary['invalid']}\n"
+              f"✓ Enriched {result['enrichment']['enriched']}/{summary['final_count']} transactions\n"
+              f"✓ Saved to: {ENRICHED_FILES[args.enriched_format]}\n")
+        return result
+
+    def analyze(parallel_load):
+        with metrics.stage("analyze", rows=parallel_load["aggregates"]["transaction_count"]):
+            snapshot = build_snapshot([], aggregates=parallel_load["aggregates"])
+        return snapshot
+
+    def save_cube_file(parallel_load):
+        with metrics.stage("save_cube", rows=len(parallel_load["cube"])):
+            Path(args.save_cube).parent.mkdir(parents=True, exist_ok=True)
+            save_cube(parallel_load["cube"], args.save_cube)
+        print(f"✓ Date x region x product cube saved to: {args.save_cube}\n")
+
+    def save_sqlite(fetch_products, parallel_load):
+        rows = parallel_load["rows"]
+        with metrics.stage("save_sqlite", rows=len(rows)):
+            conn = open_store(args.sqlite)
+            try:
+                count = load_store(conn, EnrichedTransactions(rows, fetch_products))
+            finally:
+                conn.close()
+        print(f"✓ Loaded {count} transactions into SQLite store: {args.sqlite}\n")
+
+    def generate_report(analyze, parallel_load):
         print("[9/10] Generating report...")
-        generate_sales_report(valid_transactions, enriched_transactions)
-        print("✓ Report saved to: output/sales_report.txt\n")
+        Path("output").mkdir(exist_ok=True)
+        with metrics.stage("generate_report", rows=parallel_load["aggregates"]["transaction_count"]):
+            reports = generate_sales_report([], [], enrichment=parallel_load["enrichment"],
+                                            snapshot=analyze, formats=args.report_formats)
+        return reports
+
+    graph.add("parallel_load", parallel_load, deps=["fetch_products"])
+    graph.add("analyze", analyze, deps=["parallel_load"])
+    if args.save_cube:
+        graph.add("save_cube", save_cube_file, deps=["parallel_load"])
+    if args.sqlite:
+        graph.add("save_sqlite", save_sqlite, deps=["fetch_products", "parallel_load"])
+    graph.add("generate_report", generate_report, deps=["analyze", "parallel_load"])
+    return graph
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    catalog_options = {"url": args.api_url, "ttl": args.catalog_ttl, "offline": args.offline}
+    metrics = PipelineMetrics(trace_memory=args.trace_memory, profile_stage=args.profile)
+
+    try:
+        print("=====================================")
+        print("SALES ANALYTICS SYSTEM")
+        print("=====================================\n")
 
+        if args.batch:
+            with metrics.stage("batch"):
+                run_batch(args.batch, jobs=args.jobs, catalog_options=catalog_options,
+                          enriched_format=args.enriched_format, use_cache=not args.no_cache,
+                          formats=args.report_formats, unique_error=args.approx_unique)
+            return
+
+        if args.serve:
+            run_service(host=args.host, port=args.port, interval=args.reload_interval,
+                        catalog_options=catalog_options, unique_error=args.approx_unique)
+            return
+
+        if args.stream:
+            region, min_amount, max_amount = ask_filters()
+            with metrics.stage("streaming_pipeline"):
+                run_streaming(catalog_options=catalog_options, enriched_format=args.enriched_format,
+                              unique_error=args.approx_unique, filters=(region, min_amount, max_amount),
+                              customer_capacity=args.heavy_hitters)
+            return
+
+        if args.incremental:
+            region, min_amount, max_amount = ask_filters()
+            with metrics.stage("incremental_pipeline"):
+                run_incremental(catalog_options=catalog_options, enriched_format=args.enriched_format,
+                                unique_error=args.approx_unique, filters=(region, min_amount, max_amount))
+            return
+
+        # Filters are asked up front so every stage below can run unattended
+        region, min_amount, max_amount = ask_filters()
+        print()
+
+        results = build_pipeline(args, catalog_options, metrics, (region, min_amount, max_amount)).run()
+
+        print(f"✓ Report saved to: {', '.join(results['generate_report'].values())}\n")
         print("[10/10] Process Complete!")
         print("=====================================")
 
     except Exception as e:
         print(f"Error: {e}")
 
+    finally:
+        if metrics.stages and args.metrics:
+            try:
+                metrics.save(args.metrics)
+                print(f"Metrics saved to: {args.metrics}")
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
+
 
 if __name__ == "__main__":
     main()
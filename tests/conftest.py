@@ -0,0 +1,52 @@
+# tests/conftest.py
+
+import pytest
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+# UnitPrice keeps the thousands separator some real rows have
+PRODUCTS = [("P101", "Laptop", "45,000"), ("P102", "Mouse", "801"), ("P103", "Keyboard", "1476"),
+            ("P104", "Monitor", "14591"), ("P105", "Webcam", "2413")]
+REGIONS = ["North", "South", "East", "West"]
+
+
+def _line(i, invalid=False):
+    product_id, name, price = PRODUCTS[i % len(PRODUCTS)]
+    quantity = 0 if invalid else i % 7 + 1
+    return (f"T{i:03d}|2024-12-{i % 28 + 1:02d}|{product_id}|{name}|{quantity}|{price}|"
+            f"C{i % 9:03d}|{REGIONS[i % len(REGIONS)]}\n")
+
+
+@pytest.fixture
+def sales_header():
+    return HEADER
+
+
+@pytest.fixture
+def sales_line():
+    """
+    Factory for line i of the synthetic sales data (invalid=True gives
+    the row a zero quantity). Every field has a fixed width, so lines
+    i and i + 20 have the same length.
+    """
+    return _line
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    """
+    Factory that writes a header plus rows start .. start + count - 1 to
+    tmp_path / name and returns the path. Every invalid_every-th row is
+    invalid.
+    """
+    def write(count, start=0, invalid_every=0, trailing_newline=True, name="sales.txt"):
+        lines = [_line(i, invalid=bool(invalid_every) and i % invalid_every == 0)
+                 for i in range(start, start + count)]
+        text = HEADER + "".join(lines)
+        if lines and not trailing_newline:
+            text = text[:-1]
+        path = tmp_path / name
+        path.write_bytes(text.encode("utf-8"))
+        return path
+
+    return write
@@ -0,0 +1,120 @@
+# tests/test_api_handler.py
+
+import pytest
+import requests
+
+from utils import api_handler
+from utils.api_handler import fetch_catalog, get_product_catalog
+from utils.mock_api import make_catalog, start_mock_server
+
+
+@pytest.fixture
+def mock_api(request):
+    options = getattr(request, "param", {})
+    server, url = start_mock_server(make_catalog(250), **options)
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_catalog_pages_through_every_product(mock_api):
+    server, url = mock_api
+
+    result = fetch_catalog(url, page_size=100, backoff=0)
+
+    assert [p["id"] for p in result["products"]] == list(range(1, 251))
+    assert result["failed_pages"] == 0
+    assert not result["not_modified"]
+    assert [(p["skip"], p["count"]) for p in result["pages"]] == [(0, 100), (100, 100), (200, 50)]
+    assert all(p["etag"] for p in result["pages"])
+    assert server.request_count == 3
+
+
+@pytest.mark.parametrize("mock_api", [{"max_limit": 30}], indirect=True)
+def test_fetch_catalog_follows_a_capped_page_length(mock_api):
+    server, url = mock_api
+
+    result = fetch_catalog(url, page_size=100, backoff=0)
+
+    assert [p["id"] for p in result["products"]] == list(range(1, 251))
+    assert result["failed_pages"] == 0
+    assert server.request_count == 9
+
+
+def test_fetch_catalog_counts_short_pages_as_failed(mock_api, monkeypatch):
+    server, url = mock_api
+    original = api_handler.fetch_product_page
+
+    def fetch(session, url, skip, *args, **kwargs):
+        if skip:
+            # The catalog shrinks after the first page reported its size
+            del server.products[200:]
+        return original(session, url, skip, *args, **kwargs)
+
+    monkeypatch.setattr(api_handler, "fetch_product_page", fetch)
+    result = fetch_catalog(url, page_size=100, max_workers=1, backoff=0)
+
+    assert len(result["products"]) == 200
+    assert result["failed_pages"] == 1
+
+
+@pytest.mark.parametrize("mock_api", [{"fail_every": 2}], indirect=True)
+def test_fetch_catalog_retries_503(mock_api):
+    server, url = mock_api
+
+    result = fetch_catalog(url, page_size=50, max_workers=1, backoff=0)
+
+    assert len(result["products"]) == 250
+    assert result["failed_pages"] == 0
+    # 5 pages, every second request answered with 503 and retried
+    assert server.request_count == 9
+
+
+@pytest.mark.parametrize("mock_api", [{"fail_every": 1}], indirect=True)
+def test_fetch_catalog_gives_up_after_retries(mock_api):
+    server, url = mock_api
+
+    with pytest.raises(requests.HTTPError):
+        fetch_catalog(url, retries=2, backoff=0)
+    assert server.request_count == 3
+
+
+def test_fetch_catalog_revalidates_every_page(mock_api):
+    server, url = mock_api
+    first = fetch_catalog(url, page_size=100, backoff=0)
+
+    result = fetch_catalog(url, page_size=100, backoff=0, previous=first)
+
+    assert result["not_modified"]
+    assert result["products"] == first["products"]
+    assert server.request_count == 6
+
+
+def test_fetch_catalog_picks_up_changes_on_later_pages(mock_api):
+    server, url = mock_api
+    first = fetch_catalog(url, page_size=100, backoff=0)
+    server.products[180] = dict(server.products[180], title="Renamed")
+
+    result = fetch_catalog(url, page_size=100, backoff=0, previous=first)
+
+    assert not result["not_modified"]
+    assert result["products"][180]["title"] == "Renamed"
+    assert result["products"][:180] == first["products"][:180]
+
+
+def test_get_product_catalog_revalidates_expired_snapshot(mock_api, tmp_path, monkeypatch):
+    server, url = mock_api
+    monkeypatch.setattr(api_handler, "_memory_catalogs", api_handler.OrderedDict())
+
+    first = get_product_catalog(url, ttl=0, cache_dir=str(tmp_path), page_size=100, backoff=0)
+    requests_after_fetch = server.request_count
+    second = get_product_catalog(url, ttl=0, cache_dir=str(tmp_path), page_size=100, backoff=0)
+
+    assert len(first) == 250
+    assert second == first
+    # The expired snapshot costs one conditional request per page
+    assert server.request_count == requests_after_fetch + 3
+
+    server.products[-1] = dict(server.products[-1], brand="Changed")
+    third = get_product_catalog(url, ttl=0, cache_dir=str(tmp_path), page_size=100, backoff=0)
+    assert third[-1]["brand"] == "Changed"
@@ -0,0 +1,66 @@
+# tests/test_cache.py
+
+import os
+
+from utils.cache import file_fingerprint, load_cached_transactions, load_transactions, save_cached_transactions
+from utils.file_handler import parse_transactions, read_sales_data
+
+
+def _cache(path, cache_dir):
+    fingerprint = file_fingerprint(str(path))
+    lines = read_sales_data(str(path))
+    save_cached_transactions(str(path), fingerprint, len(lines), parse_transactions(lines), str(cache_dir))
+
+
+def test_cached_records_equal_a_fresh_parse(sales_file, tmp_path):
+    path = sales_file(200, invalid_every=9)
+    _cache(path, tmp_path / "cache")
+
+    line_count, transactions = load_cached_transactions(str(path), str(tmp_path / "cache"))
+
+    assert line_count == 200
+    assert transactions == parse_transactions(read_sales_data(str(path)))
+    assert [t.amount for t in transactions] == [t["Quantity"] * t["UnitPrice"] for t in transactions]
+
+
+def test_changed_file_makes_the_cache_stale(sales_file, sales_line, tmp_path):
+    path = sales_file(20)
+    _cache(path, tmp_path / "cache")
+
+    with open(path, "a") as f:
+        f.write(sales_line(20))
+
+    assert load_cached_transactions(str(path), str(tmp_path / "cache")) is None
+
+
+def test_touched_but_unchanged_file_keeps_the_cache(sales_file, tmp_path):
+    path = sales_file(20)
+    _cache(path, tmp_path / "cache")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert load_cached_transactions(str(path), str(tmp_path / "cache")) is not None
+    # The refreshed fingerprint makes the next check a plain stat again
+    assert load_cached_transactions(str(path), str(tmp_path / "cache")) is not None
+
+
+def test_same_size_rewrite_is_caught_by_the_hash(sales_file, tmp_path):
+    path = sales_file(5)
+    _cache(path, tmp_path / "cache")
+    stat = os.stat(path)
+
+    sales_file(5, start=20)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert load_cached_transactions(str(path), str(tmp_path / "cache")) is None
+
+
+def test_load_transactions_fills_the_cache(sales_file, tmp_path, monkeypatch):
+    path = sales_file(30)
+    monkeypatch.chdir(tmp_path)
+
+    first = load_transactions(str(path))
+    second = load_transactions(str(path))
+
+    assert first[2] is False and second[2] is True
+    assert first[:2] == second[:2]
@@ -0,0 +1,46 @@
+# tests/test_columnar.py
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from utils import columnar, data_processor
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.report import build_snapshot
+
+
+@pytest.fixture
+def valid(sales_file):
+    rows, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(300, invalid_every=13)))))
+    return rows
+
+
+def test_table_round_trips_the_records(valid):
+    table = columnar.TransactionTable.from_records(valid, chunk_rows=64)
+
+    assert len(table) == len(valid)
+    assert list(table) == valid
+    assert table[5] == valid[5]
+
+
+@pytest.mark.parametrize("name", ["calculate_total_revenue", "region_wise_sales", "top_selling_products",
+                                  "customer_analysis", "top_customers", "daily_sales_trend",
+                                  "find_peak_sales_day", "low_performing_products"])
+def test_vectorized_functions_match_the_list_versions(valid, name):
+    table = columnar.TransactionTable.from_records(valid, chunk_rows=64)
+
+    expected = getattr(data_processor, name)(valid)
+    result = getattr(columnar, name)(table)
+
+    if isinstance(expected, float):
+        assert result == pytest.approx(expected)
+    else:
+        assert result == expected
+    if isinstance(expected, dict):
+        assert list(result) == list(expected)
+
+
+def test_snapshot_from_a_table_matches_the_list_snapshot(valid):
+    table = columnar.TransactionTable.from_records(valid)
+
+    assert build_snapshot(table) == build_snapshot(valid)
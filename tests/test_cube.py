@@ -0,0 +1,62 @@
+# tests/test_cube.py
+
+import pytest
+
+from utils import data_processor
+from utils.cube import build_cube, cube_aggregates, daily_sales, load_cube, merge_cubes, rollup, save_cube
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+
+@pytest.fixture
+def valid(sales_file):
+    rows, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(300, invalid_every=11)))))
+    return rows
+
+
+@pytest.mark.parametrize("name", ["calculate_total_revenue", "region_wise_sales", "top_selling_products",
+                                  "find_peak_sales_day", "low_performing_products"])
+def test_functions_answer_from_the_cube(valid, name):
+    function = getattr(data_processor, name)
+
+    result = function(None, aggregates=cube_aggregates(build_cube(valid)))
+
+    assert result == function(valid)
+    if isinstance(result, dict):
+        assert list(result) == list(function(valid))
+
+
+def test_cube_aggregates_have_no_customers(valid):
+    aggregates = cube_aggregates(build_cube(valid))
+
+    assert aggregates["customers"] == {}
+    assert all("customers" not in day for day in aggregates["daily"].values())
+
+
+def test_merged_cubes_equal_one_cube(valid):
+    merged = merge_cubes(build_cube(valid[:100]), build_cube(valid[100:]))
+
+    assert merged == build_cube(valid)
+
+
+def test_saved_cube_loads_back(valid, tmp_path):
+    cube = build_cube(valid)
+    save_cube(cube, str(tmp_path / "cube.txt"))
+
+    assert load_cube(str(tmp_path / "cube.txt")) == cube
+
+
+def test_rollups_match_the_transactions(valid):
+    cube = build_cube(valid)
+
+    by_region_product = rollup(cube, ("region", "product"))
+    for (region, product), stats in by_region_product.items():
+        rows = [t for t in valid if t.Region == region and t.ProductName == product]
+        assert stats == {"qty": sum(t.Quantity for t in rows), "revenue": sum(t.amount for t in rows),
+                         "transaction_count": len(rows)}
+
+    months = daily_sales(cube, "month")
+    assert list(months) == ["2024-12"]
+    assert months["2024-12"]["transaction_count"] == len(valid)
+    weeks = daily_sales(cube, "week")
+    assert list(weeks) == sorted(weeks)
+    assert sum(w["revenue"] for w in weeks.values()) == data_processor.calculate_total_revenue(valid)
@@ -0,0 +1,85 @@
+# tests/test_hyperloglog.py
+
+import math
+
+import pytest
+
+from utils.data_processor import aggregate_sales, daily_sales_trend, unique_customers_by_period
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.records import Transaction
+from utils.sketches import HyperLogLog, SET_BYTES_PER_ITEM
+
+
+def test_hyperloglog_is_exact_while_small():
+    sketch = HyperLogLog(0.01)
+    limit = sketch.m // SET_BYTES_PER_ITEM
+    for i in range(limit):
+        sketch.add(f"C{i}")
+        sketch.add(f"C{i}")
+
+    assert sketch.registers is None
+    assert len(sketch) == limit
+
+    sketch.add("one more")
+    assert sketch.registers is not None
+
+
+@pytest.mark.parametrize("error", [0.05, 0.02, 0.01])
+def test_hyperloglog_error_bound(error):
+    sketch = HyperLogLog(error)
+    actual = 50000
+    for i in range(actual):
+        sketch.add(f"C{i}")
+
+    standard_error = 1.04 / math.sqrt(sketch.m)
+    assert standard_error <= error
+    assert abs(len(sketch) - actual) / actual < 4 * standard_error
+
+
+def test_hyperloglog_union_matches_a_single_sketch():
+    parts = [HyperLogLog(0.02) for _ in range(3)]
+    whole = HyperLogLog(0.02)
+    for i in range(30000):
+        parts[i % 3].add(i)
+        whole.add(i)
+    parts[0].add(5)  # overlaps are not counted twice
+
+    merged = HyperLogLog.union(parts)
+
+    assert merged.registers == whole.registers
+    assert len(parts[0]) < len(merged)
+
+
+def test_hyperloglog_rejects_unreachable_errors():
+    with pytest.raises(ValueError, match="below what precision 16"):
+        HyperLogLog(0.001)
+    for error in (0, -0.1, 1, 2):
+        with pytest.raises(ValueError):
+            HyperLogLog(error)
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=17)
+
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=10).__ior__(HyperLogLog(precision=11))
+
+
+def test_daily_trend_with_sketches_matches_the_exact_counts(sales_file):
+    # Few customers per day, so the sketches are still exact sets
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(300)))))
+    exact = daily_sales_trend(valid)
+
+    assert daily_sales_trend(valid, unique_error=0.02) == exact
+    sketched = aggregate_sales(valid, unique_error=0.02)
+    assert daily_sales_trend(None, aggregates=sketched) == exact
+    assert unique_customers_by_period(None, "week", aggregates=sketched) == unique_customers_by_period(valid, "week")
+
+
+def test_daily_trend_estimates_stay_within_the_error():
+    rows = [Transaction(f"T{i}", f"2024-12-0{i % 2 + 1}", "P101", "Laptop", 1, 10.0, f"C{i}", "North")
+            for i in range(40000)]
+
+    trend = daily_sales_trend(rows, unique_error=0.02)
+
+    for stats in trend.values():
+        assert stats["transaction_count"] == 20000
+        assert abs(stats["unique_customers"] - 20000) / 20000 < 4 * 0.02
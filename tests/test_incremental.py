@@ -0,0 +1,105 @@
+# tests/test_incremental.py
+
+import io
+
+from utils.data_processor import aggregate_sales
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.incremental import CHECK_BYTES, complete_end, data_start, process_incremental, save_state, tail_hash
+
+
+def _run(path, state_dir):
+    state, rows, resumed = process_incremental(str(path), state_dir=str(state_dir))
+    save_state(str(path), state, str(state_dir))
+    return state, rows, resumed
+
+
+def test_complete_end_stops_after_the_last_newline():
+    data = b"header\nrow 1\nrow 2 still being writ"
+    assert complete_end(io.BytesIO(data), len(data)) == len(b"header\nrow 1\n")
+    assert complete_end(io.BytesIO(b"no newline"), 10) == 0
+
+    long_tail = b"a\n" + b"x" * (3 * CHECK_BYTES)
+    assert complete_end(io.BytesIO(long_tail), len(long_tail)) == 2
+
+
+def test_data_start_skips_the_header(sales_header, sales_line):
+    data = (sales_header + sales_line(1)).encode("utf-8")
+    assert data_start(io.BytesIO(data), len(data)) == len(sales_header)
+    assert data_start(io.BytesIO(b"header only"), 0) == 0
+
+
+def test_tail_hash_only_looks_at_the_bytes_before_offset():
+    data = b"x" * (CHECK_BYTES + 10) + b"tail"
+    changed_head = b"y" * 10 + data[10:]
+
+    assert tail_hash(io.BytesIO(data), len(data)) == tail_hash(io.BytesIO(changed_head), len(data))
+    assert tail_hash(io.BytesIO(data), 20) != tail_hash(io.BytesIO(changed_head), 20)
+
+
+def test_appended_lines_are_read_once(tmp_path, sales_file, sales_line):
+    path = sales_file(5)
+
+    state, rows, resumed = _run(path, tmp_path / "state")
+    assert not resumed
+    assert len(rows) == 5
+    assert state["offset"] == path.stat().st_size
+
+    with open(path, "a") as f:
+        f.write(sales_line(5) + sales_line(6))
+    state, rows, resumed = _run(path, tmp_path / "state")
+    assert resumed
+    assert [t["TransactionID"] for t in rows] == ["T005", "T006"]
+    assert state["aggregates"]["transaction_count"] == 7
+    assert state["validation"]["total_input"] == 7
+
+    state, rows, resumed = _run(path, tmp_path / "state")
+    assert resumed and rows == []
+    assert state["aggregates"]["transaction_count"] == 7
+
+
+def test_partial_last_line_waits_for_the_next_run(tmp_path, sales_header, sales_line):
+    path = tmp_path / "sales.txt"
+    line = sales_line(1)
+    path.write_text(sales_header + sales_line(0) + line[:10])
+
+    state, rows, _ = _run(path, tmp_path / "state")
+    assert len(rows) == 1
+
+    with open(path, "a") as f:
+        f.write(line[10:])
+    state, rows, resumed = _run(path, tmp_path / "state")
+    assert resumed
+    assert [t["TransactionID"] for t in rows] == ["T001"]
+
+
+def test_rewritten_file_is_processed_from_the_start(tmp_path, sales_file):
+    path = sales_file(5)
+    _run(path, tmp_path / "state")
+
+    size = path.stat().st_size
+
+    # Same size, different contents: only the tail hash can tell
+    sales_file(5, start=20)
+    assert path.stat().st_size == size
+    state, rows, resumed = _run(path, tmp_path / "state")
+
+    assert not resumed
+    assert [t["TransactionID"] for t in rows] == ["T020", "T021", "T022", "T023", "T024"]
+    assert state["aggregates"]["transaction_count"] == 5
+
+
+def test_resumed_state_matches_a_full_run(tmp_path, sales_file, sales_line):
+    path = sales_file(60, invalid_every=7)
+    _run(path, tmp_path / "state")
+    with open(path, "a") as f:
+        f.write("".join(sales_line(i, invalid=i % 7 == 0) for i in range(60, 100)))
+
+    state, rows, resumed = _run(path, tmp_path / "state")
+    valid, invalid_count, _ = validate_and_filter(parse_transactions(read_sales_data(str(path))))
+    expected = aggregate_sales(valid, customer_products=False)
+
+    assert resumed
+    assert [t["TransactionID"] for t in rows] == [t["TransactionID"] for t in valid if t["TransactionID"] >= "T060"]
+    for key in ("total_revenue", "transaction_count", "regions", "products", "customers", "daily"):
+        assert state["aggregates"][key] == expected[key]
+    assert state["validation"]["invalid"] == invalid_count
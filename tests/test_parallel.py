@@ -0,0 +1,84 @@
+# tests/test_parallel.py
+
+import pytest
+
+from utils.api_handler import EnrichedTransactions, save_enriched_data
+from utils.cube import build_cube
+from utils.data_processor import aggregate_sales
+from utils.file_handler import iter_sales_records, parse_transactions, read_sales_data, validate_and_filter
+from utils.parallel import parallel_process, split_byte_ranges
+
+MAPPING = {101: {"title": "Laptop Pro", "category": "laptops", "brand": "Acme", "rating": 4.5},
+           103: {"title": "Keyboard", "category": "accessories", "brand": "Keys", "rating": 4.1}}
+
+
+@pytest.mark.parametrize("count", [1, 7, 100])
+@pytest.mark.parametrize("parts", [1, 2, 3, 8, 500])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_ranges_cover_the_data_on_line_boundaries(sales_file, sales_header, count, parts, trailing_newline):
+    path = sales_file(count, trailing_newline=trailing_newline)
+    data = path.read_bytes()
+
+    ranges = split_byte_ranges(str(path), parts)
+
+    assert ranges[0][0] == len(sales_header)
+    assert ranges[-1][1] == len(data)
+    assert len(ranges) <= parts
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1:start] == b"\n"
+    assert all(start < end for start, end in ranges)
+
+
+@pytest.mark.parametrize("parts", [1, 3, 8])
+def test_ranges_parse_to_the_same_records(sales_file, parts):
+    path = sales_file(50)
+
+    whole = list(iter_sales_records(str(path)))
+    pieces = [t for start, end in split_byte_ranges(str(path), parts)
+              for t in iter_sales_records(str(path), start, end)]
+
+    assert [t["TransactionID"] for t in pieces] == [t["TransactionID"] for t in whole]
+    assert len(whole) == 50
+
+
+def test_header_only_file_has_no_rows(sales_file):
+    path = sales_file(0)
+
+    ranges = split_byte_ranges(str(path), 4)
+
+    assert all(start >= end for start, end in ranges)
+    assert [t for start, end in ranges for t in iter_sales_records(str(path), start, end)] == []
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_process_matches_the_serial_pipeline(sales_file, tmp_path, workers):
+    path = sales_file(200, invalid_every=11)
+    valid, invalid_count, summary = validate_and_filter(parse_transactions(read_sales_data(str(path))))
+    expected = aggregate_sales(valid, customer_products=False)
+    save_enriched_data(EnrichedTransactions(valid, MAPPING), str(tmp_path / "serial.txt"))
+
+    result = parallel_process(str(path), workers, product_mapping=MAPPING,
+                              enriched_file=str(tmp_path / "parallel.txt"), cube=True)
+
+    aggregates = result["aggregates"]
+    for key in ("total_revenue", "transaction_count", "regions", "products", "customers", "daily"):
+        assert aggregates[key] == expected[key]
+    # Merging in file order keeps the first-appearance order of the keys
+    assert list(aggregates["products"]) == list(expected["products"])
+    assert result["validation"]["invalid"] == invalid_count
+    assert result["validation"]["final_count"] == summary["final_count"]
+    assert result["cube"] == build_cube(valid)
+    assert (tmp_path / "parallel.txt").read_bytes() == (tmp_path / "serial.txt").read_bytes()
+    assert result["enrichment"]["enriched"] == sum(t["ProductID"] in ("P101", "P103") for t in valid)
+
+
+def test_parallel_process_applies_the_filters(sales_file):
+    path = sales_file(120)
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(path))),
+                                      region="north", min_amount=2000)
+
+    result = parallel_process(str(path), 2, region="north", min_amount=2000, keep_rows=True)
+
+    assert result["rows"] == valid
+    assert result["aggregates"]["transaction_count"] == len(valid)
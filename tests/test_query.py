@@ -0,0 +1,47 @@
+# tests/test_query.py
+
+import pytest
+
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.query import TransactionQuery
+
+FILTERS = [
+    {},
+    {"region": "north"},
+    {"region": "WEST", "min_amount": 5000},
+    {"min_amount": 2000, "max_amount": 50000},
+    {"max_amount": 1000},
+    {"region": "South", "min_amount": 10 ** 9},
+    {"region": "Atlantis"},
+]
+
+
+@pytest.fixture
+def parsed(sales_file):
+    return parse_transactions(read_sales_data(str(sales_file(400, invalid_every=9))))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filter_matches_validate_and_filter(parsed, filters):
+    query = TransactionQuery(parsed)
+
+    assert query.filter(**filters) == validate_and_filter(parsed, **filters)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_added_rows_are_indexed_like_a_rebuild(parsed, filters):
+    # A few rows go in by bisection, a large batch by sort and merge
+    query = TransactionQuery(parsed[:300])
+    query.add(parsed[300:303])
+    query.add(parsed[303:])
+
+    assert query.filter(**filters) == TransactionQuery(parsed).filter(**filters)
+
+
+def test_dictionaries_are_indexed_as_records(parsed):
+    query = TransactionQuery([dict(t) for t in parsed])
+    valid, _, _ = validate_and_filter(parsed)
+
+    assert query.transactions == valid
+    assert query.count("north", min_amount=1000) == len(query.positions("north", min_amount=1000))
+    assert query.amount_range() == (min(t.amount for t in valid), max(t.amount for t in valid))
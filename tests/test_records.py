@@ -0,0 +1,60 @@
+# tests/test_records.py
+
+import pickle
+
+import pytest
+
+from utils.data_processor import aggregate_sales
+from utils.file_handler import iter_valid_transactions, parse_transactions, read_sales_data, validate_and_filter
+from utils.records import FIELDS, Transaction, as_transaction
+
+
+def _record():
+    return Transaction("T001", "2024-12-01", "P101", "Laptop", 2, 45000.0, "C001", "North")
+
+
+def test_record_behaves_like_the_dictionary():
+    t = _record()
+    d = dict(t)
+
+    assert list(d) == list(FIELDS)
+    assert t == d and d == t
+    assert t["Region"] == t.Region == "North"
+    assert t.get("Missing", "x") == "x"
+    assert "Quantity" in t and "amount" not in t
+    assert t.amount == 90000.0
+    with pytest.raises(KeyError):
+        t["amount"]
+
+
+def test_record_pickles_and_interns():
+    t = _record()
+    copy = pickle.loads(pickle.dumps(t))
+
+    assert copy == t and copy.amount == t.amount
+    other = Transaction("T002", "".join(["2024-12-", "01"]), "P101", "Laptop", 1, 1.0, "C001", "North")
+    assert other.Date is t.Date
+
+
+def test_as_transaction_converts_mappings():
+    t = _record()
+
+    assert as_transaction(t) is t
+    assert type(as_transaction(dict(t))) is Transaction
+    assert as_transaction(dict(t)).amount == t.amount
+    with pytest.raises(KeyError):
+        as_transaction({"Region": "North"})
+
+
+def test_validation_returns_records_for_dictionaries(sales_file):
+    parsed = parse_transactions(read_sales_data(str(sales_file(100, invalid_every=7))))
+    dicts = [dict(t) for t in parsed] + [{"Region": "North"}, {**dict(parsed[1]), "Date": None}]
+
+    valid, invalid_count, _ = validate_and_filter(dicts)
+    summary = {}
+    streamed = list(iter_valid_transactions(dicts, summary))
+
+    assert valid == streamed == validate_and_filter(parsed)[0]
+    assert all(type(t) is Transaction for t in valid + streamed)
+    assert invalid_count == summary["invalid"] == validate_and_filter(parsed)[1] + 2
+    assert aggregate_sales(valid)["total_revenue"] == sum(t.amount for t in valid)
@@ -0,0 +1,107 @@
+# tests/test_report.py
+
+import csv
+import json
+import os
+
+import pytest
+
+from utils.data_processor import aggregate_sales
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.report import (
+    build_snapshot,
+    input_fingerprints,
+    load_snapshot,
+    render_report,
+    save_snapshot,
+    snapshot_key,
+    with_enrichment
+)
+
+
+@pytest.fixture
+def snapshot(sales_file):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(150, invalid_every=8)))))
+    return build_snapshot(valid)
+
+
+def _without_time(snapshot):
+    return {k: v for k, v in snapshot.items() if k != "computed"}
+
+
+def test_snapshot_from_aggregates_matches_a_scan(sales_file):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(150)))))
+
+    scanned = build_snapshot(valid)
+    aggregated = build_snapshot(valid, aggregates=aggregate_sales(valid, customer_products=False))
+
+    assert _without_time(aggregated) == _without_time(scanned)
+    assert scanned["total_transactions"] == 150
+    assert json.loads(json.dumps(scanned)) == scanned
+
+
+def test_key_follows_the_fingerprint_taken_before_reading(sales_file, sales_line):
+    path = sales_file(20)
+    before = input_fingerprints(str(path))
+    with open(path, "a") as f:
+        f.write(sales_line(20))
+
+    old = snapshot_key(before, filters=[None, None, None])
+    new = snapshot_key(input_fingerprints(str(path)), filters=[None, None, None])
+    other = snapshot_key(before, filters=["North", None, None])
+
+    assert old != new
+    assert old.split("-")[0] == new.split("-")[0]
+    assert other.split("-")[0] != old.split("-")[0]
+    assert input_fingerprints(str(path) + ".missing")[0]["missing"]
+
+
+def test_saving_prunes_older_snapshots_of_the_same_input(sales_file, sales_line, snapshot, tmp_path):
+    cache = str(tmp_path / "cache")
+    path = sales_file(20)
+    old = snapshot_key(input_fingerprints(str(path)), unique_error=None)
+    other = snapshot_key(input_fingerprints(str(path)), unique_error=0.02)
+    save_snapshot(snapshot, old, cache)
+    save_snapshot(snapshot, other, cache)
+
+    with open(path, "a") as f:
+        f.write(sales_line(20))
+    new = snapshot_key(input_fingerprints(str(path)), unique_error=None)
+    save_snapshot(snapshot, new, cache)
+
+    assert load_snapshot(old, cache) is None
+    assert load_snapshot(new, cache) == snapshot
+    assert load_snapshot(other, cache) == snapshot
+    assert len(os.listdir(cache)) == 2
+
+
+def test_snapshot_of_another_version_is_ignored(snapshot, tmp_path):
+    save_snapshot(dict(snapshot, version=-1), "abc-def", str(tmp_path))
+
+    assert load_snapshot("abc-def", str(tmp_path)) is None
+
+
+def test_every_format_renders_the_snapshot(snapshot, tmp_path):
+    snapshot = with_enrichment(snapshot, {"total": 4, "enriched": 3, "not_enriched_products": {"Mouse"}})
+
+    paths = render_report(snapshot, str(tmp_path / "report.txt"), formats=("text", "json", "csv", "html"))
+
+    assert sorted(os.path.basename(p) for p in paths.values()) == [
+        "report.csv", "report.html", "report.json", "report.txt"]
+    with open(paths["json"], encoding="utf-8") as f:
+        rendered = json.load(f)
+    assert {k: v for k, v in rendered.items() if k != "generated"} == snapshot
+    with open(paths["csv"], encoding="utf-8", newline="") as f:
+        rows = {(row[0], row[1], row[2]): row[3] for row in csv.reader(f)}
+    assert float(rows[("summary", "", "total_revenue")]) == snapshot["total_revenue"]
+    assert rows[("not_enriched_product", "Mouse", "")] == ""
+    with open(paths["text"], encoding="utf-8") as f:
+        assert f"Total Revenue: ₹{snapshot['total_revenue']:,.2f}" in f.read()
+    with open(paths["html"], encoding="utf-8") as f:
+        assert "<table" in f.read()
+
+
+def test_unknown_report_format_is_rejected(snapshot, tmp_path):
+    with pytest.raises(ValueError, match="Unknown report format"):
+        render_report(snapshot, str(tmp_path / "report.txt"), formats=("text", "pdf"))
+    assert not os.path.exists(tmp_path / "report.txt")
@@ -0,0 +1,49 @@
+# tests/test_scheduler.py
+
+import threading
+
+import pytest
+
+from utils.scheduler import StageGraph
+
+
+def test_stages_get_their_dependencies_results():
+    graph = StageGraph()
+    graph.add("total", lambda rows, factor: sum(rows) * factor, deps=["rows", "factor"])
+    graph.add("rows", lambda: [1, 2, 3])
+    graph.add("factor", lambda: 10)
+
+    assert graph.run() == {"rows": [1, 2, 3], "factor": 10, "total": 60}
+    assert graph.order().index("total") == 2
+
+
+def test_independent_stages_overlap():
+    # Each stage waits for the other to start, so this only finishes if both run at once
+    barrier = threading.Barrier(2, timeout=5)
+    graph = StageGraph(workers=2)
+    graph.add("fetch", lambda: barrier.wait() is not None)
+    graph.add("parse", lambda: barrier.wait() is not None)
+
+    assert graph.run() == {"fetch": True, "parse": True}
+
+
+def test_failed_stage_stops_its_dependents():
+    started = []
+    graph = StageGraph()
+    graph.add("load", lambda: 1 / 0)
+    graph.add("report", lambda load: started.append("report"), deps=["load"])
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
+    assert started == []
+
+
+def test_bad_graphs_are_rejected():
+    graph = StageGraph().add("a", lambda b: b, deps=["b"]).add("b", lambda a: a, deps=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        graph.run()
+
+    with pytest.raises(ValueError, match="Unknown stage"):
+        StageGraph().add("a", lambda x: x, deps=["x"]).order()
+    with pytest.raises(ValueError, match="already defined"):
+        StageGraph().add("a", int).add("a", int)
@@ -0,0 +1,79 @@
+# tests/test_service.py
+
+import os
+from http import HTTPStatus
+
+import pytest
+
+from utils import data_processor
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.service import AnalyticsStore, handle_request
+
+AGGREGATE_KEYS = ("total_revenue", "transaction_count", "regions", "products", "customers", "daily")
+
+
+def _bump_mtime(path):
+    # Make sure a rewrite within the same clock tick is seen as a change
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def store(sales_file):
+    store = AnalyticsStore(str(sales_file(120, invalid_every=9)))
+    store.refresh()
+    return store
+
+
+def test_appended_rows_are_folded_in_like_a_reload(store, sales_line):
+    with open(store.filename, "a") as f:
+        f.write("".join(sales_line(i, invalid=i % 9 == 0) for i in range(120, 150)))
+    _bump_mtime(store.filename)
+
+    change = store.scan()
+    assert not change["reload"] and len(change["records"]) == 30
+    store.apply(change)
+
+    fresh = AnalyticsStore(store.filename)
+    fresh.refresh()
+    for key in AGGREGATE_KEYS:
+        assert store.aggregates[key] == fresh.aggregates[key]
+    assert store.valid == fresh.valid
+    assert store.validation["invalid"] == fresh.validation["invalid"]
+    assert store.aggregates_for("north")[1] == fresh.aggregates_for("north")[1]
+
+
+def test_rewritten_file_is_reloaded_in_scan(store, sales_file):
+    sales_file(40, start=200)
+    _bump_mtime(store.filename)
+
+    change = store.scan()
+    # scan() does not touch the store; the reload is built for apply()
+    assert change["reload"] and change["aggregates"]["transaction_count"] == 40
+    assert store.aggregates["transaction_count"] != 40
+
+    store.apply(change)
+    assert [t["TransactionID"] for t in store.transactions][:2] == ["T200", "T201"]
+    assert store.scan() is None
+
+
+@pytest.mark.parametrize("target, filters, name, args", [
+    ("/regions", {}, "region_wise_sales", ()),
+    ("/daily?region=West", {"region": "West"}, "daily_sales_trend", ()),
+    ("/customers?n=3&min_amount=2000", {"min_amount": 2000}, "top_customers", (3,)),
+])
+def test_endpoints_answer_like_the_analytics(store, target, filters, name, args):
+    rows, _, _ = validate_and_filter(parse_transactions(read_sales_data(store.filename)), **filters)
+
+    status, body = handle_request(store, target)
+
+    assert status == HTTPStatus.OK
+    assert body == getattr(data_processor, name)(rows, *args)
+
+
+def test_bad_requests(store):
+    assert handle_request(store, "/nope")[0] == HTTPStatus.NOT_FOUND
+    status, body = handle_request(store, "/summary?min_amount=lots")
+    assert status == HTTPStatus.BAD_REQUEST and "min_amount" in body["error"]
+    status, body = handle_request(store, "/health")
+    assert status == HTTPStatus.OK and body["rows"] == 120
@@ -0,0 +1,89 @@
+# tests/test_space_saving.py
+
+import random
+from collections import Counter
+
+import pytest
+
+from utils.data_processor import aggregate_sales, empty_aggregates, top_customers, top_selling_products, update_aggregates
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.sketches import SpaceSaving
+
+
+def _zipf_stream(n, keys, seed=7):
+    rng = random.Random(seed)
+    weights = [1 / (k + 1) for k in range(keys)]
+    return rng.choices([f"k{k}" for k in range(keys)], weights=weights, k=n)
+
+
+def _check_space_saving(summary, truth):
+    total = sum(truth.values())
+    assert summary.total == total
+    assert len(summary.counters) <= summary.capacity
+
+    for key, estimate, error, _ in summary.top(summary.capacity):
+        # Estimates never undercount and overcount by at most the error
+        assert estimate - error <= truth[key] <= estimate
+
+    tracked = {key for key, *_ in summary.top(summary.capacity)}
+    for key, weight in truth.items():
+        if weight > total / summary.capacity:
+            assert key in tracked
+
+
+def test_space_saving_bounds():
+    stream = _zipf_stream(20000, 2000)
+    summary = SpaceSaving(capacity=50)
+    for key in stream:
+        summary.update(key)
+
+    _check_space_saving(summary, Counter(stream))
+    assert summary.top(1)[0][0] == "k0"
+
+
+def test_space_saving_merge_keeps_the_bounds():
+    stream = _zipf_stream(20000, 2000)
+    left, right = SpaceSaving(capacity=50), SpaceSaving(capacity=50)
+    for i, key in enumerate(stream):
+        (left if i % 2 else right).update(key)
+
+    _check_space_saving(left.merge(right), Counter(stream))
+
+
+def test_space_saving_is_exact_below_capacity():
+    summary = SpaceSaving(capacity=10)
+    for key, weight in [("a", 3), ("b", 5), ("a", 4)]:
+        summary.update(key, weight, extra=1)
+
+    assert summary.top(5) == [("a", 7, 0, 2), ("b", 5, 0, 1)]
+
+
+def test_space_saving_rejects_an_empty_capacity():
+    for capacity in (0, -1):
+        with pytest.raises(ValueError):
+            SpaceSaving(capacity)
+
+
+def test_heap_top_n_matches_a_full_sort(sales_file):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(300)))))
+    aggregates = aggregate_sales(valid)
+
+    products = sorted(aggregates["products"].items(), key=lambda x: x[1]["qty"], reverse=True)
+    customers = sorted(aggregates["customers"], key=lambda c: aggregates["customers"][c]["total_spent"], reverse=True)
+
+    assert top_selling_products(valid, n=3) == [(p, s["qty"], s["revenue"]) for p, s in products[:3]]
+    assert list(top_customers(valid, n=4)) == customers[:4]
+
+
+def test_customer_sketch_is_exact_with_enough_counters(sales_file):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(300)))))
+    sketched = update_aggregates(empty_aggregates(customer_capacity=50), valid)
+
+    exact = top_customers(valid, n=5)
+    approximate = top_customers(None, n=5, aggregates=sketched)
+
+    assert list(approximate) == list(exact)
+    for cid, stats in approximate.items():
+        assert stats["total_spent"] == exact[cid]["total_spent"]
+        assert stats["purchase_count"] == exact[cid]["purchase_count"]
+        assert stats["products_bought"] is None
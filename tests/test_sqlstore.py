@@ -0,0 +1,80 @@
+# tests/test_sqlstore.py
+
+import pytest
+
+from utils import data_processor
+from utils.api_handler import EnrichedTransactions
+from utils.data_processor import StoreQuery
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.sqlstore import INDEXES, group_sales, load_store, open_store
+
+MAPPING = {101: {"title": "Laptop Pro", "category": "laptops", "brand": "Acme", "rating": 4.5}}
+
+
+@pytest.fixture
+def valid(sales_file):
+    rows, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(300, invalid_every=11)))))
+    return rows
+
+
+@pytest.fixture
+def conn(valid):
+    conn = open_store(":memory:")
+    load_store(conn, EnrichedTransactions(valid, MAPPING), batch_size=64)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("name, args", [
+    ("calculate_total_revenue", ()),
+    ("region_wise_sales", ()),
+    ("top_selling_products", (3,)),
+    ("customer_analysis", ()),
+    ("top_customers", (3,)),
+    ("daily_sales_trend", ()),
+    ("find_peak_sales_day", ()),
+    ("low_performing_products", (100,)),
+])
+def test_store_answers_like_the_list(valid, conn, name, args):
+    function = getattr(data_processor, name)
+
+    result = function(conn, *args)
+
+    assert result == function(valid, *args)
+    if isinstance(result, dict):
+        assert list(result) == list(function(valid, *args))
+
+
+@pytest.mark.parametrize("filters", [{"region": "north"}, {"min_amount": 2000, "max_amount": 50000},
+                                     {"region": "East", "start_date": "2024-12-05", "end_date": "2024-12-20"}])
+def test_filtered_store_matches_filtered_rows(valid, conn, filters):
+    start, end = filters.pop("start_date", None), filters.pop("end_date", None)
+    rows, _, _ = validate_and_filter(valid, **filters)
+    rows = [t for t in rows if (start is None or t.Date >= start) and (end is None or t.Date <= end)]
+    query = StoreQuery(conn, start_date=start, end_date=end, **filters)
+
+    assert data_processor.top_customers(query, 3) == data_processor.top_customers(rows, 3)
+    assert data_processor.region_wise_sales(query) == data_processor.region_wise_sales(rows)
+
+
+def test_group_sales_by_period_and_dimension(valid, conn):
+    groups = group_sales(conn, ("region",), period="month")
+
+    assert {g["region"] for g in groups} == {t.Region for t in valid}
+    assert all(g["period"] == "2024-12" for g in groups)
+    assert sum(g["transaction_count"] for g in groups) == len(valid)
+    brands = {g["brand"]: g["transaction_count"] for g in group_sales(conn, ("brand",))}
+    assert brands["Acme"] == sum(t.ProductID == "P101" for t in valid)
+    with pytest.raises(ValueError):
+        group_sales(conn, ("colour",))
+
+
+def test_append_keeps_the_indexes(valid, conn):
+    load_store(conn, valid[:10], append=True)
+
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(INDEXES) <= names
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == len(valid) + 10
+
+    load_store(conn, valid[:10])
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 10
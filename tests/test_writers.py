@@ -0,0 +1,73 @@
+# tests/test_writers.py
+
+import csv
+import json
+
+import pytest
+
+from utils.api_handler import OUTPUT_FIELDS, EnrichedTransactions, iter_output_rows, save_enriched_data
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.writers import read_columnar, write_rows
+
+MAPPING = {101: {"title": "Laptop Pro", "category": "laptops", "brand": "Acme", "rating": 4.5},
+           104: {"title": "Monitor 27", "category": "displays", "brand": None, "rating": 4}}
+
+
+@pytest.fixture
+def enriched(sales_file):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(sales_file(120)))))
+    return EnrichedTransactions(valid, MAPPING)
+
+
+def test_every_format_holds_the_same_rows(enriched, tmp_path):
+    expected = [dict(zip(OUTPUT_FIELDS, row)) for row in iter_output_rows(enriched)]
+    for fmt in ("pipe", "csv", "jsonl", "columnar"):
+        save_enriched_data(enriched, str(tmp_path / f"out.{fmt}"), fmt=fmt)
+
+    with open(tmp_path / "out.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == expected
+    assert list(read_columnar(str(tmp_path / "out.columnar"))) == expected
+
+    # Text formats hold the same values as strings
+    as_text = [{k: str(v) for k, v in row.items()} for row in expected]
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        # csv writes None as an empty field
+        assert [{k: v or "None" for k, v in row.items()} for row in csv.DictReader(f)] == as_text
+    with open(tmp_path / "out.pipe", encoding="utf-8") as f:
+        header = f.readline().rstrip("\n").split("|")
+        assert [dict(zip(header, line.rstrip("\n").split("|"))) for line in f] == as_text
+
+
+def test_columnar_frames_survive_batches_and_appends(tmp_path):
+    fields = ["id", "code", "price", "flag", "label"]
+    rows = [(f"T{i}", i % 300, i * 0.5 if i % 4 else i, i % 3 == 0, None if i % 5 else f"L{i % 7}")
+            for i in range(1000)]
+    path = str(tmp_path / "rows.bin")
+
+    write_rows(rows[:600], fields, path, fmt="columnar", batch_size=128)
+    write_rows(rows[600:], fields, path, fmt="columnar", append=True, batch_size=97)
+
+    assert list(read_columnar(path)) == [dict(zip(fields, row)) for row in rows]
+
+
+def test_columnar_text_with_nul_falls_back_to_labels(tmp_path):
+    rows = [(f"a\0{i}",) for i in range(10)]
+    path = str(tmp_path / "nul.bin")
+
+    write_rows(rows, ["value"], path, fmt="columnar")
+
+    assert [r["value"] for r in read_columnar(path)] == [r[0] for r in rows]
+
+
+def test_truncated_columnar_file_is_rejected(tmp_path):
+    path = tmp_path / "rows.bin"
+    write_rows([(1, "x"), (2, "y")], ["n", "s"], str(path), fmt="columnar")
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with pytest.raises(ValueError, match="truncated"):
+        list(read_columnar(str(path)))
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown output format"):
+        write_rows([], ["a"], str(tmp_path / "x"), fmt="xml")
@@ -1,28 +1,275 @@
 # utils/api_handler.py
 
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from utils.cache import CACHE_DIR
+from utils.writers import write_rows
+
+API_URL = "https://dummyjson.com/products"
+PAGE_SIZE = 100
+PRODUCT_FIELDS = "title,category,brand,rating"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def create_session(pool_size=8):
+    """
+    Creates a requests session whose connection pool is shared by all
+    page requests
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_product_page(session, url, skip, limit, timeout=10, retries=3, backoff=0.5, headers=None):
+    """
+    Fetches one page of the product catalog, retrying connection errors,
+    timeouts and 429/5xx responses with exponential backoff
+    Returns: the response (status 200, or 304 for a conditional request)
+    """
+    params = {"limit": limit, "skip": skip, "select": PRODUCT_FIELDS}
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, timeout=timeout, headers=headers)
+            if response.status_code in RETRY_STATUS and attempt < retries:
+                raise requests.HTTPError(f"{response.status_code} for {response.url}", response=response)
+            response.raise_for_status()
+            return response
+
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+            status = e.response.status_code if getattr(e, "response", None) is not None else None
+            if attempt >= retries or (status is not None and status not in RETRY_STATUS):
+                raise
+            time.sleep(backoff * (2 ** attempt))
+
+
+def _conditional_headers(page):
+    headers = {}
+    if page is not None and page.get("etag"):
+        headers["If-None-Match"] = page["etag"]
+    if page is not None and page.get("last_modified"):
+        headers["If-Modified-Since"] = page["last_modified"]
+    return headers
+
+
+def _previous_pages(previous):
+    """
+    Splits an earlier fetch_catalog result (or cached snapshot) back into
+    its pages
+    Returns: dictionary (skip, limit) -> (page validators, page products)
+    """
+    pages = {}
+    if previous and previous.get("pages"):
+        start = 0
+        for page in previous["pages"]:
+            pages[(page["skip"], page["limit"])] = (page, previous["products"][start:start + page["count"]])
+            start += page["count"]
+    return pages
+
+
+def fetch_catalog(url=API_URL, page_size=PAGE_SIZE, max_workers=4, timeout=10, retries=3, backoff=0.5,
+                  previous=None):
+    """
+    Fetches the whole product catalog
+    The first page reports the catalog size and the page length the
+    server really uses (it may cap limit below page_size); the remaining
+    pages are fetched concurrently over one pooled session. A page that
+    fails or comes back short counts in failed_pages.
+    previous: an earlier result (or cached snapshot) of this function.
+    Every page is then a conditional request with the ETag/Last-Modified
+    that page had; a 304 reuses that page's products, and not_modified
+    is only True when no page changed.
+    Returns: dictionary with not_modified, products, failed_pages, total
+    and pages (skip, limit, count and validators of each page). Raises if
+    the first page cannot be fetched.
+    """
+    old_pages = _previous_pages(previous)
+    result = {"not_modified": bool(old_pages), "products": [], "failed_pages": 0, "total": 0, "pages": []}
+
+    def take(skip, limit, response):
+        old = old_pages.get((skip, limit))
+        if response.status_code == 304 and old is not None:
+            page, products = old
+            page = dict(page, etag=response.headers.get("ETag", page["etag"]))
+        else:
+            # A 304 for a page we have no copy of cannot be used
+            products = response.json().get("products", []) if response.status_code != 304 else []
+            page = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+            result["not_modified"] = False
+
+        page.update(skip=skip, limit=limit, count=len(products))
+        result["pages"].append(page)
+        result["products"].extend(products)
+        return products
+
+    with create_session(max_workers) as session:
+        first_page = old_pages.get((0, page_size), (None,))[0]
+        response = fetch_product_page(session, url, 0, page_size, timeout, retries, backoff,
+                                      _conditional_headers(first_page))
+        products = take(0, page_size, response)
 
+        if response.status_code == 304 and first_page is not None:
+            total = previous.get("total", len(previous["products"]))
+        else:
+            total = response.json().get("total", len(products))
+        result["total"] = total
 
-def fetch_all_products():
+        step = len(products)
+        if total and not step:
+            result["failed_pages"] += 1
+            print(f"✗ API returned no products on the first page of {total}")
+        skips = list(range(step, total, step)) if step else []
+
+        if skips:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = [
+                    pool.submit(fetch_product_page, session, url, skip, step, timeout, retries, backoff,
+                                _conditional_headers(old_pages.get((skip, step), (None,))[0]))
+                    for skip in skips
+                ]
+                for skip, future in zip(skips, futures):
+                    try:
+                        page = take(skip, step, future.result())
+                    except Exception as e:
+                        result["failed_pages"] += 1
+                        print(f"✗ API page fetch failed: {e}")
+                        continue
+
+                    expected = min(step, total - skip)
+                    if len(page) < expected:
+                        result["failed_pages"] += 1
+                        print(f"✗ API page at skip={skip} returned {len(page)} of {expected} products")
+
+    if result["failed_pages"] or len(result["pages"]) != len(old_pages):
+        result["not_modified"] = False
+    return result
+
+
+def fetch_all_products(url=API_URL, page_size=PAGE_SIZE, max_workers=4, timeout=10, retries=3, backoff=0.5):
     """
     Fetches all products from DummyJSON API
     Returns: List of product dictionaries
     """
-    url = "https://dummyjson.com/products?limit=100"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        result = fetch_catalog(url, page_size, max_workers, timeout, retries, backoff)
 
-        data = response.json()
-        products = data.get("products", [])
+        if result["failed_pages"]:
+            print(f"✗ {result['failed_pages']} catalog pages could not be fetched")
+        else:
+            print("✓ Successfully fetched products from API")
+        return result["products"]
 
-        print("✓ Successfully fetched products from API")
-        return products
+    except Exception as e:
+        print(f"✗ API fetch failed: {e}")
+        return []
+
+
+_memory_catalogs = OrderedDict()
+MEMORY_CATALOGS = 8
+
+
+def catalog_cache_path(url, cache_dir=CACHE_DIR):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"catalog-{key}.json")
+
+
+def _remember_catalog(url, entry):
+    _memory_catalogs[url] = entry
+    _memory_catalogs.move_to_end(url)
+    while len(_memory_catalogs) > MEMORY_CATALOGS:
+        _memory_catalogs.popitem(last=False)
+
+
+def _load_catalog_file(url, cache_dir):
+    try:
+        with open(catalog_cache_path(url, cache_dir), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        return entry if entry.get("url") == url else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_catalog_file(entry, cache_dir):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = catalog_cache_path(entry["url"], cache_dir)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write catalog cache: {e}")
+
+
+def get_product_catalog(url=API_URL, ttl=3600, offline=False, cache_dir=CACHE_DIR, **fetch_options):
+    """
+    Returns the product catalog from the fastest fresh tier:
+    in-memory LRU, then the on-disk snapshot, then the API
+    Expired snapshots are revalidated with ETag/Last-Modified; if the API
+    fails (or offline=True) the last good snapshot is served at any age
+    Returns: List of product dictionaries
+    """
+    now = time.time()
+    entry = _memory_catalogs.get(url)
+    if entry is not None and now - entry["fetched_at"] < ttl:
+        _memory_catalogs.move_to_end(url)
+        print("✓ Product catalog served from memory cache")
+        return entry["products"]
+
+    entry = _load_catalog_file(url, cache_dir) or entry
+    if entry is not None and (offline or now - entry["fetched_at"] < ttl):
+        _remember_catalog(url, entry)
+        print(f"✓ Product catalog served from disk cache ({int(now - entry['fetched_at'])}s old)")
+        return entry["products"]
 
+    if offline:
+        print("✗ Offline mode and no cached product catalog available")
+        return []
+
+    try:
+        result = fetch_catalog(url, previous=entry, **fetch_options)
     except Exception as e:
         print(f"✗ API fetch failed: {e}")
+        if entry is not None:
+            print("✓ Serving last good product catalog snapshot")
+            return entry["products"]
         return []
 
+    if result["not_modified"] and entry is not None:
+        entry["fetched_at"] = now
+        print("✓ Product catalog not modified, cache revalidated")
+    elif result["failed_pages"] and entry is not None:
+        print("✗ Catalog incomplete, serving last good product catalog snapshot")
+        return entry["products"]
+    else:
+        entry = {
+            "url": url,
+            "fetched_at": now,
+            "total": result["total"],
+            "pages": result["pages"],
+            "products": result["products"]
+        }
+        print("✓ Successfully fetched products from API")
+        if result["failed_pages"]:
+            # Keep partial results for this run only
+            return entry["products"]
+
+    _remember_catalog(url, entry)
+    _save_catalog_file(entry, cache_dir)
+    return entry["products"]
+
 
 def create_product_mapping(all_products):
     """
@@ -45,81 +292,187 @@ def create_product_mapping(all_products):
     return mapping
 
 
-def enrich_sales_data(transactions, product_mapping):
+ENRICHED_FIELDS = [
+    "transactionID", "productID", "productName", "quantity", "customer",
+    "rating", "category", "brand", "title", "enriched"
+]
+
+# Fields taken from the base transaction; the rest come from the product
+BASE_FIELDS = {
+    "transactionID": "TransactionID",
+    "productName": "ProductName",
+    "quantity": "Quantity",
+    "customer": "CustomerID"
+}
+PRODUCT_FIELDS_INDEX = {"productID": 0, "rating": 1, "category": 2, "brand": 3, "title": 4, "enriched": 5}
+NOT_ENRICHED = (None, None, None, None, None, False)
+
+
+class ProductResolver:
     """
-    Enriches transaction data with product information
-    Saves enriched data to a new file
+    Resolves ProductID strings (P101) against the product mapping,
+    computing the result once per distinct ProductID
     """
-    enriched_transactions = []
 
-    for t in transactions:
+    def __init__(self, product_mapping):
+        self.product_mapping = product_mapping
+        self.resolved = {}
+
+    def resolve(self, product_id):
+        info = self.resolved.get(product_id)
+        if info is None:
+            info = self.resolved[product_id] = self._lookup(product_id)
+        return info
+
+    def _lookup(self, product_id):
+        # Extract numeric product id from P101 -> 101
         try:
-            # Extract numeric product id from P101 -> 101
-            prod_raw = t["ProductID"].replace("P", "")
-            prod_id = int(prod_raw)
-
-            base = {
-                "transactionID": t["TransactionID"],
-                "productID": prod_id,
-                "productName": t["ProductName"],
-                "quantity": t["Quantity"],
-                "customer": t["CustomerID"]
-            }
-
-            if prod_id in product_mapping:
-                info = product_mapping[prod_id]
-                base.update({
-                    "rating": info.get("rating"),
-                    "category": info.get("category"),
-                    "brand": info.get("brand"),
-                    "title": info.get("title"),
-                    "enriched": True
-                })
-            else:
-                base.update({
-                    "rating": None,
-                    "category": None,
-                    "brand": None,
-                    "title": None,
-                    "enriched": False
-                })
-
-            enriched_transactions.append(base)
-
-        except:
-            enriched_transactions.append({
-                "transactionID": t.get("TransactionID"),
-                "productID": None,
-                "productName": t.get("ProductName"),
-                "quantity": t.get("Quantity"),
-                "customer": t.get("CustomerID"),
-                "rating": None,
-                "category": None,
-                "brand": None,
-                "title": None,
-                "enriched": False
-            })
-
-    save_enriched_data(enriched_transactions)
+            prod_id = int(product_id.replace("P", ""))
+        except (AttributeError, ValueError):
+            return NOT_ENRICHED
+
+        info = self.product_mapping.get(prod_id)
+        if info is None:
+            return (prod_id, None, None, None, None, False)
+        return (prod_id, info.get("rating"), info.get("category"), info.get("brand"), info.get("title"), True)
+
+
+class EnrichedTransaction(Mapping):
+    """
+    Read-only view of one transaction with its product information
+    Behaves like the enriched dictionary (keys in ENRICHED_FIELDS)
+    without copying the base transaction
+    """
+    __slots__ = ("base", "product")
+
+    def __init__(self, base, product):
+        self.base = base
+        self.product = product
+
+    def __getitem__(self, key):
+        field = BASE_FIELDS.get(key)
+        if field is not None:
+            return self.base.get(field)
+        return self.product[PRODUCT_FIELDS_INDEX[key]]
+
+    def __iter__(self):
+        return iter(ENRICHED_FIELDS)
+
+    def __len__(self):
+        return len(ENRICHED_FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class EnrichedTransactions(Sequence):
+    """
+    Lazy list of EnrichedTransaction views over the base transactions
+    Product lookups are shared, so cost grows with distinct products
+    """
+
+    def __init__(self, transactions, product_mapping, resolver=None):
+        self.transactions = transactions
+        self.resolver = resolver or ProductResolver(product_mapping)
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EnrichedTransactions(self.transactions[index], None, self.resolver)
+        t = self.transactions[index]
+        return EnrichedTransaction(t, self.resolver.resolve(t.get("ProductID")))
+
+    def __iter__(self):
+        resolve = self.resolver.resolve
+        for t in self.transactions:
+            yield EnrichedTransaction(t, resolve(t.get("ProductID")))
+
+
+def iter_enriched_data(transactions, product_mapping):
+    """
+    Lazily enriches transactions with product information
+    Yields: EnrichedTransaction views
+    """
+    resolve = ProductResolver(product_mapping).resolve
+    for t in transactions:
+        yield EnrichedTransaction(t, resolve(t.get("ProductID")))
+
+
+def enrich_sales_data(transactions, product_mapping, fmt="pipe"):
+    """
+    Enriches transaction data with product information
+    Saves enriched data to a new file (see save_enriched_data for fmt)
+    Returns: EnrichedTransactions (a list-like view over transactions)
+    """
+    enriched_transactions = EnrichedTransactions(transactions, product_mapping)
+
+    save_enriched_data(enriched_transactions, fmt=fmt)
     return enriched_transactions
 
 
-def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
+def track_enrichment(enriched_transactions, summary):
+    """
+    Passes enriched transactions through while counting enrichment results
+    into summary (keys: total, enriched, not_enriched_products)
+    Yields: the same enriched transactions
+    """
+    summary.setdefault("total", 0)
+    summary.setdefault("enriched", 0)
+    summary.setdefault("not_enriched_products", set())
+
+    for t in enriched_transactions:
+        summary["total"] += 1
+        if t.get("enriched") is True:
+            summary["enriched"] += 1
+        else:
+            summary["not_enriched_products"].add(t.get("productName"))
+        yield t
+
+
+OUTPUT_FIELDS = [
+    "transactionID", "productID", "productName", "quantity", "customer",
+    "rating", "brand", "category", "title", "enriched"
+]
+
+ENRICHED_FILES = {
+    "pipe": "data/enriched_sales_data.txt",
+    "csv": "data/enriched_sales_data.csv",
+    "jsonl": "data/enriched_sales_data.jsonl",
+    "columnar": "data/enriched_sales_data.bin"
+}
+
+
+def iter_output_rows(enriched_transactions):
+    """
+    Converts enriched transactions to value tuples in OUTPUT_FIELDS order
+    EnrichedTransaction views are read directly from their base row and
+    resolved product instead of through per-field lookups
+    """
+    for t in enriched_transactions:
+        if type(t) is EnrichedTransaction:
+            b = t.base
+            p = t.product
+            yield (b.get("TransactionID"), p[0], b.get("ProductName"), b.get("Quantity"),
+                   b.get("CustomerID"), p[1], p[3], p[2], p[4], p[5])
+        else:
+            yield tuple(t.get(f) for f in OUTPUT_FIELDS)
+
+
+def save_enriched_data(enriched_transactions, filename=None, append=False, fmt="pipe", header=None):
     """
     Saves enriched transactions back to file
+    Rows are written in batches as they are produced; fmt selects pipe
+    (default), csv, jsonl or columnar (binary). With append=True rows are
+    added to an existing file (the header is only written when the file
+    is new or empty, unless header is given)
     """
-    header = "transactionID|productID|productName|quantity|customer|rating|brand|category|title|enriched\n"
+    filename = filename or ENRICHED_FILES[fmt]
 
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(header)
-            for t in enriched_transactions:
-                line = (
-                    f"{t.get('transactionID')}|{t.get('productID')}|{t.get('productName')}|"
-                    f"{t.get('quantity')}|{t.get('customer')}|{t.get('rating')}|"
-                    f"{t.get('brand')}|{t.get('category')}|{t.get('title')}|{t.get('enriched')}\n"
-                )
-                f.write(line)
+        write_rows(iter_output_rows(enriched_transactions), OUTPUT_FIELDS, filename, fmt=fmt, append=append,
+                   header=header)
 
     except Exception as e:
         print(f"Error writing enriched file: {e}")
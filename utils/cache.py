@@ -0,0 +1,180 @@
+# utils/cache.py
+
+import hashlib
+import os
+import pickle
+from array import array
+
+from utils.file_handler import read_sales_data, parse_transactions
+from utils.records import Transaction, paused_gc
+
+CACHE_DIR = "data/.cache"
+CACHE_VERSION = 1
+
+TEXT_FIELDS = ["Date", "ProductID", "ProductName", "CustomerID", "Region"]
+
+
+def file_fingerprint(filename, with_hash=True):
+    """
+    Identifies the current contents of a file
+    Returns: dictionary with path, size, mtime and (optionally) sha256
+    """
+    stat = os.stat(filename)
+    fingerprint = {
+        "path": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns
+    }
+
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(filename, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["sha256"] = digest.hexdigest()
+
+    return fingerprint
+
+
+def cache_path(filename, cache_dir=CACHE_DIR):
+    key = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.bin")
+
+
+def _encode_transactions(transactions):
+    columns = {
+        "TransactionID": [t["TransactionID"] for t in transactions],
+        "Quantity": array("q", (t["Quantity"] for t in transactions)).tobytes(),
+        "UnitPrice": array("d", (t["UnitPrice"] for t in transactions)).tobytes()
+    }
+
+    # Categorical text columns are stored as a label list plus integer codes
+    for field in TEXT_FIELDS:
+        index = {}
+        codes = array("I", (index.setdefault(t[field], len(index)) for t in transactions))
+        columns[field] = (list(index), codes.tobytes())
+
+    return columns
+
+
+def _decode_transactions(columns):
+    quantity = array("q")
+    quantity.frombytes(columns["Quantity"])
+    unit_price = array("d")
+    unit_price.frombytes(columns["UnitPrice"])
+
+    text = []
+    for field in TEXT_FIELDS:
+        labels, raw = columns[field]
+        codes = array("I")
+        codes.frombytes(raw)
+        text.append([labels[c] for c in codes])
+
+    with paused_gc():
+        return [
+            Transaction(tid, date, pid, name, qty, price, cid, region)
+            for tid, date, pid, name, qty, price, cid, region in zip(
+                columns["TransactionID"], text[0], text[1], text[2], quantity, unit_price, text[3], text[4]
+            )
+        ]
+
+
+def save_cached_transactions(filename, fingerprint, line_count, transactions, cache_dir=CACHE_DIR):
+    """
+    Stores parsed transactions for filename in a compact binary cache file
+    fingerprint must be taken with file_fingerprint(filename) before the
+    file was read: if lines were appended while it was parsed, the cache
+    then looks stale on the next run instead of silently missing them.
+    line_count is the number of raw lines read_sales_data returned
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        payload = {
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "line_count": line_count,
+            "columns": _encode_transactions(transactions)
+        }
+
+        path = cache_path(filename, cache_dir)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    except Exception as e:
+        print(f"Warning: could not write cache: {e}")
+
+
+def load_cached_transactions(filename, cache_dir=CACHE_DIR, verify_hash=False):
+    """
+    Loads parsed transactions for filename from the cache if it is fresh
+    The cache is fresh when path, size and mtime match. If only the mtime
+    changed, the content hash decides (and the cache is kept when the
+    contents are identical). verify_hash=True always checks the hash.
+    Returns: tuple (line_count, transactions) or None when stale/missing
+    """
+    path = cache_path(filename, cache_dir)
+
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+
+    if payload.get("version") != CACHE_VERSION:
+        return None
+
+    try:
+        cached = payload["fingerprint"]
+        current = file_fingerprint(filename, with_hash=False)
+    except OSError:
+        return None
+
+    if cached["path"] != current["path"] or cached["size"] != current["size"]:
+        return None
+
+    if verify_hash or cached["mtime"] != current["mtime"]:
+        current = file_fingerprint(filename)
+        if cached["sha256"] != current["sha256"]:
+            return None
+
+        if cached["mtime"] != current["mtime"]:
+            # Touched but unchanged: refresh the stored fingerprint
+            payload["fingerprint"] = current
+            try:
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+    return payload["line_count"], _decode_transactions(payload["columns"])
+
+
+def load_transactions(filename, use_cache=True):
+    """
+    Returns parsed transactions for filename, from the cache when it is
+    fresh and otherwise by reading and parsing the file (and refreshing
+    the cache)
+    Returns: tuple (line_count, transactions, from_cache)
+    """
+    if use_cache:
+        cached = load_cached_transactions(filename)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+    fingerprint = None
+    if use_cache:
+        try:
+            fingerprint = file_fingerprint(filename)
+        except OSError:
+            pass
+
+    raw_lines = read_sales_data(filename)
+    transactions = parse_transactions(raw_lines)
+    if fingerprint is not None and raw_lines:
+        save_cached_transactions(filename, fingerprint, len(raw_lines), transactions)
+
+    return len(raw_lines), transactions, False
@@ -0,0 +1,238 @@
+# utils/columnar.py
+
+from array import array
+from itertools import islice
+from operator import attrgetter
+
+import numpy as np
+
+from utils.records import FIELDS, Transaction
+
+CHUNK_ROWS = 8192
+
+# Fields stored as integer codes into a label list
+CODED_FIELDS = ("Date", "ProductID", "ProductName", "CustomerID", "Region")
+
+_record_columns = attrgetter(*FIELDS)
+
+
+class TransactionTable:
+    """
+    Column-oriented table of parsed transactions
+    Numeric fields are typed arrays and categorical fields are integer
+    codes into small label lists
+    """
+
+    def __init__(self, transaction_ids, quantity, unit_price,
+                 date_codes, dates, product_id_codes, product_ids,
+                 product_codes, products, customer_codes, customers,
+                 region_codes, regions):
+        self.transaction_ids = transaction_ids
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.amount = quantity * unit_price
+        self.date_codes = date_codes
+        self.dates = dates
+        self.product_id_codes = product_id_codes
+        self.product_ids = product_ids
+        self.product_codes = product_codes
+        self.products = products
+        self.customer_codes = customer_codes
+        self.customers = customers
+        self.region_codes = region_codes
+        self.regions = regions
+
+    @classmethod
+    def from_records(cls, records, chunk_rows=CHUNK_ROWS):
+        """
+        Builds a table from any iterable of Transaction records (for example
+        iter_valid_transactions(iter_sales_records(filename), ...))
+        Rows are consumed chunk_rows at a time and appended to the
+        columns, so only one chunk of row objects is alive at once.
+        Codes follow first appearance so grouped results keep the same
+        ordering as the dictionary based functions in data_processor.
+        """
+        records = iter(records)
+        transaction_ids = []
+        quantity = array("q")
+        unit_price = array("d")
+        labels = {field: {} for field in CODED_FIELDS}
+        codes = {field: array("i") for field in CODED_FIELDS}
+
+        while True:
+            chunk = list(islice(records, chunk_rows))
+            if not chunk:
+                break
+
+            tid, date, pid, name, qty, price, cid, region = zip(*map(_record_columns, chunk))
+            del chunk
+
+            transaction_ids.extend(tid)
+            quantity.extend(qty)
+            unit_price.extend(price)
+            for field, values in zip(CODED_FIELDS, (date, pid, name, cid, region)):
+                index = labels[field]
+                codes[field].extend([index.setdefault(v, len(index)) for v in values])
+
+        def coded(field):
+            return np.frombuffer(codes[field], dtype=np.int32), list(labels[field])
+
+        return cls(
+            transaction_ids, np.frombuffer(quantity, dtype=np.int64), np.frombuffer(unit_price, dtype=np.float64),
+            *coded("Date"), *coded("ProductID"), *coded("ProductName"), *coded("CustomerID"), *coded("Region")
+        )
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Builds a table from the records produced by parse_transactions
+        """
+        return cls.from_records(transactions)
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def __getitem__(self, i):
+        return Transaction(
+            self.transaction_ids[i],
+            self.dates[self.date_codes[i]],
+            self.product_ids[self.product_id_codes[i]],
+            self.products[self.product_codes[i]],
+            int(self.quantity[i]),
+            float(self.unit_price[i]),
+            self.customers[self.customer_codes[i]],
+            self.regions[self.region_codes[i]]
+        )
+
+    def __iter__(self):
+        """
+        Yields rows as Transaction records, one at a time
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _group_sum(codes, weights, size):
+    return np.bincount(codes, weights=weights, minlength=size)
+
+
+def _group_count(codes, size):
+    return np.bincount(codes, minlength=size)
+
+
+def _unique_pairs(outer_codes, inner_codes, inner_size):
+    """
+    Returns the distinct (outer, inner) code pairs sorted by outer then inner
+    """
+    keys = np.unique(outer_codes.astype(np.int64) * inner_size + inner_codes)
+    return keys // inner_size, keys % inner_size
+
+
+def calculate_total_revenue(table):
+    return float(table.amount.sum())
+
+
+def region_wise_sales(table):
+    size = len(table.regions)
+    sales = _group_sum(table.region_codes, table.amount, size)
+    counts = _group_count(table.region_codes, size)
+    total_revenue = sales.sum()
+
+    # Sort by total_sales descending
+    result = {}
+    for i in np.argsort(-sales, kind="stable"):
+        result[table.regions[i]] = {
+            "total_sales": float(sales[i]),
+            "transaction_count": int(counts[i]),
+            "percentage": float(sales[i] / total_revenue * 100) if total_revenue else 0
+        }
+    return result
+
+
+def _product_stats(table):
+    size = len(table.products)
+    qty = _group_sum(table.product_codes, table.quantity, size).astype(np.int64)
+    revenue = _group_sum(table.product_codes, table.amount, size)
+    return qty, revenue
+
+
+def top_selling_products(table, n=5):
+    qty, revenue = _product_stats(table)
+    order = np.argsort(-qty, kind="stable")[:n]
+    return [(table.products[i], int(qty[i]), float(revenue[i])) for i in order]
+
+
+def customer_analysis(table):
+    size = len(table.customers)
+    spent = _group_sum(table.customer_codes, table.amount, size)
+    counts = _group_count(table.customer_codes, size)
+
+    # Distinct products per customer, grouped with one sort
+    cust, prod = _unique_pairs(table.customer_codes, table.product_codes, len(table.products))
+    bounds = np.searchsorted(cust, np.arange(size + 1))
+
+    # Sort by total_spent descending
+    result = {}
+    for i in np.argsort(-spent, kind="stable"):
+        count = int(counts[i])
+        names = [table.products[p] for p in prod[bounds[i]:bounds[i + 1]]]
+        result[table.customers[i]] = {
+            "total_spent": float(spent[i]),
+            "purchase_count": count,
+            "average_value": float(spent[i]) / count if count else 0,
+            "products_bought": sorted(names)
+        }
+    return result
+
+
+def top_customers(table, n=5):
+    """
+    Top n customers by total spent in the customer_analysis format
+    """
+    size = len(table.customers)
+    spent = _group_sum(table.customer_codes, table.amount, size)
+    counts = _group_count(table.customer_codes, size)
+    best = np.argsort(-spent, kind="stable")[:n]
+
+    result = {}
+    for i in best:
+        count = int(counts[i])
+        names = {table.products[p] for p in np.unique(table.product_codes[table.customer_codes == i])}
+        result[table.customers[i]] = {
+            "total_spent": float(spent[i]),
+            "purchase_count": count,
+            "average_value": float(spent[i]) / count if count else 0,
+            "products_bought": sorted(names)
+        }
+    return result
+
+
+def daily_sales_trend(table):
+    size = len(table.dates)
+    counts = _group_count(table.date_codes, size)
+    day, _ = _unique_pairs(table.date_codes, table.customer_codes, len(table.customers))
+    unique_customers = _group_count(day, size)
+
+    result = {}
+    for i in sorted(range(size), key=table.dates.__getitem__):
+        result[table.dates[i]] = {
+            "transaction_count": int(counts[i]),
+            "unique_customers": int(unique_customers[i])
+        }
+    return result
+
+
+def find_peak_sales_day(table):
+    size = len(table.dates)
+    revenue = _group_sum(table.date_codes, table.amount, size)
+    counts = _group_count(table.date_codes, size)
+
+    peak = int(np.argmax(revenue))
+    return (table.dates[peak], float(revenue[peak]), int(counts[peak]))
+
+
+def low_performing_products(table, threshold=10):
+    qty, revenue = _product_stats(table)
+    low = np.flatnonzero(qty < threshold)
+    low = low[np.argsort(qty[low], kind="stable")]
+    return [(table.products[i], int(qty[i]), float(revenue[i])) for i in low]
@@ -0,0 +1,173 @@
+# utils/cube.py
+
+from utils.data_processor import empty_aggregates, period_key
+
+CUBE_HEADER = "Date|Region|ProductName|Quantity|Revenue|TransactionCount\n"
+DIMENSIONS = {"date": 0, "region": 1, "product": 2}
+
+
+def build_cube(transactions, cube=None):
+    """
+    Pre-aggregates Transaction records by (date, region, product)
+    Returns: dictionary (date, region, product) -> [qty, revenue, count]
+    """
+    if cube is None:
+        cube = {}
+
+    for t in transactions:
+        key = (t.Date, t.Region, t.ProductName)
+        qty = t.Quantity
+        amount = t.amount
+
+        cell = cube.get(key)
+        if cell is None:
+            cell = cube[key] = [0, 0.0, 0]
+        cell[0] += qty
+        cell[1] += amount
+        cell[2] += 1
+
+    return cube
+
+
+def merge_cubes(cube, other):
+    for key, (qty, revenue, count) in other.items():
+        cell = cube.get(key)
+        if cell is None:
+            cube[key] = [qty, revenue, count]
+        else:
+            cell[0] += qty
+            cell[1] += revenue
+            cell[2] += count
+    return cube
+
+
+def save_cube(cube, filename="output/sales_cube.txt"):
+    """
+    Writes the cube as a pipe-delimited file (one line per cell)
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(CUBE_HEADER)
+        f.write("".join(
+            f"{d}|{r}|{p}|{qty}|{revenue!r}|{count}\n"
+            for (d, r, p), (qty, revenue, count) in cube.items()
+        ))
+
+
+def load_cube(filename="output/sales_cube.txt"):
+    """
+    Reads a cube written by save_cube
+    Returns: dictionary (date, region, product) -> [qty, revenue, count]
+    """
+    cube = {}
+    with open(filename, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            d, r, p, qty, revenue, count = line.split("|")
+            cube[(d, r, p)] = [int(qty), float(revenue), int(count)]
+    return cube
+
+
+def rollup(cube, dims=("region",), period=None):
+    """
+    Groups cube cells by any of the dimensions "date", "region" and
+    "product"; with period="week" or "month" the date dimension is
+    rolled up to ISO weeks ("2024-W49") or months ("2024-12")
+    Cost is proportional to the number of cells, not transactions.
+    Returns: dictionary key tuple -> {"qty", "revenue", "transaction_count"}
+    """
+    positions = [DIMENSIONS[d] for d in dims]
+    period_keys = {}
+
+    result = {}
+    for key, (qty, revenue, count) in cube.items():
+        if period is not None:
+            date = key[0]
+            bucket = period_keys.get(date)
+            if bucket is None:
+                bucket = period_keys[date] = period_key(date, period)
+            key = (bucket,) + key[1:]
+
+        group = tuple(key[i] for i in positions)
+        stats = result.get(group)
+        if stats is None:
+            stats = result[group] = {"qty": 0, "revenue": 0.0, "transaction_count": 0}
+        stats["qty"] += qty
+        stats["revenue"] += revenue
+        stats["transaction_count"] += count
+
+    return result
+
+
+def cube_aggregates(cube):
+    """
+    Aggregate state (see data_processor.empty_aggregates) rolled up from
+    the cube, so calculate_total_revenue, region_wise_sales,
+    top_selling_products, low_performing_products and find_peak_sales_day
+    answer from it with aggregates=... without the raw transactions.
+    Customers are not part of the cube: the customer tables are empty and
+    the daily entries carry no customer sets, so customer_analysis,
+    top_customers and the unique customer counts cannot be answered.
+    Cells keep first-appearance order, so ties break as in a scan; float
+    revenues are summed per cell first and may differ in the last digits.
+    Returns: aggregate state
+    """
+    aggregates = empty_aggregates(customer_products=False)
+    regions = aggregates["regions"]
+    products = aggregates["products"]
+    daily = aggregates["daily"]
+    total = 0.0
+    count = 0
+
+    for (date, region, product), (qty, revenue, n) in cube.items():
+        total += revenue
+        count += n
+
+        r = regions.get(region)
+        if r is None:
+            r = regions[region] = {"total_sales": 0.0, "transaction_count": 0}
+        r["total_sales"] += revenue
+        r["transaction_count"] += n
+
+        p = products.get(product)
+        if p is None:
+            p = products[product] = {"qty": 0, "revenue": 0.0}
+        p["qty"] += qty
+        p["revenue"] += revenue
+
+        d = daily.get(date)
+        if d is None:
+            d = daily[date] = {"revenue": 0.0, "transaction_count": 0}
+        d["revenue"] += revenue
+        d["transaction_count"] += n
+
+    aggregates["total_revenue"] = total
+    aggregates["transaction_count"] = count
+    return aggregates
+
+
+def daily_sales(cube, period=None):
+    """
+    Revenue, quantity and transaction count per date (or per week/month)
+    Returns: dictionary sorted by date/period
+    """
+    days = rollup(cube, ("date",), period)
+    return {d: days[(d,)] for (d,) in sorted(days)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query a saved sales cube without the raw data")
+    parser.add_argument("cube", nargs="?", default="output/sales_cube.txt")
+    parser.add_argument("--by", default="region", help="comma separated: date, region, product")
+    parser.add_argument("--period", choices=["week", "month"])
+    args = parser.parse_args()
+
+    cube = load_cube(args.cube)
+    dims = tuple(d.strip() for d in args.by.split(",") if d.strip())
+    print("|".join(dims) + "|Quantity|Revenue|TransactionCount")
+    for key, stats in sorted(rollup(cube, dims, args.period).items()):
+        print("|".join(key) + f"|{stats['qty']}|{stats['revenue']:.2f}|{stats['transaction_count']}")
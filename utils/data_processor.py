@@ -1,143 +1,570 @@
 # utils/data_processor.py
 
-def calculate_total_revenue(transactions):
-    total = 0.0
-    for t in transactions:
-        total += t["Quantity"] * t["UnitPrice"]
-    return total
-
-
-def region_wise_sales(transactions):
-    region_stats = {}
-    total_revenue = calculate_total_revenue(transactions)
+import heapq
+import sqlite3
+from datetime import datetime
+
+from utils.sketches import SpaceSaving, HyperLogLog
+
+# The analytics functions take the Transaction records produced by
+# validate_and_filter / iter_valid_transactions and read their slots
+# (t.Region, t.amount) directly; convert other mappings with
+# records.as_transaction first.
+
+def empty_aggregates(unique_error=None, customer_products=True, customer_capacity=None):
+    """
+    Creates an empty aggregate state
+    unique_error: when set, unique customers per day are counted with a
+    HyperLogLog sketch of about this relative error instead of a set
+    customer_products: keep the set of products bought by every customer
+    (only customer_analysis/top_customers show it; without it their
+    products_bought is None)
+    customer_capacity: when set, customers are tracked in a Space-Saving
+    summary of this many counters instead of one entry per customer, so
+    memory stays bounded; top_customers then returns estimates
+    Returns: dictionary holding every metric used by the analytics functions
+    """
+    return {
+        "unique_error": unique_error,
+        "customer_products": customer_products,
+        "customer_sketch": SpaceSaving(customer_capacity) if customer_capacity else None,
+        "total_revenue": 0.0,
+        "transaction_count": 0,
+        "regions": {},
+        "products": {},
+        "customers": {},
+        "daily": {}
+    }
+
+
+def update_aggregates(aggregates, transactions):
+    """
+    Adds transactions to an existing aggregate state in a single pass
+    Returns: the updated aggregate state
+    """
+    new_unique = _unique_factory(aggregates)
+    regions = aggregates["regions"]
+    products = aggregates["products"]
+    customers = aggregates["customers"]
+    daily = aggregates["daily"]
+    total = aggregates["total_revenue"]
+    count = aggregates["transaction_count"]
+    track_products = aggregates.get("customer_products", True)
+    sketch = aggregates.get("customer_sketch")
+    sketch_update = sketch.update if sketch is not None else None
 
     for t in transactions:
-        region = t["Region"]
-        amount = t["Quantity"] * t["UnitPrice"]
-
-        if region not in region_stats:
-            region_stats[region] = {"total_sales": 0.0, "transaction_count": 0}
+        qty = t.Quantity
+        amount = t.amount
+        region = t.Region
+        product = t.ProductName
+        cid = t.CustomerID
+        date = t.Date
+
+        total += amount
+        count += 1
+
+        r = regions.get(region)
+        if r is None:
+            r = regions[region] = {"total_sales": 0.0, "transaction_count": 0}
+        r["total_sales"] += amount
+        r["transaction_count"] += 1
+
+        p = products.get(product)
+        if p is None:
+            p = products[product] = {"qty": 0, "revenue": 0.0}
+        p["qty"] += qty
+        p["revenue"] += amount
+
+        if sketch_update is not None:
+            sketch_update(cid, amount, 1)
+        else:
+            c = customers.get(cid)
+            if c is None:
+                c = customers[cid] = {"total_spent": 0.0, "purchase_count": 0}
+                if track_products:
+                    c["products_bought"] = set()
+            c["total_spent"] += amount
+            c["purchase_count"] += 1
+            if track_products:
+                c["products_bought"].add(product)
+
+        d = daily.get(date)
+        if d is None:
+            d = daily[date] = {"revenue": 0.0, "transaction_count": 0, "customers": new_unique()}
+        d["revenue"] += amount
+        d["transaction_count"] += 1
+        d["customers"].add(cid)
+
+    aggregates["total_revenue"] = total
+    aggregates["transaction_count"] = count
+    return aggregates
+
+
+def _unique_factory(aggregates):
+    error = aggregates.get("unique_error")
+    if error is None:
+        return set
+    return lambda: HyperLogLog(error)
+
+
+def aggregate_sales(transactions, unique_error=None, customer_products=True):
+    """
+    Computes every sales metric in one scan of the transactions
+    Returns: aggregate state that can be passed to the analytics functions
+    """
+    return update_aggregates(empty_aggregates(unique_error, customer_products), transactions)
+
+
+def merge_aggregates(aggregates, other):
+    """
+    Merges another aggregate state (e.g. from a separate chunk of the
+    file) into aggregates. Keys keep first-appearance order when chunks
+    are merged in file order.
+    Returns: the merged aggregate state
+    """
+    aggregates["total_revenue"] += other["total_revenue"]
+    aggregates["transaction_count"] += other["transaction_count"]
+
+    for region, stats in other["regions"].items():
+        r = aggregates["regions"].setdefault(region, {"total_sales": 0.0, "transaction_count": 0})
+        r["total_sales"] += stats["total_sales"]
+        r["transaction_count"] += stats["transaction_count"]
+
+    for product, stats in other["products"].items():
+        p = aggregates["products"].setdefault(product, {"qty": 0, "revenue": 0.0})
+        p["qty"] += stats["qty"]
+        p["revenue"] += stats["revenue"]
+
+    for cid, stats in other["customers"].items():
+        c = aggregates["customers"].get(cid)
+        if c is None:
+            c = aggregates["customers"][cid] = {"total_spent": 0.0, "purchase_count": 0}
+            if "products_bought" in stats:
+                c["products_bought"] = set()
+        c["total_spent"] += stats["total_spent"]
+        c["purchase_count"] += stats["purchase_count"]
+        if "products_bought" in c:
+            c["products_bought"] |= stats.get("products_bought", set())
+
+    if other.get("customer_sketch") is not None:
+        if aggregates.get("customer_sketch") is None:
+            aggregates["customer_sketch"] = SpaceSaving(other["customer_sketch"].capacity)
+        aggregates["customer_sketch"].merge(other["customer_sketch"])
+
+    new_unique = _unique_factory(aggregates)
+    for date, stats in other["daily"].items():
+        d = aggregates["daily"].get(date)
+        if d is None:
+            d = aggregates["daily"][date] = {"revenue": 0.0, "transaction_count": 0, "customers": new_unique()}
+        d["revenue"] += stats["revenue"]
+        d["transaction_count"] += stats["transaction_count"]
+        d["customers"] |= stats["customers"]
+
+    return aggregates
+
+
+# ---------- Targeted scans ----------
+# A standalone call (no aggregates passed) only builds the one table it
+# needs instead of running the full aggregate_sales pass.
+
+def _scan_regions(transactions):
+    regions = {}
+    for t in transactions:
+        region = t.Region
+        amount = t.amount
 
-        region_stats[region]["total_sales"] += amount
-        region_stats[region]["transaction_count"] += 1
+        r = regions.get(region)
+        if r is None:
+            r = regions[region] = {"total_sales": 0.0, "transaction_count": 0}
+        r["total_sales"] += amount
+        r["transaction_count"] += 1
+    return regions
 
-    for r in region_stats:
-        region_stats[r]["percentage"] = (region_stats[r]["total_sales"] / total_revenue) * 100 if total_revenue else 0
 
-    # Sort by total_sales descending
-    sorted_regions = dict(sorted(region_stats.items(), key=lambda x: x[1]["total_sales"], reverse=True))
-    return sorted_regions
+def _scan_products(transactions):
+    products = {}
+    for t in transactions:
+        product = t.ProductName
+        qty = t.Quantity
+        amount = t.amount
 
+        p = products.get(product)
+        if p is None:
+            p = products[product] = {"qty": 0, "revenue": 0.0}
+        p["qty"] += qty
+        p["revenue"] += amount
+    return products
 
-def top_selling_products(transactions, n=5):
-    product_stats = {}
 
+def _scan_customers(transactions):
+    customers = {}
     for t in transactions:
-        product = t["ProductName"]
-        qty = t["Quantity"]
-        revenue = t["Quantity"] * t["UnitPrice"]
-
-        if product not in product_stats:
-            product_stats[product] = {"qty": 0, "revenue": 0.0}
+        cid = t.CustomerID
+        product = t.ProductName
+        amount = t.amount
+
+        c = customers.get(cid)
+        if c is None:
+            c = customers[cid] = {"total_spent": 0.0, "purchase_count": 0, "products_bought": set()}
+        c["total_spent"] += amount
+        c["purchase_count"] += 1
+        c["products_bought"].add(product)
+    return customers
+
+
+def _scan_daily(transactions, unique_error=None, with_customers=True):
+    new_unique = _unique_factory({"unique_error": unique_error})
+    daily = {}
+    for t in transactions:
+        date = t.Date
+        amount = t.amount
+        cid = t.CustomerID
+
+        d = daily.get(date)
+        if d is None:
+            d = daily[date] = {"revenue": 0.0, "transaction_count": 0}
+            if with_customers:
+                d["customers"] = new_unique()
+        d["revenue"] += amount
+        d["transaction_count"] += 1
+        if with_customers:
+            d["customers"].add(cid)
+    return daily
+
+
+_SCANS = {
+    "regions": _scan_regions,
+    "products": _scan_products,
+    "customers": _scan_customers,
+    "daily": _scan_daily
+}
+
+
+def _resolve(transactions, aggregates, table):
+    if aggregates is not None:
+        return aggregates[table]
+    return _SCANS[table](transactions)
+
+
+# ---------- SQLite store ----------
+# The functions below also accept the transactions table of a SQLite
+# store (utils/sqlstore.py): pass the connection, or a StoreQuery for a
+# filtered selection, and they answer with one indexed query instead of
+# scanning rows. Ties are broken by first appearance (MIN(rowid)) like
+# the dictionary versions; SQLite may add up REAL amounts in a different
+# order, so non-integer sums can differ in the last digits.
+
+class StoreQuery:
+    """
+    Filtered selection of the transactions in a SQLite store
+    region, min_amount, max_amount, start_date and end_date become an
+    indexed WHERE clause.
+    """
+
+    def __init__(self, conn, region=None, min_amount=None, max_amount=None, start_date=None, end_date=None):
+        self.conn = conn
+        clauses, params = [], []
+        if region:
+            clauses.append("region_key = ?")
+            params.append(region.lower())
+        if min_amount is not None:
+            clauses.append("amount >= ?")
+            params.append(min_amount)
+        if max_amount is not None:
+            clauses.append("amount <= ?")
+            params.append(max_amount)
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        self.where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        self.params = params
+
+    def select(self, columns, rest="", params=()):
+        """
+        Runs SELECT columns FROM transactions <filters> rest
+        params are bound after the filter parameters
+        Returns: sqlite3 cursor
+        """
+        return self.conn.execute(f"SELECT {columns} FROM transactions{self.where} {rest}",
+                                 self.params + list(params))
+
+
+def _store(transactions):
+    if isinstance(transactions, StoreQuery):
+        return transactions
+    if isinstance(transactions, sqlite3.Connection):
+        return StoreQuery(transactions)
+    return None
+
+
+def calculate_total_revenue(transactions, aggregates=None):
+    if aggregates is not None:
+        return aggregates["total_revenue"]
+    store = _store(transactions)
+    if store is not None:
+        return store.select("COALESCE(SUM(amount), 0.0)").fetchone()[0]
 
-        product_stats[product]["qty"] += qty
-        product_stats[product]["revenue"] += revenue
+    total = 0.0
+    for t in transactions:
+        total += t.amount
+    return total
 
-    result = []
-    for p in product_stats:
-        result.append((p, product_stats[p]["qty"], product_stats[p]["revenue"]))
 
-    result.sort(key=lambda x: x[1], reverse=True)
-    return result[:n]
+def region_wise_sales(transactions, aggregates=None):
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        regions = {
+            region: {"total_sales": sales, "transaction_count": count}
+            for region, sales, count in store.select(
+                "region, SUM(amount), COUNT(*)", "GROUP BY region ORDER BY SUM(amount) DESC, MIN(rowid)")
+        }
+    else:
+        regions = _resolve(transactions, aggregates, "regions")
 
+    if aggregates is not None:
+        total_revenue = aggregates["total_revenue"]
+    else:
+        total_revenue = sum(stats["total_sales"] for stats in regions.values())
 
-def customer_analysis(transactions):
-    customer_stats = {}
+    region_stats = {}
+    for r, stats in regions.items():
+        region_stats[r] = {
+            "total_sales": stats["total_sales"],
+            "transaction_count": stats["transaction_count"],
+            "percentage": (stats["total_sales"] / total_revenue) * 100 if total_revenue else 0
+        }
 
-    for t in transactions:
-        cid = t["CustomerID"]
-        amount = t["Quantity"] * t["UnitPrice"]
-        product = t["ProductName"]
+    # Sort by total_sales descending
+    sorted_regions = dict(sorted(region_stats.items(), key=lambda x: x[1]["total_sales"], reverse=True))
+    return sorted_regions
 
-        if cid not in customer_stats:
-            customer_stats[cid] = {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()
-            }
 
-        customer_stats[cid]["total_spent"] += amount
-        customer_stats[cid]["purchase_count"] += 1
-        customer_stats[cid]["products_bought"].add(product)
+def top_selling_products(transactions, n=5, aggregates=None):
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        return [tuple(r) for r in store.select(
+            "product_name, SUM(quantity), SUM(amount)",
+            "GROUP BY product_name ORDER BY SUM(quantity) DESC, MIN(rowid) LIMIT ?", [n])]
+
+    product_stats = _resolve(transactions, aggregates, "products")
+
+    # nlargest keeps ties in first-seen order, like a stable sort
+    best = heapq.nlargest(n, product_stats.items(), key=lambda x: x[1]["qty"])
+    return [(p, stats["qty"], stats["revenue"]) for p, stats in best]
+
+
+def _customer_summary(total_spent, count, products):
+    return {
+        "total_spent": total_spent,
+        "purchase_count": count,
+        "average_value": total_spent / count if count else 0,
+        "products_bought": sorted(products) if products is not None else None
+    }
+
+
+def _sketched_customers(aggregates, n):
+    # Space-Saving estimates; purchase_count only counts purchases made
+    # since the customer entered the summary
+    sketch = aggregates["customer_sketch"]
+    return {
+        cid: _customer_summary(spent, count, None)
+        for cid, spent, _, count in sketch.top(len(sketch.counters) if n is None else n)
+    }
+
+
+def _stored_customers(store, n):
+    limit, params = ("LIMIT ?", [n]) if n is not None else ("", [])
+    customers = store.select("customer_id, SUM(amount), COUNT(*)",
+                             f"GROUP BY customer_id ORDER BY SUM(amount) DESC, MIN(rowid) {limit}", params).fetchall()
+
+    products = {cid: [] for cid, _, _ in customers}
+    if n is None:
+        rows = store.select("DISTINCT customer_id, product_name")
+    elif products:
+        # Only the product sets of the top n customers are read
+        ids = list(products)
+        keyword = "AND" if store.where else "WHERE"
+        rows = store.select("DISTINCT customer_id, product_name",
+                            f"{keyword} customer_id IN ({', '.join('?' * len(ids))})", ids)
+    else:
+        rows = []
+    for cid, name in rows:
+        if cid in products:
+            products[cid].append(name)
+
+    return {cid: _customer_summary(spent, count, products[cid]) for cid, spent, count in customers}
+
+
+def customer_analysis(transactions, aggregates=None):
+    if aggregates is not None and aggregates.get("customer_sketch") is not None:
+        return _sketched_customers(aggregates, None)
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        return _stored_customers(store, None)
+    customer_stats = _resolve(transactions, aggregates, "customers")
 
     final = {}
-    for cid in customer_stats:
-        total_spent = customer_stats[cid]["total_spent"]
-        count = customer_stats[cid]["purchase_count"]
-        final[cid] = {
-            "total_spent": total_spent,
-            "purchase_count": count,
-            "average_value": total_spent / count if count else 0,
-            "products_bought": sorted(list(customer_stats[cid]["products_bought"]))
-        }
+    for cid, stats in customer_stats.items():
+        final[cid] = _customer_summary(stats["total_spent"], stats["purchase_count"], stats.get("products_bought"))
 
     # Sort by total_spent descending
     sorted_customers = dict(sorted(final.items(), key=lambda x: x[1]["total_spent"], reverse=True))
     return sorted_customers
 
 
-def daily_sales_trend(transactions):
-    trend = {}
+def top_customers(transactions, n=5, aggregates=None):
+    """
+    Top n customers by total spent without sorting every customer
+    With a customer_capacity aggregate state the values are Space-Saving
+    estimates (see empty_aggregates)
+    Returns: dictionary in the customer_analysis format for n customers
+    """
+    if aggregates is not None and aggregates.get("customer_sketch") is not None:
+        return _sketched_customers(aggregates, n)
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        return _stored_customers(store, n)
+    customer_stats = _resolve(transactions, aggregates, "customers")
+
+    result = {}
+    for cid, stats in heapq.nlargest(n, customer_stats.items(), key=lambda x: x[1]["total_spent"]):
+        result[cid] = _customer_summary(stats["total_spent"], stats["purchase_count"], stats.get("products_bought"))
+    return result
 
-    for t in transactions:
-        date = t["Date"]
-        cid = t["CustomerID"]
 
-        if date not in trend:
-            trend[date] = {"transaction_count": 0, "unique_customers": set()}
+def track_heavy_hitters(transactions, capacity=1000, sketches=None):
+    """
+    Streams transactions into bounded-memory Space-Saving summaries of
+    products (by quantity, with revenue) and customers (by amount spent,
+    with purchase count)
+    Returns: dictionary with "products" and "customers" summaries
+    """
+    if sketches is None:
+        sketches = {"products": SpaceSaving(capacity), "customers": SpaceSaving(capacity)}
+    products = sketches["products"].update
+    customers = sketches["customers"].update
 
-        trend[date]["transaction_count"] += 1
-        trend[date]["unique_customers"].add(cid)
+    for t in transactions:
+        products(t.ProductName, t.Quantity, t.amount)
+        customers(t.CustomerID, t.amount, 1)
+
+    return sketches
+
+
+def approximate_top_products(transactions, n=5, capacity=1000, sketches=None):
+    """
+    Approximate top_selling_products using bounded memory
+    Returns: list of (product, estimated qty, revenue since tracked)
+    """
+    if sketches is None:
+        sketches = track_heavy_hitters(transactions, capacity)
+    return [(p, qty, revenue) for p, qty, _, revenue in sketches["products"].top(n)]
+
+
+def approximate_top_customers(transactions, n=5, capacity=1000, sketches=None):
+    """
+    Approximate top customers by amount spent using bounded memory
+    Returns: list of (customer, estimated total spent, purchases since tracked)
+    """
+    if sketches is None:
+        sketches = track_heavy_hitters(transactions, capacity)
+    return [(cid, spent, count) for cid, spent, _, count in sketches["customers"].top(n)]
+
+
+def daily_sales_trend(transactions, aggregates=None, unique_error=None):
+    """
+    Transactions and unique customers per date
+    unique_error: count unique customers approximately with HyperLogLog
+    (ignored when aggregates are passed; they carry their own setting)
+    """
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        return {
+            date: {"transaction_count": count, "unique_customers": unique}
+            for date, count, unique in store.select(
+                "date, COUNT(*), COUNT(DISTINCT customer_id)", "GROUP BY date ORDER BY date")
+        }
+
+    if aggregates is None:
+        trend = _scan_daily(transactions, unique_error)
+    else:
+        trend = aggregates["daily"]
 
-    # Convert unique_customers set to count
+    # Convert unique customer sets to counts
     result = {}
     for d in sorted(trend.keys()):
         result[d] = {
             "transaction_count": trend[d]["transaction_count"],
-            "unique_customers": len(trend[d]["unique_customers"])
+            "unique_customers": len(trend[d]["customers"])
         }
 
     return result
 
 
-def find_peak_sales_day(transactions):
-    daily_revenue = {}
-    daily_count = {}
+def period_key(date, period):
+    """
+    ISO week ("2024-W49") or month ("2024-12") of a YYYY-MM-DD date
+    """
+    if period == "month":
+        return date[:7]
+    if period == "week":
+        year, week, _ = datetime.strptime(date, "%Y-%m-%d").isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Unknown period '{period}' (expected 'week' or 'month')")
 
-    for t in transactions:
-        date = t["Date"]
-        amount = t["Quantity"] * t["UnitPrice"]
 
-        daily_revenue[date] = daily_revenue.get(date, 0.0) + amount
-        daily_count[date] = daily_count.get(date, 0) + 1
+def unique_customers_by_period(transactions, period="month", aggregates=None):
+    """
+    Unique customers per ISO week ("2024-W49") or month ("2024-12"),
+    computed by unioning the daily customer sets or sketches, so no
+    rescan of the transactions is needed
+    Returns: dictionary period -> unique customer count
+    """
+    daily = _resolve(transactions, aggregates, "daily")
+
+    grouped = {}
+    for d in sorted(daily):
+        grouped.setdefault(period_key(d, period), []).append(daily[d]["customers"])
 
-    peak_date = max(daily_revenue, key=daily_revenue.get)
-    return (peak_date, daily_revenue[peak_date], daily_count[peak_date])
+    result = {}
+    for key, parts in grouped.items():
+        if isinstance(parts[0], HyperLogLog):
+            result[key] = len(HyperLogLog.union(parts))
+        else:
+            result[key] = len(set().union(*parts))
+    return result
 
 
-def low_performing_products(transactions, threshold=10):
-    product_stats = {}
+def find_peak_sales_day(transactions, aggregates=None):
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        row = store.select("date, SUM(amount), COUNT(*)",
+                           "GROUP BY date ORDER BY SUM(amount) DESC, MIN(rowid) LIMIT 1").fetchone()
+        if row is None:
+            raise ValueError("find_peak_sales_day() needs at least one transaction")
+        return tuple(row)
+
+    if aggregates is None:
+        daily = _scan_daily(transactions, with_customers=False)
+    else:
+        daily = aggregates["daily"]
+
+    peak_date = max(daily, key=lambda d: daily[d]["revenue"])
+    return (peak_date, daily[peak_date]["revenue"], daily[peak_date]["transaction_count"])
 
-    for t in transactions:
-        product = t["ProductName"]
-        qty = t["Quantity"]
-        revenue = qty * t["UnitPrice"]
 
-        if product not in product_stats:
-            product_stats[product] = {"qty": 0, "revenue": 0.0}
+def low_performing_products(transactions, threshold=10, aggregates=None):
+    store = _store(transactions) if aggregates is None else None
+    if store is not None:
+        return [tuple(r) for r in store.select(
+            "product_name, SUM(quantity), SUM(amount)",
+            "GROUP BY product_name HAVING SUM(quantity) < ? ORDER BY SUM(quantity), MIN(rowid)", [threshold])]
 
-        product_stats[product]["qty"] += qty
-        product_stats[product]["revenue"] += revenue
+    product_stats = _resolve(transactions, aggregates, "products")
 
     low_products = []
     for p in product_stats:
@@ -1,87 +1,212 @@
 # utils/file_handler.py
 
+import mmap
+import os
+
+from utils.records import Transaction, as_transaction, paused_gc
+
+ENCODINGS = ["utf-8", "latin-1", "cp1252"]
+CHUNK_SIZE = 1 << 20
+
+
+def _decode_line(raw):
+    for enc in ENCODINGS:
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode(ENCODINGS[0], errors="replace")
+
+
+def _decode_chunk(chunk):
+    """
+    Decodes a block of whole lines, falling back to per-line encoding
+    detection only when the block is not valid utf-8
+    """
+    try:
+        return chunk.decode(ENCODINGS[0]).split("\n")
+    except UnicodeDecodeError:
+        return [_decode_line(raw) for raw in chunk.split(b"\n")]
+
+
+def iter_chunks(filename, start=None, end=None):
+    """
+    Memory-maps the sales file and yields blocks of whole lines as bytes
+    By default the header line is skipped; start/end select a byte range
+    that is already aligned to line boundaries
+    """
+    with open(filename, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if start is None:
+                newline = data.find(b"\n")
+                start = size if newline == -1 else newline + 1
+            end = size if end is None else end
+
+            pos = start
+            while pos < end:
+                stop = min(pos + CHUNK_SIZE, end)
+                if stop < end:
+                    newline = data.find(b"\n", stop - 1, end)
+                    stop = end if newline == -1 else newline + 1
+                yield data[pos:stop]
+                pos = stop
+
+
 def read_sales_data(filename):
     """
     Reads sales data from file handling encoding issues
+    The file is read as bytes and only blocks that are not valid utf-8
+    are decoded line by line with the latin-1/cp1252 fallbacks
     Returns: list of raw lines (strings)
     """
-    encodings = ["utf-8", "latin-1", "cp1252"]
-
-    for enc in encodings:
-        try:
-            with open(filename, "r", encoding=enc) as file:
-                lines = file.readlines()
-
-            # Skip header and remove empty lines
-            raw_lines = []
-            for line in lines[1:]:
+    try:
+        # Skip header and remove empty lines
+        raw_lines = []
+        for chunk in iter_chunks(filename):
+            for line in _decode_chunk(chunk):
                 line = line.strip()
                 if line:
                     raw_lines.append(line)
 
-            return raw_lines
+        return raw_lines
 
-        except FileNotFoundError:
-            print(f"Error: File '{filename}' not found.")
-            return []
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return []
+
+
+def _decode_fields(fields):
+    for enc in ENCODINGS:
+        try:
+            return [f.decode(enc) for f in fields]
         except UnicodeDecodeError:
             continue
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            return []
+    return [f.decode(ENCODINGS[0], errors="replace") for f in fields]
 
-    print("Error: Unable to read file with supported encodings.")
-    return []
 
-
-def parse_transactions(raw_lines):
+def iter_sales_records(filename, start=None, end=None):
     """
-    Parses raw lines into clean list of dictionaries
-    Returns: list of dictionaries with keys:
-    ['TransactionID','Date','ProductID','ProductName',
-     'Quantity','UnitPrice','CustomerID','Region']
+    Reads and parses the sales file directly from bytes
+    Lines are split on b"|" and the numeric columns are converted without
+    decoding; only the text columns are decoded, with the encoding chosen
+    per line. Produces the same records as
+    parse_transactions(read_sales_data(filename)).
+    Yields: Transaction records
     """
-    transactions = []
-    expected_fields = 8
+    try:
+        for chunk in iter_chunks(filename, start, end):
+            for line in chunk.split(b"\n"):
+                parts = line.strip().split(b"|")
 
-    for line in raw_lines:
-        parts = line.split("|")
+                if len(parts) != 8:
+                    continue
 
-        if len(parts) != expected_fields:
-            continue
+                try:
+                    qty = int(parts[4].replace(b",", b""))
+                    price = float(parts[5].replace(b",", b""))
+                except ValueError:
+                    continue
 
-        transaction_id, date, product_id, product_name, qty, price, customer_id, region = parts
+                transaction_id, date, product_id, product_name, customer_id, region = _decode_fields(
+                    (parts[0], parts[1], parts[2], parts[3].replace(b",", b""), parts[6], parts[7])
+                )
 
-        # Handle commas in ProductName
-        product_name = product_name.replace(",", "")
+                yield Transaction(transaction_id.strip(), date.strip(), product_id.strip(), product_name.strip(),
+                                  qty, price, customer_id.strip(), region.strip())
 
-        # Handle commas in numbers
-        qty = qty.replace(",", "")
-        price = price.replace(",", "")
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"Error reading file: {e}")
 
-        try:
-            qty = int(qty)
-            price = float(price)
-        except:
-            continue
 
-        transactions.append({
-            "TransactionID": transaction_id.strip(),
-            "Date": date.strip(),
-            "ProductID": product_id.strip(),
-            "ProductName": product_name.strip(),
-            "Quantity": qty,
-            "UnitPrice": price,
-            "CustomerID": customer_id.strip(),
-            "Region": region.strip()
-        })
+def _parse_line(line):
+    parts = line.split("|")
+
+    if len(parts) != 8:
+        return None
 
-    return transactions
+    transaction_id, date, product_id, product_name, qty, price, customer_id, region = parts
+
+    # Handle commas in ProductName
+    product_name = product_name.replace(",", "")
+
+    # Handle commas in numbers
+    qty = qty.replace(",", "")
+    price = price.replace(",", "")
+
+    try:
+        qty = int(qty)
+        price = float(price)
+    except ValueError:
+        return None
+
+    return Transaction(transaction_id.strip(), date.strip(), product_id.strip(), product_name.strip(),
+                       qty, price, customer_id.strip(), region.strip())
+
+
+def parse_transactions(raw_lines):
+    """
+    Parses raw lines into clean list of transactions
+    Returns: list of Transaction records (mappings) with keys:
+    ['TransactionID','Date','ProductID','ProductName',
+     'Quantity','UnitPrice','CustomerID','Region']
+    """
+    with paused_gc():
+        parsed = [_parse_line(line) for line in raw_lines]
+    return [t for t in parsed if t is not None]
+
+
+def is_valid_transaction(t):
+    """
+    Applies the validation rules to one parsed transaction
+    Returns: True if the transaction is valid
+    """
+    try:
+        if type(t) is Transaction:
+            return bool(
+                t.CustomerID and t.Region and
+                t.Quantity > 0 and
+                t.UnitPrice > 0 and
+                t.TransactionID.startswith("T") and
+                t.ProductID.startswith("P") and
+                t.CustomerID.startswith("C")
+            )
+        return not (
+            not t.get("CustomerID") or not t.get("Region") or
+            t["Quantity"] <= 0 or
+            t["UnitPrice"] <= 0 or
+            not t["TransactionID"].startswith("T") or
+            not t["ProductID"].startswith("P") or
+            not t["CustomerID"].startswith("C")
+        )
+    except Exception:
+        return False
+
+
+def to_record(t):
+    """
+    Converts a valid transaction mapping to a Transaction record
+    Returns: the record, or None if the mapping cannot be one
+    """
+    try:
+        return as_transaction(t)
+    except (KeyError, TypeError):
+        return None
 
 
 def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
     """
     Validates transactions and applies optional filters
+    Valid rows are returned as Transaction records (other mappings are
+    converted), which is what the analytics functions expect.
 
     Returns:
     Tuple (valid_transactions, invalid_count, filter_summary)
@@ -89,63 +214,75 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     total_input = len(transactions)
     invalid_count = 0
     valid_transactions = []
+    valid_amounts = []
 
-    # Available regions
-    regions = sorted(set([t.get("Region", "").strip() for t in transactions if t.get("Region", "").strip()]))
-    print("Available Regions:", regions)
-
-    # Transaction amount range
-    amounts = []
+    # One pass collects the regions, amount range and valid rows; records
+    # carry their fields as slots and a precomputed amount
+    regions = set()
+    low = high = None
     for t in transactions:
-        try:
-            amounts.append(t["Quantity"] * t["UnitPrice"])
-        except:
-            pass
+        if type(t) is Transaction:
+            r = t.Region.strip()
+            amount = t.amount
+        else:
+            r = t.get("Region", "").strip()
+            try:
+                amount = t["Quantity"] * t["UnitPrice"]
+            except Exception:
+                amount = None
 
-    if amounts:
-        print("Transaction Amount Range:", min(amounts), "to", max(amounts))
+        if r:
+            regions.add(r)
+        if amount is not None:
+            if low is None or amount < low:
+                low = amount
+            if high is None or amount > high:
+                high = amount
 
-    # Validation
-    for t in transactions:
-        try:
-            if (
-                not t.get("CustomerID") or not t.get("Region") or
-                t["Quantity"] <= 0 or
-                t["UnitPrice"] <= 0 or
-                not t["TransactionID"].startswith("T") or
-                not t["ProductID"].startswith("P") or
-                not t["CustomerID"].startswith("C")
-            ):
+        if not is_valid_transaction(t):
+            invalid_count += 1
+            continue
+        if type(t) is not Transaction:
+            # Valid rows leave as records, so later stages can use attributes
+            t = to_record(t)
+            if t is None:
                 invalid_count += 1
                 continue
 
-            valid_transactions.append(t)
+        valid_transactions.append(t)
+        valid_amounts.append(amount)
 
-        except:
-            invalid_count += 1
+    print("Available Regions:", sorted(regions))
+    if low is not None:
+        print("Transaction Amount Range:", low, "to", high)
 
     filtered_by_region = 0
     filtered_by_amount = 0
 
-    # Apply region filter
-    if region:
-        before = len(valid_transactions)
-        valid_transactions = [t for t in valid_transactions if t["Region"].lower() == region.lower()]
-        filtered_by_region = before - len(valid_transactions)
-        print(f"After region filter ({region}): {len(valid_transactions)}")
-
-    # Apply amount filters
-    if min_amount is not None:
-        before = len(valid_transactions)
-        valid_transactions = [t for t in valid_transactions if (t["Quantity"] * t["UnitPrice"]) >= min_amount]
-        filtered_by_amount += before - len(valid_transactions)
-        print(f"After min amount filter ({min_amount}): {len(valid_transactions)}")
-
-    if max_amount is not None:
-        before = len(valid_transactions)
-        valid_transactions = [t for t in valid_transactions if (t["Quantity"] * t["UnitPrice"]) <= max_amount]
-        filtered_by_amount += before - len(valid_transactions)
-        print(f"After max amount filter ({max_amount}): {len(valid_transactions)}")
+    # Apply region and amount filters to (row, amount) pairs
+    if region or min_amount is not None or max_amount is not None:
+        rows = list(zip(valid_transactions, valid_amounts))
+
+        if region:
+            wanted = region.lower()
+            before = len(rows)
+            rows = [(t, a) for t, a in rows if t["Region"].lower() == wanted]
+            filtered_by_region = before - len(rows)
+            print(f"After region filter ({region}): {len(rows)}")
+
+        if min_amount is not None:
+            before = len(rows)
+            rows = [(t, a) for t, a in rows if a >= min_amount]
+            filtered_by_amount += before - len(rows)
+            print(f"After min amount filter ({min_amount}): {len(rows)}")
+
+        if max_amount is not None:
+            before = len(rows)
+            rows = [(t, a) for t, a in rows if a <= max_amount]
+            filtered_by_amount += before - len(rows)
+            print(f"After max amount filter ({max_amount}): {len(rows)}")
+
+        valid_transactions = [t for t, _ in rows]
 
     summary = {
         "total_input": total_input,
@@ -156,3 +293,86 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     }
 
     return valid_transactions, invalid_count, summary
+
+
+def iter_valid_transactions(transactions, summary, region=None, min_amount=None, max_amount=None):
+    """
+    Streaming counterpart of validate_and_filter
+    Like validate_and_filter, it yields Transaction records only.
+    Counters are written into the given summary dictionary as rows pass
+    through, so it is complete once the generator is exhausted. It also
+    records the available regions and amount range that
+    validate_and_filter prints.
+    Yields: valid transactions that pass the filters
+    """
+    summary.update({
+        "total_input": 0,
+        "invalid": 0,
+        "filtered_by_region": 0,
+        "filtered_by_amount": 0,
+        "final_count": 0,
+        "regions": set(),
+        "min_seen": None,
+        "max_seen": None
+    })
+    wanted_region = region.lower() if region else None
+
+    for t in transactions:
+        summary["total_input"] += 1
+
+        if type(t) is Transaction:
+            r = t.Region.strip()
+            amount = t.amount
+        else:
+            r = t.get("Region", "").strip()
+            try:
+                amount = t["Quantity"] * t["UnitPrice"]
+            except Exception:
+                amount = None
+        if r:
+            summary["regions"].add(r)
+        if amount is not None:
+            if summary["min_seen"] is None or amount < summary["min_seen"]:
+                summary["min_seen"] = amount
+            if summary["max_seen"] is None or amount > summary["max_seen"]:
+                summary["max_seen"] = amount
+
+        if not is_valid_transaction(t):
+            summary["invalid"] += 1
+            continue
+        if type(t) is not Transaction:
+            t = to_record(t)
+            if t is None:
+                summary["invalid"] += 1
+                continue
+
+        if wanted_region and t["Region"].lower() != wanted_region:
+            summary["filtered_by_region"] += 1
+            continue
+
+        if (min_amount is not None and amount < min_amount) or (max_amount is not None and amount > max_amount):
+            summary["filtered_by_amount"] += 1
+            continue
+
+        summary["final_count"] += 1
+        yield t
+
+
+def merge_validation_summaries(summary, other):
+    """
+    Merges the validation summary of one batch of rows into another
+    """
+    if not summary:
+        summary.update(other)
+        summary["regions"] = set(other["regions"])
+        return summary
+
+    for key in ("total_input", "invalid", "filtered_by_region", "filtered_by_amount", "final_count"):
+        summary[key] += other[key]
+    summary["regions"] |= other["regions"]
+
+    for key, pick in (("min_seen", min), ("max_seen", max)):
+        if other[key] is not None:
+            summary[key] = other[key] if summary[key] is None else pick(summary[key], other[key])
+
+    return summary
@@ -0,0 +1,151 @@
+# utils/incremental.py
+
+import hashlib
+import os
+import pickle
+
+from utils.cache import CACHE_DIR
+from utils.file_handler import iter_sales_records, iter_valid_transactions, merge_validation_summaries
+from utils.data_processor import empty_aggregates, update_aggregates
+
+STATE_VERSION = 2
+CHECK_BYTES = 4096
+
+
+def state_path(filename, state_dir=CACHE_DIR):
+    key = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()
+    return os.path.join(state_dir, f"{key}.state")
+
+
+def tail_hash(file, offset):
+    """
+    Hashes the bytes just before offset, used to detect a file that was
+    rewritten or truncated instead of appended to
+    """
+    start = max(offset - CHECK_BYTES, 0)
+    file.seek(start)
+    return hashlib.sha256(file.read(offset - start)).hexdigest()
+
+
+def complete_end(file, size):
+    """
+    Returns the offset just after the last newline, so a line that is
+    still being written is left for the next run
+    """
+    pos = size
+    while pos > 0:
+        start = max(pos - CHECK_BYTES, 0)
+        file.seek(start)
+        block = file.read(pos - start)
+        newline = block.rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        pos = start
+    return 0
+
+
+def data_start(file, end):
+    """
+    Returns the offset of the first line after the header (capped at end)
+    """
+    file.seek(0)
+    header = file.readline()
+    return min(len(header), end) if header.endswith(b"\n") else end
+
+
+def new_state(filters):
+    return {
+        "version": STATE_VERSION,
+        "filters": filters,
+        "offset": None,
+        "tail_hash": None,
+        # Per-customer product sets are never read and would grow without bound
+        "aggregates": empty_aggregates(filters.get("unique_error"), customer_products=False),
+        "validation": {},
+        "enrichment": {}
+    }
+
+
+def load_state(filename, filters, state_dir=CACHE_DIR):
+    """
+    Loads the saved incremental state for filename
+    The state is discarded when the filters differ or the already
+    processed part of the file no longer matches (rewrite/truncation)
+    Returns: state dictionary or None
+    """
+    try:
+        with open(state_path(filename, state_dir), "rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        return None
+
+    if state.get("version") != STATE_VERSION or state.get("filters") != filters:
+        return None
+
+    try:
+        with open(filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < state["offset"] or tail_hash(file, state["offset"]) != state["tail_hash"]:
+                return None
+    except OSError:
+        return None
+
+    return state
+
+
+def save_state(filename, state, state_dir=CACHE_DIR):
+    """
+    Writes the incremental state atomically
+    """
+    try:
+        os.makedirs(state_dir, exist_ok=True)
+        path = state_path(filename, state_dir)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Warning: could not save incremental state: {e}")
+
+
+def process_incremental(filename, region=None, min_amount=None, max_amount=None, state_dir=CACHE_DIR,
+                        unique_error=None):
+    """
+    Parses only the part of an append-only sales file added since the
+    previous run and folds it into the saved aggregate state
+    Returns: tuple (state, new valid rows, resumed) - the caller updates
+    state["enrichment"] if needed and then calls save_state
+    """
+    filters = {"region": region, "min_amount": min_amount, "max_amount": max_amount, "unique_error": unique_error}
+    state = load_state(filename, filters, state_dir)
+    resumed = state is not None
+    if state is None:
+        state = new_state(filters)
+
+    with open(filename, "rb") as file:
+        end = complete_end(file, os.fstat(file.fileno()).st_size)
+
+        if state["offset"] is None:
+            state["offset"] = data_start(file, end)
+
+        start = state["offset"]
+        if end > start:
+            state["tail_hash"] = tail_hash(file, end)
+            state["offset"] = end
+        elif state["tail_hash"] is None:
+            state["tail_hash"] = tail_hash(file, start)
+
+    summary = {}
+    new_rows = []
+    if end > start:
+        new_rows = list(iter_valid_transactions(
+            iter_sales_records(filename, start, end), summary,
+            region=region, min_amount=min_amount, max_amount=max_amount
+        ))
+        update_aggregates(state["aggregates"], new_rows)
+    else:
+        for _ in iter_valid_transactions([], summary):
+            pass
+
+    merge_validation_summaries(state["validation"], summary)
+    return state, new_rows, resumed
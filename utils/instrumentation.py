@@ -0,0 +1,156 @@
+# utils/instrumentation.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process so far (None if unavailable)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def children_cpu_seconds():
+    """
+    User + system CPU time of all child processes that have finished and
+    been waited for so far (None if unavailable)
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class PipelineMetrics:
+    """
+    Records wall time, CPU time, memory and row counts per pipeline stage
+
+    Usage:
+        metrics = PipelineMetrics(trace_memory=True, profile_stage="parse")
+        with metrics.stage("parse") as record:
+            rows = parse(...)
+            record["rows"] = len(rows)
+        metrics.save("output/pipeline_metrics.json")
+
+    trace_memory adds the tracemalloc peak of each stage (slower);
+    profile_stage runs cProfile on that stage, saves the stats next to
+    the metrics file and prints the top functions.
+    ru_maxrss is a process-lifetime high-water mark, so each stage records
+    peak_rss_so_far_bytes (the peak at the end of the stage) and
+    peak_rss_growth_bytes (how much the stage raised it; 0 when the stage
+    stayed below an earlier peak).
+    Stages may run concurrently: start_seconds and elapsed_seconds show
+    the overlap (total_wall_seconds is the sum over stages), and a
+    traced peak or RSS growth then includes allocations of overlapping stages.
+    cpu_seconds is the CPU time of the thread that ran the stage only;
+    child_cpu_seconds adds the CPU time of worker processes that exited
+    during the stage (process pools are shut down inside their stage).
+    When stages overlap, a worker that exits is counted in every stage
+    running at that moment.
+    """
+
+    def __init__(self, trace_memory=False, profile_stage=None, profile_dir="output"):
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+        self.profile_path = None
+        self._origin = time.perf_counter()
+        self._finished = self._origin
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        record = {"stage": name, "rows": rows}
+
+        profiler = None
+        if name == self.profile_stage:
+            profiler = cProfile.Profile()
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        children_start = children_cpu_seconds()
+        rss_start = peak_rss_bytes()
+        record["start_seconds"] = round(wall_start - self._origin, 6)
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+            wall_end = time.perf_counter()
+            self._finished = max(self._finished, wall_end)
+            record["wall_seconds"] = round(wall_end - wall_start, 6)
+            record["cpu_seconds"] = round(time.thread_time() - cpu_start, 6)
+            if children_start is not None:
+                record["child_cpu_seconds"] = round(children_cpu_seconds() - children_start, 6)
+            rss_end = peak_rss_bytes()
+            record["peak_rss_so_far_bytes"] = rss_end
+            if rss_start is not None:
+                record["peak_rss_growth_bytes"] = rss_end - rss_start
+            if self.trace_memory:
+                record["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1] - traced_before
+
+            self.stages.append(record)
+            if profiler is not None:
+                self._save_profile(name, profiler)
+
+    def _save_profile(self, name, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.profile_path = os.path.join(self.profile_dir, f"profile_{name}.prof")
+        profiler.dump_stats(self.profile_path)
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+        print(f"\nProfile of stage '{name}' (saved to {self.profile_path}):")
+        print(out.getvalue())
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "elapsed_seconds": round(self._finished - self._origin, 6),
+            "total_wall_seconds": round(sum(s["wall_seconds"] for s in self.stages), 6),
+            "total_cpu_seconds": round(sum(s["cpu_seconds"] for s in self.stages), 6),
+            "total_child_cpu_seconds": round(sum(s.get("child_cpu_seconds", 0) for s in self.stages), 6),
+            "profile": self.profile_path,
+            "stages": self.stages
+        }
+
+    def save(self, filename="output/pipeline_metrics.json"):
+        """
+        Writes the collected metrics as JSON
+        """
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
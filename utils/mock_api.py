@@ -0,0 +1,122 @@
+# utils/mock_api.py
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_catalog(count=250):
+    """
+    Builds a fake product catalog in the DummyJSON format
+    Returns: list of product dictionaries
+    """
+    categories = ["laptops", "smartphones", "accessories", "monitors"]
+    return [
+        {
+            "id": i,
+            "title": f"Product {i}",
+            "category": categories[i % len(categories)],
+            "brand": f"Brand {i % 7}",
+            "rating": round(3 + (i % 20) / 10, 2),
+            "price": 10 * i
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _etag(body):
+    # Like most servers, the ETag identifies this response body only
+    return '"%s"' % hashlib.sha1(json.dumps(body).encode("utf-8")).hexdigest()
+
+
+class _CatalogHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+
+        with server.lock:
+            server.request_count += 1
+            count = server.request_count
+
+        if url.path != "/products":
+            self._send(404, {"message": "not found"})
+            return
+        if server.fail_every and count % server.fail_every == 0:
+            self._send(503, {"message": "try again"})
+            return
+        if server.delay:
+            time.sleep(server.delay)
+
+        query = parse_qs(url.query)
+        limit = int(query.get("limit", ["30"])[0])
+        if server.max_limit and (limit == 0 or limit > server.max_limit):
+            limit = server.max_limit
+        skip = int(query.get("skip", ["0"])[0])
+        select = query.get("select", [None])[0]
+
+        page = server.products[skip:skip + limit] if limit else server.products[skip:]
+        if select:
+            fields = ["id"] + select.split(",")
+            page = [{k: p.get(k) for k in fields} for p in page]
+
+        body = {"products": page, "total": len(server.products), "skip": skip, "limit": limit}
+        etag = _etag(body)
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, None, etag)
+        else:
+            self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(products=None, port=0, fail_every=0, delay=0.0, max_limit=0):
+    """
+    Starts a local stand-in for the DummyJSON products endpoint in a
+    background thread (supports limit, skip, select and a per-response
+    ETag with If-None-Match)
+    fail_every=N answers every Nth request with 503 to exercise retries
+    max_limit=N caps the page length like a server with a maximum limit
+    Returns: tuple (server, products url) - call server.shutdown() to stop
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _CatalogHandler)
+    server.products = products if products is not None else make_catalog()
+    server.fail_every = fail_every
+    server.delay = delay
+    server.max_limit = max_limit
+    server.request_count = 0
+    server.lock = threading.Lock()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/products"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the DummyJSON products API")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--count", type=int, default=250, help="number of products in the catalog")
+    args = parser.parse_args()
+
+    server, url = start_mock_server(make_catalog(args.count), port=args.port)
+    print(f"Mock products API running at {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
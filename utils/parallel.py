@@ -0,0 +1,166 @@
+# utils/parallel.py
+
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from utils.file_handler import iter_sales_records, iter_valid_transactions, merge_validation_summaries
+from utils.data_processor import empty_aggregates, update_aggregates, merge_aggregates
+from utils.api_handler import iter_enriched_data, track_enrichment, save_enriched_data
+from utils.cube import build_cube, merge_cubes
+from utils.writers import BATCH_SIZE
+
+
+def split_byte_ranges(filename, parts):
+    """
+    Splits the data section of the sales file into byte ranges that start
+    and end on line boundaries (the header line is excluded)
+    Returns: list of (start, end) offsets
+    """
+    size = os.path.getsize(filename)
+
+    with open(filename, "rb") as file:
+        file.readline()  # header
+        data_start = file.tell()
+
+        bounds = [data_start]
+        step = max((size - data_start) // max(parts, 1), 1)
+        for i in range(1, parts):
+            pos = data_start + i * step
+            if pos <= bounds[-1]:
+                continue
+            if pos >= size:
+                break
+            file.seek(pos - 1)
+            file.readline()  # move to the start of the next line
+            pos = file.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+        bounds.append(size)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _part_path(filename, index):
+    return f"{filename}.part{index}"
+
+
+def process_range(filename, start, end, region=None, min_amount=None, max_amount=None, keep_rows=False,
+                  unique_error=None, product_mapping=None, enriched_file=None, enriched_format="pipe",
+                  header=True, cube=False):
+    """
+    Parses, validates and aggregates one byte range of the sales file
+    With product_mapping the valid rows are also enriched, and with
+    enriched_file they are written there, in the same pass; cube=True
+    builds the date x region x product cube of the range.
+    Returns: dictionary with aggregates, validation, enrichment, cube and
+    rows (the last three None unless requested)
+    """
+    summary = {}
+    aggregates = empty_aggregates(unique_error, customer_products=False)
+    range_cube = {} if cube else None
+    rows = [] if keep_rows else None
+
+    valid = iter_valid_transactions(
+        iter_sales_records(filename, start, end),
+        summary, region=region, min_amount=min_amount, max_amount=max_amount
+    )
+
+    def counted():
+        # Every batch is folded into the aggregates (and cube) as it passes
+        while True:
+            batch = list(islice(valid, BATCH_SIZE))
+            if not batch:
+                return
+            update_aggregates(aggregates, batch)
+            if range_cube is not None:
+                build_cube(batch, range_cube)
+            if rows is not None:
+                rows.extend(batch)
+            yield from batch
+
+    stream = counted()
+    enrichment = None
+    if product_mapping is not None:
+        enrichment = {}
+        stream = track_enrichment(iter_enriched_data(stream, product_mapping), enrichment)
+        if enriched_file:
+            save_enriched_data(stream, enriched_file, fmt=enriched_format, header=header)
+
+    # Drains whatever the writer did not consume (e.g. after a write error)
+    for _ in stream:
+        pass
+
+    return {"aggregates": aggregates, "validation": summary, "enrichment": enrichment,
+            "cube": range_cube, "rows": rows}
+
+
+def _concatenate(parts, filename):
+    with open(filename, "wb") as out:
+        for part in parts:
+            if os.path.exists(part):
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+                os.remove(part)
+
+
+def parallel_process(filename, workers=None, region=None, min_amount=None, max_amount=None, keep_rows=False,
+                     unique_error=None, product_mapping=None, enriched_file=None, enriched_format="pipe",
+                     cube=False):
+    """
+    Parses, validates and aggregates the sales file across CPU cores
+    Each process handles one line-aligned byte range and the partial
+    states are merged in file order, so keys, counts and orderings match
+    the serial pipeline. Only the merged state comes back to the parent:
+    with product_mapping and enriched_file every worker enriches its own
+    rows and writes them to a part file, and the parts are joined in
+    order into enriched_file. keep_rows=True also returns the valid rows
+    (each one is pickled back to the parent, so avoid it for large files).
+    Returns: dictionary with aggregates, validation, enrichment, cube and rows
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_byte_ranges(filename, workers)
+
+    tasks = [
+        (filename, s, e, region, min_amount, max_amount, keep_rows, unique_error, product_mapping,
+         _part_path(enriched_file, i) if enriched_file else None, enriched_format, i == 0, cube)
+        for i, (s, e) in enumerate(ranges)
+    ]
+
+    if workers == 1 or len(ranges) <= 1:
+        results = [process_range(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_range, *task) for task in tasks]
+            results = [f.result() for f in futures]
+
+    merged = {
+        "aggregates": empty_aggregates(unique_error, customer_products=False),
+        "validation": {},
+        "enrichment": {"total": 0, "enriched": 0, "not_enriched_products": set()} if product_mapping is not None
+        else None,
+        "cube": {} if cube else None,
+        "rows": [] if keep_rows else None
+    }
+
+    for part in results:
+        merge_aggregates(merged["aggregates"], part["aggregates"])
+        merge_validation_summaries(merged["validation"], part["validation"])
+        if merged["enrichment"] is not None:
+            merged["enrichment"]["total"] += part["enrichment"]["total"]
+            merged["enrichment"]["enriched"] += part["enrichment"]["enriched"]
+            merged["enrichment"]["not_enriched_products"] |= part["enrichment"]["not_enriched_products"]
+        if cube:
+            merge_cubes(merged["cube"], part["cube"])
+        if keep_rows:
+            merged["rows"].extend(part["rows"])
+
+    if enriched_file:
+        _concatenate([task[9] for task in tasks], enriched_file)
+
+    if not merged["validation"]:
+        for _ in iter_valid_transactions([], merged["validation"]):
+            pass
+
+    return merged
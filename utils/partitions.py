@@ -0,0 +1,238 @@
+# utils/partitions.py
+
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.cache import file_fingerprint
+from utils.file_handler import read_sales_data, iter_sales_records
+
+STATS_SUFFIX = ".stats.json"
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+# sales_2024-12-01_North.txt or .../date=2024-12-01/region=North/part-0.txt
+_HIVE_DATE = re.compile(r"(?:^|[\\/])date=(\d{4}-\d{2}-\d{2})(?=[\\/])")
+_HIVE_REGION = re.compile(r"(?:^|[\\/])region=([^\\/]+)(?=[\\/])")
+_NAME = re.compile(r"(\d{4}-\d{2}-\d{2})(?:_([^_.]+))?\.[^.]+$")
+
+
+def list_partitions(source):
+    """
+    Finds the partition files of a directory (recursively) or glob pattern
+    Returns: sorted list of paths (stats sidecars excluded)
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            paths.extend(os.path.join(root, f) for f in files if f.endswith(".txt"))
+    else:
+        paths = glob.glob(source, recursive=True)
+
+    return sorted(p for p in paths if os.path.isfile(p) and not p.endswith(STATS_SUFFIX))
+
+
+def stats_path(path):
+    return path + STATS_SUFFIX
+
+
+def write_partition_stats(path):
+    """
+    Scans one partition and writes its date range, regions and row count
+    to a small sidecar file (<partition>.stats.json)
+    Returns: the stats dictionary
+    """
+    min_date = max_date = None
+    regions = set()
+    rows = 0
+
+    for t in iter_sales_records(path):
+        rows += 1
+        date = t["Date"]
+        if date:
+            min_date = date if min_date is None or date < min_date else min_date
+            max_date = date if max_date is None or date > max_date else max_date
+        regions.add(t["Region"].strip())
+
+    stat = os.stat(path)
+    stats = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "rows": rows,
+        "min_date": min_date,
+        "max_date": max_date,
+        "regions": sorted(regions)
+    }
+    with open(stats_path(path), "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+    return stats
+
+
+def read_partition_stats(path):
+    """
+    Returns: the sidecar stats of a partition, or None if there are none or
+    the partition changed since they were written
+    """
+    try:
+        with open(stats_path(path), "r", encoding="utf-8") as f:
+            stats = json.load(f)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+    if stats.get("size") != stat.st_size or stats.get("mtime") != stat.st_mtime_ns:
+        return None
+    return stats
+
+
+def partition_info(path):
+    """
+    What a partition can contain, from its path or its stats sidecar
+    Returns: dictionary with path, min_date, max_date and regions
+    (None where unknown, meaning the partition must be read)
+    """
+    info = {"path": path, "min_date": None, "max_date": None, "regions": None}
+
+    date = _HIVE_DATE.search(path)
+    region = _HIVE_REGION.search(path)
+    name = _NAME.search(os.path.basename(path))
+    if date is None and name:
+        date = name
+    if region is None and name and name.group(2):
+        region = name
+
+    if date:
+        info["min_date"] = info["max_date"] = date.group(1)
+    if region:
+        info["regions"] = [region.group(1) if region.re is _HIVE_REGION else region.group(2)]
+
+    if date is None or region is None:
+        stats = read_partition_stats(path)
+        if stats:
+            if date is None:
+                info["min_date"], info["max_date"] = stats["min_date"], stats["max_date"]
+            if region is None:
+                info["regions"] = stats["regions"]
+
+    return info
+
+
+def partition_matches(info, region=None, start_date=None, end_date=None):
+    if region and info["regions"] is not None:
+        if region.strip().lower() not in {r.strip().lower() for r in info["regions"]}:
+            return False
+    if start_date and info["max_date"] and info["max_date"] < start_date:
+        return False
+    if end_date and info["min_date"] and info["min_date"] > end_date:
+        return False
+    return True
+
+
+def prune_partitions(paths, region=None, start_date=None, end_date=None):
+    """
+    Drops partitions that cannot hold rows for the region / date range
+    Returns: tuple (paths to read, paths skipped)
+    """
+    keep, skipped = [], []
+    for path in paths:
+        if partition_matches(partition_info(path), region, start_date, end_date):
+            keep.append(path)
+        else:
+            skipped.append(path)
+    return keep, skipped
+
+
+def read_partition(path, start_date=None, end_date=None):
+    """
+    Parses one partition, keeping rows inside the date range
+    Returns: list of transaction dictionaries
+    """
+    if not start_date and not end_date:
+        return list(iter_sales_records(path))
+
+    return [
+        t for t in iter_sales_records(path)
+        if (not start_date or t["Date"] >= start_date) and (not end_date or t["Date"] <= end_date)
+    ]
+
+
+def load_partitions(source, region=None, start_date=None, end_date=None, workers=None):
+    """
+    Reads every partition of source that can match the filters, in
+    parallel processes, and concatenates them in path order. Region and
+    amount filters are still applied later by validate_and_filter; rows
+    outside start_date..end_date (YYYY-MM-DD, inclusive) are dropped here.
+    The partitions read are fingerprinted before reading, for cache keys.
+    Returns: tuple (transactions, paths read, paths skipped, fingerprints)
+    """
+    paths, skipped = prune_partitions(list_partitions(source), region, start_date, end_date)
+    fingerprints = [file_fingerprint(p, with_hash=False) for p in paths]
+    workers = min(workers or os.cpu_count() or 1, len(paths)) or 1
+
+    if workers == 1:
+        parts = [read_partition(p, start_date, end_date) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(read_partition, paths, [start_date] * len(paths), [end_date] * len(paths)))
+
+    transactions = []
+    for part in parts:
+        transactions.extend(part)
+
+    return transactions, paths, skipped, fingerprints
+
+
+def split_into_partitions(filename, out_dir, write_stats=True):
+    """
+    Splits one sales file into sales_<date>_<region>.txt partitions
+    Lines whose date or region cannot be read go to sales_unpartitioned.txt
+    so nothing is lost.
+    Returns: list of partition paths written
+    """
+    groups = {}
+    for line in read_sales_data(filename):
+        parts = line.split("|")
+        date = parts[1].strip() if len(parts) == 8 else ""
+        region = parts[7].strip() if len(parts) == 8 else ""
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", date) and re.fullmatch(r"[^_./\\]+", region):
+            name = f"sales_{date}_{region}.txt"
+        else:
+            name = "sales_unpartitioned.txt"
+        groups.setdefault(name, []).append(line)
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name in sorted(groups):
+        path = os.path.join(out_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER)
+            f.write("\n".join(groups[name]) + "\n")
+        if write_stats:
+            write_partition_stats(path)
+        paths.append(path)
+
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or index partitioned sales files")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    split = sub.add_parser("split", help="split one sales file into per-day, per-region partitions")
+    split.add_argument("filename")
+    split.add_argument("out_dir")
+
+    stats = sub.add_parser("stats", help="write .stats.json sidecars for existing partitions")
+    stats.add_argument("source", help="directory or glob of partition files")
+
+    args = parser.parse_args()
+    if args.command == "split":
+        written = split_into_partitions(args.filename, args.out_dir)
+        print(f"Wrote {len(written)} partitions to {args.out_dir}")
+    else:
+        for path in list_partitions(args.source):
+            write_partition_stats(path)
+            print(f"Indexed {path}")
@@ -0,0 +1,129 @@
+# utils/query.py
+
+from bisect import bisect_left, bisect_right
+
+from utils.file_handler import is_valid_transaction, to_record
+from utils.records import Transaction
+
+
+class TransactionQuery:
+    """
+    Indexes validated transactions once so repeated region/amount filters
+    do not rescan the data
+    - hash index on region (case-insensitive)
+    - amount index sorted by Quantity * UnitPrice, per region and overall,
+      queried by bisection
+    A region + min/max query finds its k matching rows in O(log n + k);
+    putting them back in input order (what filter() returns) adds a
+    sort, O(k log k). add() indexes appended rows without a rebuild.
+    """
+
+    def __init__(self, transactions):
+        self.total_input = 0
+        self.invalid_count = 0
+        self.transactions = []
+        self.amounts = []
+        self.rows = {None: range(0)}
+        self.indexes = {}
+        self.add(transactions)
+
+    def add(self, transactions):
+        """
+        Indexes more transactions (e.g. lines appended to the file)
+        Their positions follow the existing rows. A few rows are inserted
+        into the amount indexes by bisection; a larger batch is sorted
+        and merged, which Timsort does in about linear time because the
+        existing index is already one sorted run.
+        """
+        start = len(self.transactions)
+        # Rows are kept as Transaction records (other mappings are converted)
+        valid = [t if type(t) is Transaction else to_record(t) for t in transactions if is_valid_transaction(t)]
+        valid = [t for t in valid if t is not None]
+        self.total_input += len(transactions)
+        self.invalid_count += len(transactions) - len(valid)
+        self.transactions.extend(valid)
+        self.amounts.extend(t.amount for t in valid)
+
+        added = {}
+        for i, t in enumerate(valid, start):
+            added.setdefault(t.Region.lower(), []).append(i)
+        added[None] = range(start, len(self.transactions))
+
+        for key, new_rows in added.items():
+            if key is None:
+                self.rows[None] = range(len(self.transactions))
+            else:
+                self.rows.setdefault(key, []).extend(new_rows)
+            self._index(key, new_rows)
+
+    def _index(self, key, new_rows):
+        amounts, order = self.indexes.get(key, ([], []))
+        if len(new_rows) <= max(len(order) >> 6, 1):
+            for i in new_rows:
+                a = self.amounts[i]
+                at = bisect_right(amounts, a)
+                amounts.insert(at, a)
+                order.insert(at, i)
+        else:
+            # Ties keep input order: the sort is stable and new rows come last
+            order = order + list(new_rows)
+            order.sort(key=self.amounts.__getitem__)
+            amounts = [self.amounts[i] for i in order]
+        self.indexes[key] = (amounts, order)
+
+    def amount_range(self):
+        amounts = self.indexes[None][0]
+        return (amounts[0], amounts[-1]) if amounts else (None, None)
+
+    def positions(self, region=None, min_amount=None, max_amount=None, in_order=True):
+        """
+        Positions of the matching rows
+        in_order=False skips sorting them back into input order and
+        returns them by amount instead (O(log n + k) instead of
+        O(log n + k log k))
+        Returns: list of positions into self.transactions
+        """
+        key = region.lower() if region else None
+        if key not in self.indexes:
+            return []
+
+        amounts, order = self.indexes[key]
+        lo = bisect_left(amounts, min_amount) if min_amount is not None else 0
+        hi = bisect_right(amounts, max_amount) if max_amount is not None else len(amounts)
+        if lo >= hi:
+            return []
+        if lo == 0 and hi == len(amounts) and in_order:
+            return list(self.rows[key])
+        return sorted(order[lo:hi]) if in_order else order[lo:hi]
+
+    def count(self, region=None, min_amount=None, max_amount=None):
+        key = region.lower() if region else None
+        if key not in self.indexes:
+            return 0
+
+        amounts = self.indexes[key][0]
+        lo = bisect_left(amounts, min_amount) if min_amount is not None else 0
+        hi = bisect_right(amounts, max_amount) if max_amount is not None else len(amounts)
+        return max(hi - lo, 0)
+
+    def filter(self, region=None, min_amount=None, max_amount=None):
+        """
+        Indexed equivalent of validate_and_filter on the same transactions
+        (without the printed overview)
+
+        Returns:
+        Tuple (valid_transactions, invalid_count, filter_summary)
+        """
+        rows = self.positions(region, min_amount, max_amount)
+        valid_transactions = [self.transactions[i] for i in rows]
+
+        after_region = self.count(region)
+        summary = {
+            "total_input": self.total_input,
+            "invalid": self.invalid_count,
+            "filtered_by_region": len(self.transactions) - after_region,
+            "filtered_by_amount": after_region - len(valid_transactions),
+            "final_count": len(valid_transactions)
+        }
+
+        return valid_transactions, self.invalid_count, summary
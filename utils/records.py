@@ -0,0 +1,94 @@
+# utils/records.py
+
+import gc
+import sys
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+FIELDS = ("TransactionID", "Date", "ProductID", "ProductName", "Quantity", "UnitPrice", "CustomerID", "Region")
+_FIELD_SET = frozenset(FIELDS)
+
+_intern = sys.intern
+
+
+class Transaction(Mapping):
+    """
+    Compact transaction record
+    Behaves like the parsed transaction dictionary (same keys, t["Region"],
+    t.get(...), dict(t), == with dicts) but stores its fields in slots.
+    The repeating text fields (Date, ProductID, ProductName, CustomerID,
+    Region) are interned so every row shares one string per value, and
+    amount (Quantity * UnitPrice) is computed once here. Fields are also
+    readable as attributes (t.Region, t.amount) for hot loops.
+    The mapping interface has no item assignment, but the slots are not
+    frozen (a __setattr__ guard would make every record about three times
+    slower to build): amount is fixed when the record is created, so
+    build a new record instead of assigning t.Quantity or t.UnitPrice.
+    """
+    __slots__ = FIELDS + ("amount",)
+
+    def __init__(self, transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region):
+        self.TransactionID = transaction_id
+        self.Date = _intern(date)
+        self.ProductID = _intern(product_id)
+        self.ProductName = _intern(product_name)
+        self.Quantity = quantity
+        self.UnitPrice = unit_price
+        self.CustomerID = _intern(customer_id)
+        self.Region = _intern(region)
+        self.amount = quantity * unit_price
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key):
+        return key in _FIELD_SET
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __reduce__(self):
+        return Transaction, (self.TransactionID, self.Date, self.ProductID, self.ProductName,
+                             self.Quantity, self.UnitPrice, self.CustomerID, self.Region)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def as_transaction(t):
+    """
+    Returns t as a Transaction record. Other mappings with the transaction
+    keys (e.g. dictionaries built by callers) are converted; the
+    validation functions do this, so everything downstream of them can
+    read the record attributes directly.
+    Raises KeyError or TypeError for a mapping that is not a transaction
+    """
+    if type(t) is Transaction:
+        return t
+    return Transaction(*[t[field] for field in FIELDS])
+
+
+@contextmanager
+def paused_gc():
+    """
+    Pauses the cyclic garbage collector while records are built in bulk
+    Records only reference strings and numbers, so collections triggered
+    by the allocations would scan every row without finding anything.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -0,0 +1,401 @@
+# utils/report.py
+
+import csv
+import hashlib
+import html
+import io
+import json
+import os
+from datetime import datetime
+
+try:
+    from utils import columnar
+except ImportError:  # numpy is only needed for --columnar
+    columnar = None
+from utils.cache import CACHE_DIR, file_fingerprint
+from utils.data_processor import (
+    aggregate_sales,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    top_customers,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+
+SNAPSHOT_VERSION = 2
+REPORT_FORMATS = ["text", "json", "csv", "html"]
+REPORT_EXTENSIONS = {"text": ".txt", "json": ".json", "csv": ".csv", "html": ".html"}
+
+
+def _aggregate_metrics(transactions, aggregates, top_n):
+    if aggregates is None:
+        aggregates = aggregate_sales(transactions)
+
+    dates = aggregates["daily"].keys()
+    return {
+        "total_revenue": calculate_total_revenue(transactions, aggregates=aggregates),
+        "total_transactions": aggregates["transaction_count"],
+        "date_range": [min(dates), max(dates)] if dates else None,
+        "regions": region_wise_sales(transactions, aggregates=aggregates),
+        "top_products": top_selling_products(transactions, n=top_n, aggregates=aggregates),
+        "top_customers": top_customers(transactions, n=top_n, aggregates=aggregates),
+        "daily": daily_sales_trend(transactions, aggregates=aggregates),
+        "peak_day": find_peak_sales_day(transactions, aggregates=aggregates) if dates else None,
+        "low_performing_products": low_performing_products(transactions, aggregates=aggregates)
+    }
+
+
+def _table_metrics(table, top_n):
+    dates = table.dates
+    return {
+        "total_revenue": columnar.calculate_total_revenue(table),
+        "total_transactions": len(table),
+        "date_range": [min(dates), max(dates)] if dates else None,
+        "regions": columnar.region_wise_sales(table),
+        "top_products": columnar.top_selling_products(table, n=top_n),
+        "top_customers": columnar.top_customers(table, n=top_n),
+        "daily": columnar.daily_sales_trend(table),
+        "peak_day": columnar.find_peak_sales_day(table) if dates else None,
+        "low_performing_products": columnar.low_performing_products(table)
+    }
+
+
+def build_snapshot(transactions, aggregates=None, top_n=5):
+    """
+    Computes every number the report shows, once
+    transactions may also be a TransactionTable (utils/columnar.py), which
+    is analyzed with the vectorized functions instead of aggregates
+    Returns: JSON-serializable dictionary (the analytics snapshot)
+    """
+    if columnar is not None and isinstance(transactions, columnar.TransactionTable):
+        metrics = _table_metrics(transactions, top_n)
+    else:
+        metrics = _aggregate_metrics(transactions, aggregates, top_n)
+
+    total_revenue = metrics["total_revenue"]
+    total_transactions = metrics["total_transactions"]
+
+    peak = None
+    if metrics["peak_day"]:
+        peak_day, peak_rev, peak_count = metrics["peak_day"]
+        peak = {"date": peak_day, "revenue": peak_rev, "transaction_count": peak_count}
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "computed": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_revenue": total_revenue,
+        "total_transactions": total_transactions,
+        "average_order_value": total_revenue / total_transactions if total_transactions else 0,
+        "date_range": metrics["date_range"],
+        "regions": [dict(region=r, **stats) for r, stats in metrics["regions"].items()],
+        "top_products": [
+            {"name": name, "quantity": qty, "revenue": rev}
+            for name, qty, rev in metrics["top_products"]
+        ],
+        "top_customers": [
+            {"customer_id": cid, "total_spent": stats["total_spent"], "purchase_count": stats["purchase_count"]}
+            for cid, stats in metrics["top_customers"].items()
+        ],
+        "daily": [dict(date=d, **stats) for d, stats in metrics["daily"].items()],
+        "peak_day": peak,
+        "low_performing_products": [
+            {"name": name, "quantity": qty, "revenue": rev}
+            for name, qty, rev in metrics["low_performing_products"]
+        ],
+        "enrichment": None
+    }
+
+
+def with_enrichment(snapshot, enrichment):
+    """
+    Adds an enrichment summary (from track_enrichment) to a snapshot
+    Returns: new snapshot dictionary
+    """
+    total = enrichment["total"]
+    return dict(snapshot, enrichment={
+        "enriched": enrichment["enriched"],
+        "total": total,
+        "success_rate": (enrichment["enriched"] / total) * 100 if total else 0,
+        "not_enriched_products": sorted(enrichment["not_enriched_products"])
+    })
+
+
+# ---------- Snapshot cache ----------
+
+def input_fingerprints(filenames):
+    """
+    Fingerprints (path, size, mtime) of the input files. Take them before
+    the files are read: rows appended during the load then make the
+    snapshot stale on the next run instead of being silently cached as
+    part of it. A missing file gets a placeholder fingerprint.
+    Returns: list of fingerprint dictionaries
+    """
+    if isinstance(filenames, str):
+        filenames = [filenames]
+    fingerprints = []
+    for filename in filenames:
+        try:
+            fingerprints.append(file_fingerprint(filename, with_hash=False))
+        except OSError:
+            fingerprints.append({"path": os.path.abspath(filename), "missing": True})
+    return fingerprints
+
+
+def snapshot_key(fingerprints, **params):
+    """
+    Cache key for the analytics of one input file (or a list of partition
+    files) under given settings (filters, unique_error, ...), from the
+    input_fingerprints taken before the load. The key is
+    "<input>-<version>": <input> names the files and settings, <version>
+    changes whenever an input file is modified, so save_snapshot can drop
+    the outdated snapshots of the same input.
+    """
+    paths = [f["path"] for f in fingerprints]
+    raw = json.dumps([paths, params], sort_keys=True, default=str)
+    group = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    raw = json.dumps([SNAPSHOT_VERSION, fingerprints, params], sort_keys=True, default=str)
+    return f"{group}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def snapshot_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"snapshot-{key}.json")
+
+
+def load_snapshot(key, cache_dir=CACHE_DIR):
+    """
+    Returns: cached snapshot for key, or None
+    """
+    try:
+        with open(snapshot_path(key, cache_dir), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def save_snapshot(snapshot, key, cache_dir=CACHE_DIR):
+    """
+    Stores snapshot under key and removes the older snapshots of the same
+    input and settings, so the cache does not grow with every change to
+    the input file
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = snapshot_path(key, cache_dir) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, snapshot_path(key, cache_dir))
+    except OSError as e:
+        print(f"Error writing snapshot cache: {e}")
+        return
+
+    group = key.split("-", 1)[0]
+    current = os.path.basename(snapshot_path(key, cache_dir))
+    for name in os.listdir(cache_dir):
+        if name.startswith(f"snapshot-{group}-") and name.endswith(".json") and name != current:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+# ---------- Renderers ----------
+
+def render_text(snapshot, generated):
+    lines = [
+        "========================================",
+        "        SALES ANALYTICS REPORT",
+        f"Generated: {generated}",
+        f"Records Processed: {snapshot['total_transactions']}",
+        "========================================",
+        "",
+        "OVERALL SUMMARY",
+        "----------------------------------------",
+        f"Total Revenue: ₹{snapshot['total_revenue']:,.2f}",
+        f"Total Transactions: {snapshot['total_transactions']}",
+        f"Average Order Value: ₹{snapshot['average_order_value']:,.2f}",
+        f"Date Range: {' to '.join(snapshot['date_range']) if snapshot['date_range'] else 'N/A'}",
+        "",
+        "REGION-WISE PERFORMANCE",
+        "----------------------------------------",
+        f"{'Region':10} {'Sales':12} {'% of Total':10} {'Transactions'}"
+    ]
+    for r in snapshot["regions"]:
+        lines.append(f"{r['region']:10} ₹{r['total_sales']:,.0f}   {r['percentage']:.2f}%      {r['transaction_count']}")
+
+    lines += ["", "TOP 5 PRODUCTS", "----------------------------------------",
+              f"{'Rank':5} {'Product Name':20} {'Qty Sold':10} {'Revenue'}"]
+    for i, p in enumerate(snapshot["top_products"], start=1):
+        lines.append(f"{i:<5} {p['name']:20} {p['quantity']:<10} ₹{p['revenue']:,.2f}")
+
+    lines += ["", "TOP 5 CUSTOMERS", "----------------------------------------",
+              f"{'Rank':5} {'Customer ID':12} {'Total Spent':15} {'Order Count'}"]
+    for i, c in enumerate(snapshot["top_customers"], start=1):
+        lines.append(f"{i:<5} {c['customer_id']:12} ₹{c['total_spent']:,.2f}     {c['purchase_count']}")
+
+    lines += ["", "DAILY SALES TREND", "----------------------------------------",
+              f"{'Date':12} {'Transactions':12} {'Unique Customers'}"]
+    for d in snapshot["daily"]:
+        lines.append(f"{d['date']:12} {d['transaction_count']:<12} {d['unique_customers']}")
+
+    lines += ["", "PRODUCT PERFORMANCE ANALYSIS", "----------------------------------------"]
+    peak = snapshot["peak_day"]
+    if peak:
+        lines.append(f"Best selling day: {peak['date']} | Revenue: ₹{peak['revenue']:,.2f} | "
+                     f"Transactions: {peak['transaction_count']}")
+    else:
+        lines.append("Best selling day: N/A")
+    lines.append("")
+
+    enrichment = snapshot["enrichment"]
+    if enrichment:
+        lines += ["ENRICHMENT SUMMARY", "----------------------------------------",
+                  f"Total products enriched: {enrichment['enriched']}/{enrichment['total']}",
+                  f"Success rate: {enrichment['success_rate']:.2f}%",
+                  "Products that couldn't be enriched:"]
+        lines += [f"- {p}" for p in enrichment["not_enriched_products"]]
+
+    return "\n".join(lines) + "\n"
+
+
+def render_json(snapshot, generated):
+    return json.dumps(dict(snapshot, generated=generated), indent=2, ensure_ascii=False) + "\n"
+
+
+def render_csv(snapshot, generated):
+    """
+    Long format: one (section, item, metric, value) row per number
+    """
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["section", "item", "metric", "value"])
+    rows = [
+        ("summary", "", "generated", generated),
+        ("summary", "", "total_revenue", snapshot["total_revenue"]),
+        ("summary", "", "total_transactions", snapshot["total_transactions"]),
+        ("summary", "", "average_order_value", snapshot["average_order_value"])
+    ]
+    if snapshot["date_range"]:
+        rows += [("summary", "", "first_date", snapshot["date_range"][0]),
+                 ("summary", "", "last_date", snapshot["date_range"][1])]
+
+    sections = [("region", "regions", "region"), ("top_product", "top_products", "name"),
+                ("top_customer", "top_customers", "customer_id"), ("daily", "daily", "date"),
+                ("low_performing_product", "low_performing_products", "name")]
+    for section, key, item_field in sections:
+        for entry in snapshot[key]:
+            rows += [(section, entry[item_field], metric, value)
+                     for metric, value in entry.items() if metric != item_field]
+
+    if snapshot["peak_day"]:
+        peak = snapshot["peak_day"]
+        rows += [("peak_day", peak["date"], "revenue", peak["revenue"]),
+                 ("peak_day", peak["date"], "transaction_count", peak["transaction_count"])]
+
+    enrichment = snapshot["enrichment"]
+    if enrichment:
+        rows += [("enrichment", "", "enriched", enrichment["enriched"]),
+                 ("enrichment", "", "total", enrichment["total"]),
+                 ("enrichment", "", "success_rate", enrichment["success_rate"])]
+        rows += [("not_enriched_product", p, "", "") for p in enrichment["not_enriched_products"]]
+
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def _html_table(title, headers, rows):
+    parts = [f"<h2>{html.escape(title)}</h2>", "<table>",
+             "<tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headers) + "</tr>"]
+    for row in rows:
+        parts.append("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>")
+    parts.append("</table>")
+    return "\n".join(parts)
+
+
+def render_html(snapshot, generated):
+    date_range = " to ".join(snapshot["date_range"]) if snapshot["date_range"] else "N/A"
+    peak = snapshot["peak_day"]
+
+    sections = [
+        _html_table("Overall Summary", ["Metric", "Value"], [
+            ("Total Revenue", f"₹{snapshot['total_revenue']:,.2f}"),
+            ("Total Transactions", snapshot["total_transactions"]),
+            ("Average Order Value", f"₹{snapshot['average_order_value']:,.2f}"),
+            ("Date Range", date_range),
+            ("Best Selling Day", f"{peak['date']} (₹{peak['revenue']:,.2f}, {peak['transaction_count']} transactions)"
+             if peak else "N/A")
+        ]),
+        _html_table("Region-wise Performance", ["Region", "Sales", "% of Total", "Transactions"], [
+            (r["region"], f"₹{r['total_sales']:,.0f}", f"{r['percentage']:.2f}%", r["transaction_count"])
+            for r in snapshot["regions"]
+        ]),
+        _html_table("Top Products", ["Rank", "Product Name", "Qty Sold", "Revenue"], [
+            (i, p["name"], p["quantity"], f"₹{p['revenue']:,.2f}")
+            for i, p in enumerate(snapshot["top_products"], start=1)
+        ]),
+        _html_table("Top Customers", ["Rank", "Customer ID", "Total Spent", "Order Count"], [
+            (i, c["customer_id"], f"₹{c['total_spent']:,.2f}", c["purchase_count"])
+            for i, c in enumerate(snapshot["top_customers"], start=1)
+        ]),
+        _html_table("Daily Sales Trend", ["Date", "Transactions", "Unique Customers"], [
+            (d["date"], d["transaction_count"], d["unique_customers"]) for d in snapshot["daily"]
+        ])
+    ]
+
+    enrichment = snapshot["enrichment"]
+    if enrichment:
+        sections.append(_html_table("Enrichment Summary", ["Metric", "Value"], [
+            ("Total products enriched", f"{enrichment['enriched']}/{enrichment['total']}"),
+            ("Success rate", f"{enrichment['success_rate']:.2f}%"),
+            ("Products that couldn't be enriched", ", ".join(enrichment["not_enriched_products"]) or "-")
+        ]))
+
+    return "\n".join([
+        "<!DOCTYPE html>",
+        "<html><head><meta charset=\"utf-8\"><title>Sales Analytics Report</title>",
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:1em}"
+        "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left}</style></head><body>",
+        "<h1>Sales Analytics Report</h1>",
+        f"<p>Generated: {html.escape(generated)} | Records Processed: {snapshot['total_transactions']}</p>",
+        *sections,
+        "</body></html>"
+    ]) + "\n"
+
+
+RENDERERS = {"text": render_text, "json": render_json, "csv": render_csv, "html": render_html}
+
+
+def report_paths(output_file, formats):
+    """
+    Output file per format: the text report keeps output_file, the others
+    swap its extension (sales_report.txt -> sales_report.json, ...)
+    Returns: dictionary format -> path
+    """
+    base, ext = os.path.splitext(output_file)
+    return {fmt: output_file if fmt == "text" else base + REPORT_EXTENSIONS[fmt] for fmt in formats}
+
+
+def render_report(snapshot, output_file="output/sales_report.txt", formats=("text",)):
+    """
+    Renders one snapshot into every requested format, one write per file
+    Returns: dictionary format -> path written
+    """
+    unknown = [fmt for fmt in formats if fmt not in RENDERERS]
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(unknown)} (expected {', '.join(REPORT_FORMATS)})")
+
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    paths = report_paths(output_file, formats)
+
+    for fmt, path in paths.items():
+        content = RENDERERS[fmt](snapshot, generated)
+        newline = "" if fmt == "csv" else None
+        with open(path, "w", encoding="utf-8", newline=newline) as f:
+            f.write(content)
+
+    return paths
@@ -0,0 +1,87 @@
+# utils/scheduler.py
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class StageGraph:
+    """
+    Runs pipeline stages as a small dependency graph
+    Every stage starts as soon as the stages it depends on have finished,
+    so independent stages (e.g. the catalog download and parsing the
+    sales file) overlap and the total time approaches the longest chain
+    of dependent stages instead of the sum of all stages.
+
+    Usage:
+        graph = StageGraph()
+        graph.add("products", fetch)
+        graph.add("rows", load)
+        graph.add("enriched", enrich, deps=["products", "rows"])
+        results = graph.run()
+
+    A stage function is called with the results of its dependencies as
+    keyword arguments named after them. Stages run in threads, which
+    suits this pipeline: the overlapped work is network and file I/O.
+    """
+
+    def __init__(self, workers=4):
+        self.workers = workers
+        self.stages = {}
+
+    def add(self, name, func, deps=()):
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined")
+        self.stages[name] = (func, tuple(deps))
+        return self
+
+    def order(self):
+        """
+        Checks the graph and returns the stage names in a valid run order
+        """
+        done = []
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Stage dependency cycle: {' -> '.join(path + [name])}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}' (needed by '{path[-1]}')")
+            state[name] = "visiting"
+            for dep in self.stages[name][1]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            done.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return done
+
+    def run(self):
+        """
+        Runs every stage, starting each one when its dependencies are done
+        If a stage fails, no new stages are started, the running ones
+        finish, and the first error is raised.
+        Returns: dictionary stage name -> result
+        """
+        pending = self.order()
+        results = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n][1])]:
+                    func, deps = self.stages[name]
+                    running[pool.submit(func, **{d: results[d] for d in deps})] = name
+                    pending.remove(name)
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        wait(running)
+                        raise error
+                    results[name] = future.result()
+
+        return results
@@ -0,0 +1,443 @@
+# utils/service.py
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from utils.file_handler import iter_sales_records, iter_valid_transactions, merge_validation_summaries
+from utils.data_processor import (
+    empty_aggregates,
+    update_aggregates,
+    aggregate_sales,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    top_customers,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils.incremental import tail_hash, complete_end, data_start
+from utils.query import TransactionQuery
+from utils.report import build_snapshot, with_enrichment
+from utils.api_handler import get_product_catalog, create_product_mapping, EnrichedTransactions, track_enrichment
+
+FILTERED_CACHE_SIZE = 128
+VIEW_CACHE_SIZE = 32
+MAX_REQUEST_BYTES = 16 * 1024
+
+
+class AnalyticsStore:
+    """
+    Keeps the parsed transactions, aggregates and product mapping of one
+    sales file in memory and folds appended lines in as the file grows
+
+    Reading, parsing and validating the file happens in scan() (safe to
+    run in a worker thread, it does not touch the store; a full reload
+    also builds its aggregates and TransactionQuery there). apply()
+    installs the result and must run on the thread that answers queries:
+    a reload only swaps references, appended records are folded into the
+    existing aggregates and query indexes.
+    """
+
+    def __init__(self, filename="data/sales_data.txt", unique_error=None):
+        self.filename = filename
+        self.unique_error = unique_error
+        self.product_mapping = {}
+        self.catalog_loaded = None
+        self.version = 0
+        self.loaded_at = None
+        self._reset()
+
+    def _reset(self):
+        self.transactions = []
+        self.valid = []
+        self.aggregates = empty_aggregates(self.unique_error)
+        self.validation = {}
+        self.offset = None
+        self.tail_hash = None
+        self.stat = None
+        self._query = None
+        self._filtered = OrderedDict()
+        self._views = OrderedDict()
+        self._enrichment = None
+
+    # ---------- Loading ----------
+
+    def scan(self):
+        """
+        Reads whatever changed in the file since the last apply()
+        Returns: change dictionary for apply(), or None if nothing changed
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError as e:
+            print(f"Error reading file: {e}")
+            return None
+
+        key = (stat.st_size, stat.st_mtime_ns)
+        if key == self.stat:
+            return None
+
+        with open(self.filename, "rb") as file:
+            end = complete_end(file, stat.st_size)
+            reload = (
+                self.offset is None or end < self.offset or
+                tail_hash(file, self.offset) != self.tail_hash
+            )
+            start = data_start(file, end) if reload else self.offset
+            end_hash = tail_hash(file, end)
+
+        records = list(iter_sales_records(self.filename, start, end)) if end > start else []
+        summary = {}
+        valid = list(iter_valid_transactions(records, summary))
+
+        aggregates = query = None
+        if reload:
+            aggregates = update_aggregates(empty_aggregates(self.unique_error), valid)
+            query = TransactionQuery(records)
+        return {"reload": reload, "records": records, "valid": valid, "validation": summary,
+                "aggregates": aggregates, "query": query, "offset": end, "tail_hash": end_hash, "stat": key}
+
+    def apply(self, change):
+        """
+        Installs the result of scan(): a full reload or appended records
+        Returns: number of new records
+        """
+        if change is None:
+            return 0
+
+        if change["reload"]:
+            self._reset()
+            self.transactions = change["records"]
+            self.valid = change["valid"]
+            self.aggregates = change["aggregates"]
+            self.validation = change["validation"]
+            self._query = change["query"]
+        else:
+            self.transactions.extend(change["records"])
+            self.valid.extend(change["valid"])
+            update_aggregates(self.aggregates, change["valid"])
+            merge_validation_summaries(self.validation, change["validation"])
+            if self._query is not None:
+                self._query.add(change["records"])
+
+        self.offset = change["offset"]
+        self.tail_hash = change["tail_hash"]
+        self.stat = change["stat"]
+        self.version += 1
+        self.loaded_at = time.time()
+
+        # Cached results are rebuilt on first use
+        self._filtered.clear()
+        self._views.clear()
+        self._enrichment = None
+        return len(change["records"])
+
+    def refresh(self):
+        return self.apply(self.scan())
+
+    def set_catalog(self, products):
+        self.product_mapping = create_product_mapping(products)
+        self.catalog_loaded = time.time()
+        self._enrichment = None
+
+    # ---------- Queries ----------
+
+    def aggregates_for(self, region=None, min_amount=None, max_amount=None):
+        """
+        Aggregates of the valid transactions matching the filters
+        Filtered results are computed from the TransactionQuery indexes and
+        kept until the data changes.
+        Returns: tuple (aggregates, matching transactions or None)
+        """
+        if region is None and min_amount is None and max_amount is None:
+            return self.aggregates, None
+
+        key = _filter_key(region, min_amount, max_amount)
+        cached = self._filtered.get(key)
+        if cached is not None:
+            self._filtered.move_to_end(key)
+            return cached
+
+        if self._query is None:
+            self._query = TransactionQuery(self.transactions)
+        rows, _, _ = self._query.filter(region, min_amount, max_amount)
+
+        result = (aggregate_sales(rows, self.unique_error), rows)
+        self._filtered[key] = result
+        if len(self._filtered) > FILTERED_CACHE_SIZE:
+            self._filtered.popitem(last=False)
+        return result
+
+    def view(self, name, filters, compute):
+        """
+        Result of compute() for the given filters, kept until the data
+        changes (for responses that are expensive to build)
+        """
+        key = (name,) + _filter_key(*filters)
+        if key in self._views:
+            self._views.move_to_end(key)
+            return self._views[key]
+
+        result = self._views[key] = compute()
+        if len(self._views) > VIEW_CACHE_SIZE:
+            self._views.popitem(last=False)
+        return result
+
+    def enrichment(self, rows=None):
+        """
+        Enrichment summary of the valid (or given) transactions
+        """
+        everything = rows is None or rows is self.valid
+        if everything and self._enrichment is not None:
+            return self._enrichment
+
+        summary = {}
+        for _ in track_enrichment(EnrichedTransactions(self.valid if rows is None else rows, self.product_mapping),
+                                  summary):
+            pass
+        if everything:
+            self._enrichment = summary
+        return summary
+
+
+def _filter_key(region, min_amount, max_amount):
+    return region.lower() if region else None, min_amount, max_amount
+
+
+# ---------- HTTP ----------
+
+def _number(params, name, cast=float):
+    value = params.get(name, [None])[0]
+    if value in (None, ""):
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number, got '{value}'")
+
+
+def _filters(params):
+    region = params.get("region", [None])[0] or None
+    return region, _number(params, "min_amount"), _number(params, "max_amount")
+
+
+def _endpoint_summary(store, agg, rows, params):
+    total = calculate_total_revenue(rows, aggregates=agg)
+    count = agg["transaction_count"]
+    dates = agg["daily"].keys()
+    return {
+        "total_revenue": total,
+        "transaction_count": count,
+        "average_order_value": total / count if count else 0,
+        "date_range": [min(dates), max(dates)] if dates else None
+    }
+
+
+def _endpoint_peak(store, agg, rows, params):
+    if not agg["daily"]:
+        return None
+    date, revenue, count = find_peak_sales_day(rows, aggregates=agg)
+    return {"date": date, "revenue": revenue, "transaction_count": count}
+
+
+def _endpoint_customers(store, agg, rows, params):
+    n = _number(params, "n", int)
+    if n is None:
+        # Every customer, sorted: built once per data version and filter
+        return store.view("customers", _filters(params), lambda: customer_analysis(rows, aggregates=agg))
+    return top_customers(rows, n=n, aggregates=agg)
+
+
+def _endpoint_enrichment(store, agg, rows, params):
+    summary = store.enrichment(rows)
+    return dict(summary, not_enriched_products=sorted(summary["not_enriched_products"]))
+
+
+def _endpoint_report(store, agg, rows, params):
+    return with_enrichment(build_snapshot(rows, aggregates=agg), store.enrichment(rows))
+
+
+ENDPOINTS = {
+    "/summary": _endpoint_summary,
+    "/regions": lambda store, agg, rows, params: region_wise_sales(rows, aggregates=agg),
+    "/products/top": lambda store, agg, rows, params: [
+        {"name": name, "quantity": qty, "revenue": rev}
+        for name, qty, rev in top_selling_products(rows, n=_number(params, "n", int) or 5, aggregates=agg)
+    ],
+    "/products/low": lambda store, agg, rows, params: [
+        {"name": name, "quantity": qty, "revenue": rev}
+        for name, qty, rev in low_performing_products(
+            rows, threshold=_number(params, "threshold", int) or 10, aggregates=agg)
+    ],
+    "/customers": _endpoint_customers,
+    "/daily": lambda store, agg, rows, params: daily_sales_trend(rows, aggregates=agg),
+    "/peak": _endpoint_peak,
+    "/enrichment": _endpoint_enrichment,
+    "/report": _endpoint_report
+}
+
+
+def handle_request(store, target):
+    """
+    Answers one GET request from the in-memory store
+    Every analytics endpoint accepts region, min_amount and max_amount
+    Returns: tuple (HTTP status, JSON-serializable body)
+    """
+    url = urlsplit(target)
+    params = parse_qs(url.query)
+    path = url.path.rstrip("/") or "/"
+
+    if path in ("/", "/health"):
+        return HTTPStatus.OK, {
+            "status": "ok",
+            "file": store.filename,
+            "version": store.version,
+            "loaded_at": store.loaded_at,
+            "rows": len(store.transactions),
+            "valid_rows": len(store.valid),
+            "products_in_catalog": len(store.product_mapping),
+            "validation": dict(store.validation, regions=sorted(store.validation.get("regions", ()))),
+            "endpoints": ["/health"] + sorted(ENDPOINTS)
+        }
+
+    endpoint = ENDPOINTS.get(path)
+    if endpoint is None:
+        return HTTPStatus.NOT_FOUND, {"error": f"unknown endpoint '{path}'"}
+
+    try:
+        region, min_amount, max_amount = _filters(params)
+        agg, rows = store.aggregates_for(region, min_amount, max_amount)
+        return HTTPStatus.OK, endpoint(store, agg, store.valid if rows is None else rows, params)
+    except ValueError as e:
+        return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _response(status, body, keep_alive):
+    data = json.dumps(body, default=_json_default, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("ascii") + data
+
+
+async def _serve_client(store, reader, writer):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+
+            lines = head.decode("latin-1").split("\r\n")
+            parts = lines[0].split()
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close" and parts[-1:] == ["HTTP/1.1"]
+            if len(parts) != 3:
+                status, body, keep_alive = HTTPStatus.BAD_REQUEST, {"error": "malformed request line"}, False
+            elif parts[0] != "GET":
+                status, body = HTTPStatus.METHOD_NOT_ALLOWED, {"error": "only GET is supported"}
+            else:
+                try:
+                    status, body = handle_request(store, parts[1])
+                except Exception as e:
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def _watch(store, interval, catalog_options, catalog_ttl):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            change = await loop.run_in_executor(None, store.scan)
+            if change is not None:
+                added = store.apply(change)
+                kind = "Reloaded" if change["reload"] else "Appended"
+                print(f"{kind} {added} records from {store.filename} (version {store.version})")
+
+            if catalog_ttl and time.time() - (store.catalog_loaded or 0) >= catalog_ttl:
+                products = await loop.run_in_executor(None, lambda: get_product_catalog(**catalog_options))
+                if products:
+                    store.set_catalog(products)
+        except Exception as e:
+            print(f"Error refreshing data: {e}")
+
+
+async def serve(store, host="127.0.0.1", port=8080, interval=2.0, catalog_options=None):
+    """
+    Serves the store over HTTP and keeps it in sync with the sales file
+    (checked every interval seconds; appended lines are parsed
+    incrementally, a rewritten file is reloaded)
+    """
+    catalog_options = catalog_options or {}
+    server = await asyncio.start_server(
+        lambda r, w: _serve_client(store, r, w), host, port, limit=MAX_REQUEST_BYTES
+    )
+    watcher = asyncio.create_task(_watch(store, interval, catalog_options, catalog_options.get("ttl")))
+
+    address = server.sockets[0].getsockname()
+    print(f"Analytics service running at http://{address[0]}:{address[1]}/ (Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def run_service(filename="data/sales_data.txt", host="127.0.0.1", port=8080, interval=2.0,
+                catalog_options=None, unique_error=None):
+    """
+    Loads the sales file and product catalog once and serves them until
+    interrupted
+    """
+    store = AnalyticsStore(filename, unique_error=unique_error)
+    store.set_catalog(get_product_catalog(**(catalog_options or {})))
+    store.refresh()
+    print(f"✓ Loaded {len(store.transactions)} records ({len(store.valid)} valid), "
+          f"{len(store.product_mapping)} products")
+
+    try:
+        asyncio.run(serve(store, host, port, interval, catalog_options))
+    except KeyboardInterrupt:
+        print("\nService stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve sales analytics as JSON over HTTP")
+    parser.add_argument("--file", default="data/sales_data.txt")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between file change checks")
+    parser.add_argument("--offline", action="store_true", help="use the last cached product catalog")
+    args = parser.parse_args()
+
+    run_service(args.file, args.host, args.port, args.interval, catalog_options={"offline": args.offline})
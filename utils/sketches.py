@@ -0,0 +1,206 @@
+# utils/sketches.py
+
+import hashlib
+import heapq
+import math
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary with bounded memory
+    Keeps at most `capacity` counters. Every key whose true weight is
+    above total_weight / capacity is guaranteed to be tracked, and each
+    estimate overcounts by at most its recorded error.
+    An optional second value per key (e.g. revenue) is summed from the
+    moment the key entered the summary.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError(f"Space-Saving capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.counters = {}  # key -> [count, error, extra]
+        self.heap = []      # (count, key) entries, possibly stale
+        self.total = 0
+
+    def update(self, key, weight=1, extra=0):
+        self.total += weight
+        counter = self.counters.get(key)
+
+        if counter is None:
+            if len(self.counters) < self.capacity:
+                counter = self.counters[key] = [0, 0, 0]
+            else:
+                # Replace the smallest counter; its count becomes the error
+                min_count, min_key = self._pop_min()
+                del self.counters[min_key]
+                counter = self.counters[key] = [min_count, min_count, 0]
+
+        counter[0] += weight
+        counter[2] += extra
+        heapq.heappush(self.heap, (counter[0], key))
+
+        if len(self.heap) > 4 * self.capacity + 64:
+            self.heap = [(c[0], k) for k, c in self.counters.items()]
+            heapq.heapify(self.heap)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self.heap)
+            counter = self.counters.get(key)
+            if counter is not None and counter[0] == count:
+                return count, key
+
+    def top(self, n=5):
+        """
+        Returns: list of (key, estimated weight, max overcount, extra)
+        sorted by estimated weight descending
+        """
+        best = heapq.nlargest(n, self.counters.items(), key=lambda item: item[1][0])
+        return [(key, c[0], c[1], c[2]) for key, c in best]
+
+    def merge(self, other):
+        """
+        Merges another summary into this one (keys are combined and the
+        result is trimmed back to capacity)
+        """
+        combined = {k: list(c) for k, c in self.counters.items()}
+        self_min = min((c[0] for c in self.counters.values()), default=0) if len(self.counters) >= self.capacity else 0
+        other_min = min((c[0] for c in other.counters.values()), default=0) if len(other.counters) >= other.capacity else 0
+
+        for key, (count, error, extra) in other.counters.items():
+            c = combined.get(key)
+            if c is None:
+                combined[key] = [count + self_min, error + self_min, extra]
+            else:
+                c[0] += count
+                c[1] += error
+                c[2] += extra
+        for key, c in combined.items():
+            if key not in other.counters:
+                c[0] += other_min
+                c[1] += other_min
+
+        kept = heapq.nlargest(self.capacity, combined.items(), key=lambda item: item[1][0])
+        self.counters = dict(kept)
+        self.heap = [(c[0], k) for k, c in self.counters.items()]
+        heapq.heapify(self.heap)
+        self.total += other.total
+        return self
+
+
+def _hash64(value):
+    # Stable across processes (unlike hash()), so sketches can be saved and merged
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# A set costs about 64 bytes per entry (hash table slots at its load
+# factor); the registers cost one byte each
+SET_BYTES_PER_ITEM = 64
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+
+class HyperLogLog:
+    """
+    Mergeable cardinality sketch
+    The relative standard error is about 1.04 / sqrt(2 ** precision);
+    pass error= to pick the precision (4 to 16, so the smallest error is
+    about 0.0041). Small sets are kept exactly and switch to registers
+    once the set would use more memory than the 2 ** precision register
+    bytes, so counts for small days stay exact.
+    Supports add(), len() for the estimate and |= / union() for merging.
+    """
+
+    def __init__(self, error=0.01, precision=None):
+        if precision is None:
+            if not 0 < error < 1:
+                raise ValueError(f"HyperLogLog error must be between 0 and 1, got {error}")
+            precision = max(math.ceil(math.log2((1.04 / error) ** 2)), MIN_PRECISION)
+            if precision > MAX_PRECISION:
+                raise ValueError(
+                    f"HyperLogLog error {error} is below what precision {MAX_PRECISION} can deliver "
+                    f"(about {1.04 / math.sqrt(1 << MAX_PRECISION):.4f}); count exactly instead"
+                )
+        elif not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f"HyperLogLog precision must be between {MIN_PRECISION} and {MAX_PRECISION}")
+        self.precision = precision
+        self.m = 1 << self.precision
+        self.exact = set()
+        self.registers = None
+
+    def add(self, value):
+        if self.registers is None:
+            self.exact.add(value)
+            if len(self.exact) > self.m // SET_BYTES_PER_ITEM:
+                self._to_registers()
+            return
+
+        h = _hash64(value)
+        self._set(h)
+
+    def _set(self, h):
+        p = self.precision
+        index = h >> (64 - p)
+        rest = (h << p) & 0xFFFFFFFFFFFFFFFF
+        rank = 64 - p + 1 if rest == 0 else 64 - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def _to_registers(self):
+        self.registers = bytearray(self.m)
+        for value in self.exact:
+            self._set(_hash64(value))
+        self.exact = None
+
+    def __len__(self):
+        return int(round(self.estimate()))
+
+    def estimate(self):
+        if self.registers is None:
+            return float(len(self.exact))
+
+        m = self.m
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def __ior__(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+
+        if self.registers is None and other.registers is None:
+            self.exact |= other.exact
+            if len(self.exact) > self.m // SET_BYTES_PER_ITEM:
+                self._to_registers()
+            return self
+
+        if self.registers is None:
+            self._to_registers()
+        if other.registers is None:
+            for value in other.exact:
+                self._set(_hash64(value))
+        else:
+            self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def copy(self):
+        clone = HyperLogLog(precision=self.precision)
+        clone.exact = set(self.exact) if self.exact is not None else None
+        clone.registers = bytearray(self.registers) if self.registers is not None else None
+        return clone
+
+    @classmethod
+    def union(cls, sketches):
+        sketches = list(sketches)
+        result = sketches[0].copy()
+        for s in sketches[1:]:
+            result |= s
+        return result
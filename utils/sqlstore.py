@@ -0,0 +1,192 @@
+# utils/sqlstore.py
+
+import sqlite3
+from itertools import islice
+
+from utils.api_handler import EnrichedTransaction
+from utils.data_processor import StoreQuery, period_key
+from utils.writers import BATCH_SIZE
+
+DB_PATH = "data/sales.db"
+
+COLUMNS = [
+    "transaction_id", "date", "product_id", "product_name", "quantity", "unit_price", "amount",
+    "customer_id", "region", "region_key", "title", "brand", "category", "rating", "enriched"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id TEXT,
+    date TEXT,
+    product_id TEXT,
+    product_name TEXT,
+    quantity INTEGER,
+    unit_price REAL,
+    amount REAL,
+    customer_id TEXT,
+    region TEXT,
+    region_key TEXT,
+    title TEXT,
+    brand TEXT,
+    category TEXT,
+    rating REAL,
+    enriched INTEGER
+)
+"""
+
+INDEXES = {
+    "idx_transactions_date": "date",
+    "idx_transactions_region": "region_key, amount",
+    "idx_transactions_product": "product_name",
+    "idx_transactions_customer": "customer_id"
+}
+
+# Names accepted by group_sales(by=...) and the columns they group on
+DIMENSIONS = {
+    "date": "date",
+    "region": "region",
+    "product": "product_name",
+    "product_id": "product_id",
+    "customer": "customer_id",
+    "category": "category",
+    "brand": "brand"
+}
+
+
+def open_store(path=DB_PATH):
+    """
+    Opens (or creates) the SQLite transaction store
+    Returns: sqlite3 connection
+    """
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.create_function("period_key", 2, _sql_period_key, deterministic=True)
+    return conn
+
+
+def _sql_period_key(date, period):
+    # An exception in a SQLite function aborts the whole query, so a
+    # malformed or missing date becomes NULL instead
+    try:
+        return period_key(date, period)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rows(transactions):
+    for t in transactions:
+        if type(t) is EnrichedTransaction:
+            b = t.base
+            p = t.product
+            title, brand, category, rating, enriched = p[4], p[3], p[2], p[1], p[5]
+        else:
+            b = t
+            title = brand = category = rating = None
+            enriched = False
+
+        region = b.Region
+        yield (b.TransactionID, b.Date, b.ProductID, b.ProductName, b.Quantity, b.UnitPrice, b.amount,
+               b.CustomerID, region, region.lower(), title, brand, category, rating, int(bool(enriched)))
+
+
+def load_store(conn, transactions, append=False, batch_size=BATCH_SIZE):
+    """
+    Bulk-loads validated transactions (plain or EnrichedTransaction views,
+    which add title/brand/category/rating) into the store
+    Rows go in with batched executemany calls inside one transaction.
+    Without append the table is replaced: its indexes are dropped and
+    built once after the load. With append the rows are inserted into the
+    existing indexes, so a small append does not rebuild them.
+    Returns: number of rows loaded
+    """
+    insert = f"INSERT INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+    rows = _rows(transactions)
+    count = 0
+
+    conn.execute("PRAGMA synchronous = OFF")
+    try:
+        with conn:
+            if not append:
+                for name in INDEXES:
+                    conn.execute(f"DROP INDEX IF EXISTS {name}")
+                conn.execute("DELETE FROM transactions")
+
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(insert, batch)
+                count += len(batch)
+
+            for name, columns in INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON transactions ({columns})")
+    finally:
+        conn.execute("PRAGMA synchronous = FULL")
+
+    conn.execute("ANALYZE")
+    return count
+
+
+def group_sales(conn, by=("region",), period=None, **filters):
+    """
+    Ad-hoc group-by in SQL, e.g. by=("customer", "region") or
+    by=("product",), period="week"
+    by: names from DIMENSIONS; period: "week" or "month" adds the ISO
+    week / month of the date as the first key (NULL for rows whose date
+    cannot be parsed)
+    filters: region, min_amount, max_amount, start_date, end_date (see
+    data_processor.StoreQuery)
+    Returns: list of dictionaries (keys, quantity, revenue,
+    transaction_count), largest revenue first
+    """
+    unknown = [d for d in by if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)} (expected {', '.join(DIMENSIONS)})")
+    if period not in (None, "week", "month"):
+        raise ValueError(f"Unknown period '{period}' (expected 'week' or 'month')")
+
+    keys = [f"{DIMENSIONS[d]} AS {d}" for d in by]
+    names = list(by)
+    if period:
+        # period is one of the two names checked above
+        keys.insert(0, f"period_key(date, '{period}') AS period")
+        names.insert(0, "period")
+
+    rows = StoreQuery(conn, **filters).select(
+        f"{', '.join(keys)}, SUM(quantity), SUM(amount), COUNT(*)",
+        f"GROUP BY {', '.join(names) or 'NULL'} ORDER BY SUM(amount) DESC, MIN(rowid)"
+    )
+
+    return [
+        dict(zip(names, row[:len(names)]), quantity=row[-3], revenue=row[-2], transaction_count=row[-1])
+        for row in rows
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the SQLite sales store (load it with main.py --sqlite)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--by", default="region", help="comma-separated: " + ", ".join(DIMENSIONS))
+    parser.add_argument("--period", choices=["week", "month"])
+    parser.add_argument("--region")
+    parser.add_argument("--min-amount", type=float)
+    parser.add_argument("--max-amount", type=float)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--sql", help="run this SQL statement instead")
+    args = parser.parse_args()
+
+    conn = open_store(args.db)
+    if args.sql:
+        cursor = conn.execute(args.sql)
+        print("|".join(d[0] for d in cursor.description or []))
+        for row in islice(cursor, args.limit):
+            print("|".join(map(str, row)))
+    else:
+        by = [d.strip() for d in args.by.split(",") if d.strip()]
+        groups = group_sales(conn, by, args.period, region=args.region,
+                             min_amount=args.min_amount, max_amount=args.max_amount)
+        for g in groups[:args.limit]:
+            print(g)
+    conn.close()
@@ -0,0 +1,190 @@
+# utils/writers.py
+
+import csv
+import json
+import struct
+import sys
+from array import array
+
+BATCH_SIZE = 10000
+FORMATS = ["pipe", "csv", "jsonl", "columnar"]
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_pipe(f, fields, batches, new_file):
+    if new_file:
+        f.write("|".join(fields) + "\n")
+    for batch in batches:
+        f.write("".join(["|".join(map(str, row)) + "\n" for row in batch]))
+
+
+def _write_csv(f, fields, batches, new_file):
+    writer = csv.writer(f)
+    if new_file:
+        writer.writerow(fields)
+    for batch in batches:
+        writer.writerows(batch)
+
+
+def _write_jsonl(f, fields, batches, new_file):
+    dumps = json.dumps
+    for batch in batches:
+        f.write("".join([dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n" for row in batch]))
+
+
+# Columnar format: a sequence of self-contained frames, one per batch, so
+# appended runs and files joined end to end stay readable.
+#   b"SACB" | uint32 little-endian header length | header (JSON, utf-8) |
+#   column data, one block per field in header order
+# The header is {"rows": n, "fields": [...], "columns": [...]} with one
+# entry per field:
+#   {"type": "int64" | "float64", "nbytes": k}  -> k bytes of little-endian
+#                                                  8-byte values
+#   {"type": "dict", "labels": [...], "code": "B" | "H" | "I", "nbytes": k}
+#       -> k bytes of little-endian unsigned codes (1, 2 or 4 bytes) into
+#          labels (any JSON values: strings, numbers, true/false, null)
+#   {"type": "text", "nbytes": k} -> k bytes of utf-8 strings separated by NUL
+# Integer columns become int64, other numeric columns float64, mostly
+# distinct strings (IDs) text, and everything else is dictionary-encoded.
+COLUMNAR_MAGIC = b"SACB"
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _little_endian(values):
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_column(values):
+    kinds = {type(v) for v in values}
+    if kinds == {int}:
+        data = _little_endian(array("q", values))
+        return {"type": "int64", "nbytes": len(data)}, data
+    if kinds and kinds <= {int, float}:
+        data = _little_endian(array("d", values))
+        return {"type": "float64", "nbytes": len(data)}, data
+
+    index = {}
+    codes = [index.setdefault(v, len(index)) for v in values]
+    if len(index) > len(values) // 2 and kinds == {str} and not any("\0" in v for v in index):
+        # Mostly distinct text (IDs): the strings themselves, NUL-separated
+        data = "\0".join(values).encode("utf-8")
+        return {"type": "text", "nbytes": len(data)}, data
+
+    code = "B" if len(index) <= 0xFF else "H" if len(index) <= 0xFFFF else "I"
+    data = _little_endian(array(code, codes))
+    return {"type": "dict", "labels": list(index), "code": code, "nbytes": len(data)}, data
+
+
+def _decode_column(column, data):
+    if column["type"] == "text":
+        return data.decode("utf-8").split("\0")
+    if column["type"] == "dict":
+        codes = array(column["code"])
+    else:
+        codes = array("q" if column["type"] == "int64" else "d")
+    codes.frombytes(data)
+    if _BIG_ENDIAN:
+        codes.byteswap()
+
+    if column["type"] != "dict":
+        return codes.tolist()
+    labels = column["labels"]
+    return [labels[c] for c in codes]
+
+
+def _write_columnar(f, fields, batches, new_file):
+    for batch in batches:
+        columns, blocks = [], []
+        for values in zip(*batch):
+            column, data = _encode_column(values)
+            columns.append(column)
+            blocks.append(data)
+
+        header = json.dumps({"rows": len(batch), "fields": fields, "columns": columns},
+                            ensure_ascii=False).encode("utf-8")
+        f.write(COLUMNAR_MAGIC + struct.pack("<I", len(header)) + header)
+        for data in blocks:
+            f.write(data)
+
+
+WRITERS = {
+    "pipe": (_write_pipe, "w", {"encoding": "utf-8"}),
+    "csv": (_write_csv, "w", {"encoding": "utf-8", "newline": ""}),
+    "jsonl": (_write_jsonl, "w", {"encoding": "utf-8"}),
+    "columnar": (_write_columnar, "wb", {})
+}
+
+
+def write_rows(rows, fields, filename, fmt="pipe", append=False, batch_size=BATCH_SIZE, header=None):
+    """
+    Writes row tuples (values in the order of fields) to filename
+    Rows are consumed lazily and written in batches, so an iterator of
+    rows is streamed to disk as it is produced
+    fmt: pipe | csv | jsonl | columnar
+    header: write the header line; by default only into an empty file
+    Returns: number of rows written
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format '{fmt}' (expected one of {', '.join(FORMATS)})")
+
+    write, mode, options = WRITERS[fmt]
+    if append:
+        mode = mode.replace("w", "a")
+
+    count = 0
+
+    def counted(batches):
+        nonlocal count
+        for batch in batches:
+            count += len(batch)
+            yield batch
+
+    with open(filename, mode, **options) as f:
+        write(f, fields, counted(_batches(rows, batch_size)), f.tell() == 0 if header is None else header)
+
+    return count
+
+
+def iter_columnar_batches(filename):
+    """
+    Reads a file written with fmt="columnar" one frame at a time
+    Yields: tuple (fields, list of column value lists)
+    """
+    with open(filename, "rb") as f:
+        while True:
+            prefix = f.read(8)
+            if not prefix:
+                return
+            if len(prefix) < 8 or prefix[:4] != COLUMNAR_MAGIC:
+                raise ValueError(f"{filename} is not a columnar file (or it is truncated)")
+
+            header = json.loads(f.read(struct.unpack("<I", prefix[4:])[0]).decode("utf-8"))
+            columns = []
+            for column in header["columns"]:
+                data = f.read(column["nbytes"])
+                if len(data) != column["nbytes"]:
+                    raise ValueError(f"{filename} is truncated")
+                columns.append(_decode_column(column, data))
+            yield header["fields"], columns
+
+
+def read_columnar(filename):
+    """
+    Reads a file written with fmt="columnar"
+    Yields: one dictionary per row
+    """
+    for fields, columns in iter_columnar_batches(filename):
+        for values in zip(*columns):
+            yield dict(zip(fields, values))